@@ -29,9 +29,11 @@ from .add_ons.bevy_components.settings import ComponentsSettings
 from .add_ons.bevy_components.utils import BLENVY_OT_item_select
 
 # auto export
-from .add_ons.auto_export import gltf_post_export_callback
+from .add_ons.auto_export import gltf_post_export_callback, gltf_gather_node_hook
 from .add_ons.auto_export.common.tracker import AutoExportTracker
+from .add_ons.auto_export.common.change_journal import mark_project_changed
 from .add_ons.auto_export.settings import AutoExportSettings
+from .add_ons.auto_export.operators import BLENVY_OT_auto_export_verify_all
 
 # asset management
 from .assets.ui import BLENVY_PT_assets_panel
@@ -49,6 +51,7 @@ from .blueprints.operators import BLENVY_OT_blueprint_select
 
 # blenvy core
 from .core.blenvy_manager import BlenvyManager
+from .core.project_changes import add_project_change_listener, remove_project_change_listener
 from .core.operators import BLENVY_OT_tooling_switch, BLENVY_OT_configuration_switch, BLENVY_OT_configuration_reset
 from .core.ui.ui import (BLENVY_PT_SidePanel)
 from .core.ui.scenes_list import BLENVY_OT_scenes_list_actions
@@ -59,6 +62,11 @@ from .assets.assets_folder_browser import BLENVY_OT_assets_paths_browse
 # this needs to be here, as it is how Blender's gltf exporter callbacks are defined, at the add-on root level
 def glTF2_post_export_callback(data):
     gltf_post_export_callback(data)
+
+# likewise for the gltf exporter's hooks
+class glTF2ExportUserExtension:
+    def gather_node_hook(self, gltf2_object, blender_object, export_settings):
+        gltf_gather_node_hook(gltf2_object, blender_object, export_settings)
     
 
 classes = [
@@ -107,6 +115,7 @@ classes = [
     # gltf auto export
     AutoExportTracker,
     AutoExportSettings,
+    BLENVY_OT_auto_export_verify_all,
 
     # blenvy
     BlenvyManager,
@@ -139,13 +148,21 @@ classes = [
 @persistent
 def post_update(scene, depsgraph):
     bpy.context.window_manager.auto_export_tracker.deps_post_update_handler( scene, depsgraph)
+    BlueprintsRegistry.deps_post_update_handler(scene, depsgraph)
 
 @persistent
 def post_save(scene, depsgraph):
     bpy.context.window_manager.auto_export_tracker.save_handler( scene, depsgraph)
 
+@persistent
+def post_undo_redo(scene, depsgraph):
+    AutoExportTracker.reset_caches()
+    BlueprintsRegistry.mark_dirty()
+
 @persistent
 def post_load(file_name):
+    AutoExportTracker.reset_caches()
+    BlueprintsRegistry.mark_dirty()
     blenvy = bpy.context.window_manager.blenvy
     if blenvy is not None:
         blenvy.load_settings()
@@ -168,6 +185,10 @@ def register():
     # for some reason, adding these directly to the tracker class in register() do not work reliably
     bpy.app.handlers.depsgraph_update_post.append(post_update)
     bpy.app.handlers.save_post.append(post_save)
+    bpy.app.handlers.undo_post.append(post_undo_redo)
+    bpy.app.handlers.redo_post.append(post_undo_redo)
+    add_project_change_listener(mark_project_changed)
+    add_project_change_listener(BlueprintsRegistry.mark_dirty)
 
     bpy.types.VIEW3D_MT_object.append(edit_or_create_blueprint_menu)
     bpy.types.VIEW3D_MT_object_context_menu.append(edit_or_create_blueprint_menu)
@@ -185,6 +206,10 @@ def unregister():
     bpy.app.handlers.load_post.remove(post_load)
     bpy.app.handlers.depsgraph_update_post.remove(post_update)
     bpy.app.handlers.save_post.remove(post_save)
+    bpy.app.handlers.undo_post.remove(post_undo_redo)
+    bpy.app.handlers.redo_post.remove(post_undo_redo)
+    remove_project_change_listener(mark_project_changed)
+    remove_project_change_listener(BlueprintsRegistry.mark_dirty)
 
 
     for km, kmi in addon_keymaps:
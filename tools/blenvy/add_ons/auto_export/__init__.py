@@ -4,8 +4,15 @@ import pathlib
 import bpy
 from ...settings import generate_complete_settings_dict
 from io_scene_gltf2 import ExportGLTF2_Base
+from .common.export_names import export_names
 
 
+# copies of objects in the temporary export scenes get the names of their originals back in the exported files, see export_names.py
+def gltf_gather_node_hook(gltf2_object, blender_object, export_settings):
+    export_name = export_names.export_name(blender_object.name)
+    if export_name is not None:
+        gltf2_object.name = export_name
+
 def cleanup_file():
     gltf_filepath = bpy.context.window_manager.auto_export_tracker.dummy_file_path
     if os.path.exists(gltf_filepath):
@@ -3,17 +3,19 @@ import bpy
 
 from ....core.helpers_collections import traverse_tree
 from ..common.duplicate_object import copy_animation_data
+from ..common.export_names import export_names
 from ..common.generate_temporary_scene_and_export import generate_temporary_scene_and_export
 from ..common.export_gltf import (generate_gltf_export_settings)
+from ..common.export_inputs import export_inputs
 
 def duplicate_object(object, destination_collection):
     copy = None    
     # for objects which are NOT collection instances or when embeding
     # we create a copy of our object and its children, to leave the original one as it is
     original_name = object.name
-    #object.name = original_name + "____bak"
     copy = object.copy()
-    copy.name = original_name
+    # the original keeps its name, the copy gets it in the exported file
+    export_names.register(copy, original_name, source=object)
 
 
     destination_collection.objects.link(copy)
@@ -26,7 +28,7 @@ def duplicate_object(object, destination_collection):
     #copy.hide_set(True)
 
 
-# clear & remove "hollow scene"
+# clear "hollow scene"
 def clear_animation_scene_alt(temp_scene):   
     # remove any data we created
     temp_root_collection = temp_scene.collection 
@@ -35,13 +37,6 @@ def clear_animation_scene_alt(temp_scene):
         #print("removing", object.name)
         bpy.data.objects.remove(object, do_unlink=True)
 
-    # remove the temporary scene
-    bpy.data.scenes.remove(temp_scene, do_unlink=True)
-    
-    # reset original names
-    for object in temp_root_collection.all_objects:
-        if object.name.endswith("____bak"):
-            object.name = object.name.replace("____bak", "")
 
 # generates a scene for a given animated object
 def generate_animation_scene_content(root_collection, animation):
@@ -61,8 +56,7 @@ def clear_animation_scene(temp_scene):
         try:
             bpy.data.objects.remove(object, do_unlink=True)
         except:pass
-
-    bpy.data.scenes.remove(temp_scene)
+    # the temporary scene itself is reused for the next exports, see generate_temporary_scene_and_export.py
 
 
 # exports the animations used inside the current project:
@@ -92,5 +86,6 @@ def export_animations(animations_to_export, settings, blueprints_data):
             temp_scene_name="__animation_scene"+ animation["armature"].name,
             gltf_output_path=gltf_output_path,
             tempScene_filler= lambda temp_collection: generate_animation_scene_content(temp_collection, animation),
-            tempScene_cleaner= lambda temp_scene, params: clear_animation_scene(temp_scene=temp_scene)
+            tempScene_cleaner= lambda temp_scene, params: clear_animation_scene(temp_scene=temp_scene),
+            inputs=export_inputs.animation(animation)
         )
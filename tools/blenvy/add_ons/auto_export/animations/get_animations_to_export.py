@@ -2,6 +2,7 @@
 
 import bpy
 import os
+from ....core.directory_listing import file_on_disk
 
 
 # TODO: move to helpers
@@ -11,7 +12,7 @@ def find_animations_not_on_disk(animations, animations_path_full, extension):
     for animation in animations:
         gltf_output_path = os.path.join(animations_path_full, animation["armature"].name + extension)
         # print("gltf_output_path", gltf_output_path)
-        found = os.path.exists(gltf_output_path) and os.path.isfile(gltf_output_path)
+        found = file_on_disk(gltf_output_path)
         if not found:
             not_found_animations.append(animation)
     return not_found_animations
@@ -4,6 +4,7 @@ from ....materials.materials_helpers import add_material_info_to_objects, get_bl
 from ..constants import TEMPSCENE_PREFIX
 from ..common.generate_temporary_scene_and_export import generate_temporary_scene_and_export, copy_hollowed_collection_into, clear_hollow_scene
 from ..common.export_gltf import generate_gltf_export_settings
+from ..common.export_inputs import export_inputs
 from ..utils import upsert_blueprint_assets, write_blueprint_metadata_file
 
 def export_blueprints(blueprints, settings, blueprints_data):
@@ -46,7 +47,8 @@ def export_blueprints(blueprints, settings, blueprints_data):
                 gltf_export_settings=gltf_export_settings,
                 gltf_output_path=gltf_output_path,
                 tempScene_filler= lambda temp_collection: copy_hollowed_collection_into(collection, temp_collection, blueprints_data=blueprints_data, settings=settings),
-                tempScene_cleaner= lambda temp_scene, params: clear_hollow_scene(original_root_collection=collection, temp_scene=temp_scene, **params)
+                tempScene_cleaner= lambda temp_scene, params: clear_hollow_scene(original_root_collection=collection, temp_scene=temp_scene, **params),
+                inputs=export_inputs.blueprint(blueprint)
             )
 
             #blueprint_asset_tree = get_blueprint_asset_tree(blueprint=blueprint, blueprints_data=blueprints_data, settings=settings)
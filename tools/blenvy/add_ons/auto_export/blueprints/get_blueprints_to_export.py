@@ -28,17 +28,19 @@ def get_blueprints_to_export(changes_per_scene, changes_per_collection, changed_
         for scene in settings.library_scenes:
             if scene.name in changes_per_scene:
                 changed_objects = list(changes_per_scene[scene.name].keys())
-                changed_blueprints = [blueprints_data.blueprints_from_objects[changed] for changed in changed_objects if changed in blueprints_data.blueprints_from_objects]
-                # we only care about local blueprints/collections
-                changed_local_blueprints = [blueprint for blueprint in changed_blueprints if blueprint.name in blueprints_data.blueprints_per_name.keys() and blueprint.local]
-                # FIXME: double check this: why are we combining these two ?
-                changed_blueprints += changed_local_blueprints
+                changed_blueprints += [blueprints_data.blueprints_from_objects[changed] for changed in changed_objects if changed in blueprints_data.blueprints_from_objects]
 
         # also deal with blueprints that are always marked as "always_export"
         blueprints_always_export = [blueprint for blueprint in internal_blueprints if is_blueprint_always_export(blueprint)]
         changed_blueprints_based_on_changed_collections = [blueprint for blueprint in internal_blueprints if blueprint.collection in changes_per_collection.values()]
 
-        blueprints_to_export =  list(set(changed_blueprints + blueprints_not_on_disk + blueprints_always_export + changed_blueprints_based_on_changed_collections))
+        # blueprints embedding changed blueprints (at any depth) need to be exported again too
+        changed_blueprint_names = [blueprint.name for blueprint in changed_blueprints + changed_blueprints_based_on_changed_collections]
+        invalidated_blueprints = [blueprints_data.blueprints_per_name[name] for name in blueprints_data.blueprints_graph.invalidate(changed_blueprint_names, collection_instances_combine_mode)]
+        # we only care about local blueprints/collections
+        invalidated_local_blueprints = [blueprint for blueprint in invalidated_blueprints if blueprint.local]
+
+        blueprints_to_export =  list(set(invalidated_local_blueprints + blueprints_not_on_disk + blueprints_always_export))
 
 
     # filter out blueprints that are not marked & deal with the different combine modes
@@ -58,6 +60,8 @@ def get_blueprints_to_export(changes_per_scene, changes_per_collection, changed_
 
         blueprints_to_export =  list(set(filtered_blueprints))
 
-    
+    # nested blueprints are exported before the blueprints containing them
+    blueprints_to_export = [blueprints_data.blueprints_per_name[name] for name in blueprints_data.blueprints_graph.topological_order([blueprint.name for blueprint in blueprints_to_export])]
+
     # changed/all blueprints to export     
     return (blueprints_to_export)
\ No newline at end of file
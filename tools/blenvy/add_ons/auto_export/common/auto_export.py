@@ -4,10 +4,16 @@ import bpy
 import traceback
 
 from ....blueprints.blueprint_helpers import inject_export_path_into_internal_blueprints
+from ....core.directory_listing import begin_export_run, end_export_run
 
 from ..blueprints.get_blueprints_to_export import get_blueprints_to_export
 from ..levels.get_levels_to_export import get_levels_to_export
 from .export_gltf import get_standard_exporter_settings
+from .export_manifest import export_manifest
+from .export_inputs import export_inputs
+from .export_workers import make_export_jobs, can_export_in_workers, run_export_workers
+from .export_report import export_report
+from .generate_temporary_scene_and_export import export_scene_pool
 
 from ..levels.export_levels import export_level_scene
 from ..blueprints.export_blueprints import export_blueprints
@@ -20,9 +26,13 @@ from ..animations.get_animations_to_export import get_animations_to_export
 from ..animations.export_animations import export_animations
 
 """this is the main 'central' function for all auto export """
-def auto_export(changes_per_scene, changes_per_collection, changes_per_material, changed_export_parameters, settings):
+# settings_fingerprint & project_snapshot: what the exported files depend on, if any: used to skip exports of files that are already up to date, see export_manifest.py & export_inputs.py
+def auto_export(changes_per_scene, changes_per_collection, changes_per_material, changed_export_parameters, settings, settings_fingerprint=None, project_snapshot=None):
     # have the export parameters (not auto export, just gltf export) have changed: if yes (for example switch from glb to gltf, compression or not, animations or not etc), we need to re-export everything
     print ("changed_export_parameters", changed_export_parameters)
+    # checks for already exported files use a single listing of each output folder for the whole run
+    begin_export_run()
+    export_manifest.begin_run(settings.assets_path_full, settings_fingerprint)
     try:
         #should we use change detection or not 
         change_detection = getattr(settings.auto_export, "change_detection")
@@ -37,10 +47,13 @@ def auto_export(changes_per_scene, changes_per_collection, changes_per_material,
         gltf_extension = '.glb' if gltf_extension == 'GLB' else '.gltf'
         settings.export_gltf_extension = gltf_extension
 
-        blueprints_data = bpy.context.window_manager.blueprints_registry.refresh_blueprints()
+        # in background mode (scripts, tests etc) we might not get notified of changes, so always rescan
+        with export_report.stage("blueprints_scan"):
+            blueprints_data = bpy.context.window_manager.blueprints_registry.refresh_blueprints(force=bpy.app.background)
         #blueprints_data = bpy.context.window_manager.blueprints_registry.blueprints_data
         #print("blueprints_data", blueprints_data)
         blueprints_per_scene = blueprints_data.blueprints_per_scenes
+        export_inputs.begin_run(project_snapshot if settings_fingerprint is not None else None, blueprints_data, getattr(settings.auto_export, "collection_instances_combine_mode"))
         internal_blueprints = [blueprint.name for blueprint in blueprints_data.internal_blueprints]
         external_blueprints = [blueprint.name for blueprint in blueprints_data.external_blueprints]
 
@@ -66,18 +79,19 @@ def auto_export(changes_per_scene, changes_per_collection, changes_per_material,
         # export
         if export_blueprints_enabled:
             print("EXPORTING")
-            # get blueprints/collections infos
-            (blueprints_to_export) = get_blueprints_to_export(changes_per_scene, changes_per_collection, changed_export_parameters, blueprints_data, settings)
+            with export_report.stage("plan"):
+                # get blueprints/collections infos
+                (blueprints_to_export) = get_blueprints_to_export(changes_per_scene, changes_per_collection, changed_export_parameters, blueprints_data, settings)
              
-            # get level scenes infos
-            (level_scenes_to_export) = get_levels_to_export(changes_per_scene, changes_per_collection, changed_export_parameters, blueprints_data, settings)
+                # get level scenes infos
+                (level_scenes_to_export) = get_levels_to_export(changes_per_scene, changes_per_collection, changed_export_parameters, blueprints_data, settings)
 
-            # since materials export adds components we need to call this before blueprints are exported
-            # export materials & inject materials components into relevant objects
-            materials_to_export = get_materials_to_export(changes_per_material, changed_export_parameters, blueprints_data, settings)    
+                # since materials export adds components we need to call this before blueprints are exported
+                # export materials & inject materials components into relevant objects
+                materials_to_export = get_materials_to_export(changes_per_material, changed_export_parameters, blueprints_data, settings)    
 
-            # since seperate animation exports also changes blueprint exports we need to call this before blueprints are exported
-            animations_to_export = get_animations_to_export(changes_per_scene, changed_export_parameters, blueprints_data, settings)    
+                # since seperate animation exports also changes blueprint exports we need to call this before blueprints are exported
+                animations_to_export = get_animations_to_export(changes_per_scene, changed_export_parameters, blueprints_data, settings)    
             
             # update the list of tracked exports
             exports_total = len(blueprints_to_export) + len(level_scenes_to_export) + (1 if split_out_materials else 0)
@@ -106,36 +120,62 @@ def auto_export(changes_per_scene, changes_per_collection, changes_per_material,
             # backup current selections
             old_selections = bpy.context.selected_objects
         
-            # deal with materials
-            if split_out_materials and (not change_detection or changed_export_parameters or len(materials_to_export) > 0) :
-                print("export MATERIALS")
-                export_materials(materials_to_export, settings, blueprints_data)
-
-            # and animations
-            if split_out_animations and (not change_detection or changed_export_parameters or len(animations_to_export) > 0):
-                print("export ANIMATIONS")
-                export_animations(animations_to_export, settings, blueprints_data)
-
-            # export any level/world scenes
-            if not change_detection or changed_export_parameters or len(level_scenes_to_export) > 0:
-                print("export LEVELS")
-                for scene_name in level_scenes_to_export:
-                    print("     exporting scene:", scene_name)
-                    export_level_scene(bpy.data.scenes[scene_name], settings, blueprints_data)
-
-            # now deal with blueprints/collections
-            if not change_detection or changed_export_parameters or len(blueprints_to_export) > 0:
-                print("export BLUEPRINTS")
-                export_blueprints(blueprints_to_export, settings, blueprints_data)
-
-            # reset current scene from backup
-            bpy.context.window.scene = old_current_scene
-
-            # reset selections
-            for obj in old_selections:
-                obj.select_set(True)
-            if split_out_materials:
-                cleanup_materials(blueprints_data.blueprint_names, settings.library_scenes)
+            # whatever happens (ie failed exports), the project is restored: active scene, selections & injected material components
+            try:
+                # the same exports as below, split between several background Blender processes
+                export_jobs = make_export_jobs(
+                    blueprints=blueprints_to_export,
+                    level_scene_names=level_scenes_to_export,
+                    materials=materials_to_export if split_out_materials else [],
+                    animations=animations_to_export if split_out_animations else []
+                )
+                if can_export_in_workers(settings, export_jobs):
+                    with export_report.stage("export_workers"):
+                        results = run_export_workers(export_jobs, settings, getattr(settings.auto_export, "export_workers"))
+                    failed = [result for result in results if not result["ok"]]
+                    if len(failed) > 0:
+                        raise Exception(f"{len(failed)} of {len(results)} exports failed: " + ", ".join(result["name"] for result in failed))
+                else:
+                    # a single temporary scene for all the exports below, with the context only switched once, see generate_temporary_scene_and_export.py
+                    export_scene_pool.begin_run()
+                    try:
+                        # deal with materials
+                        if split_out_materials and (not change_detection or changed_export_parameters or len(materials_to_export) > 0) :
+                            print("export MATERIALS")
+                            with export_report.stage("export_materials"):
+                                export_materials(materials_to_export, settings, blueprints_data)
+
+                        # and animations
+                        if split_out_animations and (not change_detection or changed_export_parameters or len(animations_to_export) > 0):
+                            print("export ANIMATIONS")
+                            with export_report.stage("export_animations"):
+                                export_animations(animations_to_export, settings, blueprints_data)
+
+                        # export any level/world scenes
+                        if not change_detection or changed_export_parameters or len(level_scenes_to_export) > 0:
+                            print("export LEVELS")
+                            with export_report.stage("export_levels"):
+                                for scene_name in level_scenes_to_export:
+                                    print("     exporting scene:", scene_name)
+                                    export_level_scene(bpy.data.scenes[scene_name], settings, blueprints_data)
+
+                        # now deal with blueprints/collections
+                        if not change_detection or changed_export_parameters or len(blueprints_to_export) > 0:
+                            print("export BLUEPRINTS")
+                            with export_report.stage("export_blueprints"):
+                                export_blueprints(blueprints_to_export, settings, blueprints_data)
+                    finally:
+                        export_scene_pool.end_run()
+            finally:
+                # reset current scene from backup (there is no window in background mode)
+                if bpy.context.window is not None:
+                    bpy.context.window.scene = old_current_scene
+
+                # reset selections
+                for obj in old_selections:
+                    obj.select_set(True)
+                if split_out_materials:
+                    cleanup_materials(blueprints_data.blueprint_names, settings.library_scenes)
 
         else:
             for scene in settings.level_scenes:
@@ -145,13 +185,19 @@ def auto_export(changes_per_scene, changes_per_collection, changes_per_material,
 
     except Exception as error:
         print(traceback.format_exc())
+        export_report.error(str(error))
 
         def error_message(self, context):
             self.layout.label(text="Failure during auto_export: Error: "+ str(error))
 
-        bpy.context.window_manager.popup_menu(error_message, title="Error", icon='ERROR')
+        # no one to show it to in background mode
+        if not bpy.app.background:
+            bpy.context.window_manager.popup_menu(error_message, title="Error", icon='ERROR')
 
     finally:
+        export_manifest.end_run()
+        export_inputs.end_run()
+        end_export_run()
         # FIXME: error handling ? also redundant
         if match_blender_visuals:
             # inject/ update scene components
@@ -0,0 +1,102 @@
+import time
+import bpy
+from .hash_cache import datablock_key
+from .serialize_project import custom_properties_fingerprint
+
+# journal of the changes reported by the depsgraph since the last export
+# depsgraph updates come in at a high rate (every tick while dragging a slider, moving an object etc), so instead of doing any work for each of them:
+#  - updates are only recorded as pending, repeated updates to the same datablock (within the flush window) are coalesced into a single entry
+#  - pending updates are flushed into the (append only) list of entries by a timer
+# entries only store ids (session_uid, names), never the datablocks themselves, as python references become invalid on undo/redo etc
+FLUSH_WINDOW = 0.2 # seconds
+
+class ChangeEntry:
+    def __init__(self, key, type_name, name, scene_name, first_seen):
+        self.key = key # (type name, session_uid)
+        self.type_name = type_name
+        self.name = name
+        self.scene_name = scene_name
+        self.first_seen = first_seen
+        self.updates = 0 # number of coalesced updates
+
+class ChangeJournal:
+    def __init__(self):
+        self.pending = {} # key => ChangeEntry
+        self.entries = []
+        self.flush_scheduled = False
+        self.last_flush_latency = 0.0 # time between the oldest pending update and its flush, in seconds
+        self.max_flush_latency = 0.0
+        # set after an export, with the context it was done in (see mark_exported), and dropped by any change
+        self.clean_context = None
+
+    def record(self, key, type_name, name, scene_name, now=None):
+        entry = self.pending.get(key, None)
+        if entry is None:
+            entry = ChangeEntry(key, type_name, name, scene_name, time.perf_counter() if now is None else now)
+            self.pending[key] = entry
+        entry.name = name # the last name wins, in case of renames
+        entry.updates += 1
+        self.clean_context = None
+
+    # for changes the depsgraph does not report (ie custom properties written from python)
+    def mark_dirty(self):
+        self.clean_context = None
+
+    def flush(self, now=None):
+        if len(self.pending) == 0:
+            return
+        now = time.perf_counter() if now is None else now
+        self.last_flush_latency = now - min(entry.first_seen for entry in self.pending.values())
+        self.max_flush_latency = max(self.max_flush_latency, self.last_flush_latency)
+        self.entries += self.pending.values()
+        self.pending.clear()
+
+    def mark_exported(self, context):
+        self.flush()
+        self.entries.clear()
+        self.clean_context = context
+
+    # nothing at all was reported since the last export (done in the same context)
+    def is_clean(self, context):
+        return self.clean_context is not None and self.clean_context == context and len(self.pending) == 0 and len(self.entries) == 0
+
+    def clear(self):
+        self.pending.clear()
+        self.entries.clear()
+        self.clean_context = None
+
+    def stats(self):
+        return {"entries": len(self.entries), "pending": len(self.pending), "last_flush_latency": self.last_flush_latency, "max_flush_latency": self.max_flush_latency}
+
+    def __len__(self):
+        return len(self.entries) + len(self.pending)
+
+change_journal = ChangeJournal()
+
+def flush_change_journal():
+    change_journal.flush_scheduled = False
+    change_journal.flush()
+    return None
+
+# called by the tracker for each depsgraph update
+def record_update(update, scene_name):
+    record_datablock(update.id.original, scene_name)
+
+def record_datablock(datablock, scene_name):
+    type_name = type(datablock).__name__
+    change_journal.record((type_name, datablock_key(datablock)), type_name, datablock.name, scene_name)
+    if not change_journal.flush_scheduled:
+        change_journal.flush_scheduled = True
+        bpy.app.timers.register(flush_change_journal, first_interval=FLUSH_WINDOW)
+
+# changes made outside of the depsgraph's knowledge: components added/removed/edited through the bevy_components operators (notified through core.project_changes), verify_all etc
+def mark_project_changed():
+    change_journal.mark_dirty()
+
+# what the last export depended on, besides the datablocks themselves
+# writing custom properties from python does not trigger depsgraph updates, so they are always checked
+def export_context(settings):
+    return (tuple(scene.name for scene in settings.level_scenes), tuple(scene.name for scene in settings.library_scenes), custom_properties_fingerprint(settings))
+
+def clear_change_journal():
+    change_journal.clear()
@@ -0,0 +1,46 @@
+import time
+import bpy
+
+from .prepare_and_export import prepare_and_export
+from .export_report import export_report
+
+# exports the currently loaded project without any user interface, see export_cli.py
+# the options only apply to this export: they are not stored in the project's settings
+#  - full: export everything, instead of only what changed since the last export
+#  - dry_run: go through the whole process, without writing any gltf file
+#  - output_dir: assets folder to export to, instead of the one in the project's settings
+#  - workers: number of export workers (see export_workers.py), instead of the one in the project's settings
+def run_command_line_export(full=False, dry_run=False, output_dir=None, workers=None):
+    start = time.perf_counter()
+    blenvy = bpy.context.window_manager.blenvy
+    auto_export_settings = blenvy.auto_export
+    # the add-on might only have been enabled after the project was loaded
+    blenvy.load_settings()
+
+    blenvy.settings_save_enabled = False
+    auto_export_settings.settings_save_enabled = False
+    auto_export_settings.auto_export = True
+    if full:
+        auto_export_settings.change_detection = False
+    auto_export_settings.dry_run = "NO_EXPORT" if dry_run else "DISABLED"
+    if output_dir is not None:
+        # the other paths (blueprints, levels etc) are relative to the assets folder
+        blenvy.assets_path = output_dir
+    if workers is not None:
+        auto_export_settings.export_workers = workers
+
+    prepare_and_export()
+    if len(blenvy.level_scenes) == 0 and len(blenvy.library_scenes) == 0:
+        export_report.error("no level or library scenes, nothing to export")
+
+    report = export_report.to_dict()
+    report.update({
+        "blend_file": bpy.data.filepath,
+        "blender_version": bpy.app.version_string,
+        "mode": "full" if full else "incremental",
+        "dry_run": dry_run,
+        "workers": auto_export_settings.export_workers,
+        "assets_path": blenvy.assets_path_full,
+        "duration": time.perf_counter() - start,
+    })
+    return report
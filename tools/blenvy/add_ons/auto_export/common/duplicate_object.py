@@ -4,6 +4,102 @@ from ....core.object_makers import make_empty
 from ...bevy_components.utils import is_component_valid_and_enabled
 from ..constants import custom_properties_to_filter_out
 from ..utils import remove_unwanted_custom_properties
+from .export_names import export_names
+
+# generated AnimationInfos & AnimationMarkers components, per set of (action, animation name): objects using the same actions share them
+# actions can change between exports, so this is only kept for the duration of an export run (see ExportScenePool)
+animation_components_cache = {}
+
+def clear_animation_components_cache():
+    animation_components_cache.clear()
+
+def animation_components(blender_actions, blender_tracks):
+    key = tuple((action.name_full, blender_tracks[action.name]) for action in blender_actions)
+    components = animation_components_cache.get(key, None)
+    if components is not None:
+        return components
+
+    markers_per_animation = {}
+    animations_infos = []
+
+    for action in blender_actions:
+        animation_name = blender_tracks[action.name]
+        animations_infos.append(
+            f'(name: "{animation_name}", frame_start: {action.frame_range[0]}, frame_end: {action.frame_range[1]}, frames_length: {action.frame_range[1] - action.frame_range[0]}, frame_start_override: {action.frame_start}, frame_end_override: {action.frame_end})'
+        )
+        markers_per_animation[animation_name] = {}
+
+        for marker in action.pose_markers:
+            if marker.frame not in markers_per_animation[animation_name]:
+                markers_per_animation[animation_name][marker.frame] = []
+            markers_per_animation[animation_name][marker.frame].append(marker.name)
+
+    # we add an "AnimationInfos" component 
+    animation_infos_component = f'(animations: {animations_infos})'.replace("'","")
+
+    # and animation markers
+    markers_formated = '{'
+    for animation in markers_per_animation.keys():
+        markers_formated += f'"{animation}":'
+        markers_formated += "{"
+        for frame in markers_per_animation[animation].keys():
+            markers = markers_per_animation[animation][frame]
+            markers_formated += f"{frame}:{markers}, ".replace("'", '"')
+        markers_formated += '}, '             
+    markers_formated += '}' 
+    animation_markers_component = f'( {markers_formated} )'
+
+    components = (animation_infos_component, animation_markers_component)
+    animation_components_cache[key] = components
+    return components
+
+# same as bpy.ops.object.make_links_data(type='ANIMATION'), ie the target uses the same actions as the source (they are not copied), but without going through an operator
+# (operators are slow, need a specific context & add to the undo stack)
+# only action strips are supported in NLA tracks, drivers are not linked
+def link_animation_data(source, target):
+    source_data = source.animation_data
+    if target.animation_data is not None:
+        target.animation_data_clear()
+    target_data = target.animation_data_create()
+
+    target_data.action = source_data.action
+    if hasattr(source_data, "action_slot"): # slotted actions (Blender 4.4+)
+        target_data.action_slot = source_data.action_slot
+    target_data.action_blend_type = source_data.action_blend_type
+    target_data.action_extrapolation = source_data.action_extrapolation
+    target_data.action_influence = source_data.action_influence
+    target_data.use_nla = source_data.use_nla
+
+    for track in source_data.nla_tracks:
+        target_track = target_data.nla_tracks.new()
+        target_track.name = track.name
+        target_track.mute = track.mute
+        target_track.lock = track.lock
+        for strip in track.strips:
+            if strip.type != 'CLIP' or strip.action is None:
+                continue
+            target_strip = target_track.strips.new(strip.name, int(strip.frame_start), strip.action)
+            if hasattr(strip, "action_slot"):
+                target_strip.action_slot = strip.action_slot
+            # the order matters: the frame range of the strip is computed from the ones of its action, its scale & repeats
+            target_strip.action_frame_start = strip.action_frame_start
+            target_strip.action_frame_end = strip.action_frame_end
+            target_strip.scale = strip.scale
+            target_strip.repeat = strip.repeat
+            target_strip.frame_start = strip.frame_start
+            target_strip.frame_end = strip.frame_end
+            target_strip.blend_type = strip.blend_type
+            target_strip.extrapolation = strip.extrapolation
+            target_strip.use_auto_blend = strip.use_auto_blend
+            target_strip.blend_in = strip.blend_in
+            target_strip.blend_out = strip.blend_out
+            target_strip.use_reverse = strip.use_reverse
+            target_strip.use_animated_influence = strip.use_animated_influence
+            target_strip.influence = strip.influence
+            target_strip.use_sync_length = strip.use_sync_length
+            target_strip.mute = strip.mute
+        if track.is_solo:
+            target_track.is_solo = True
 
 # TODO: rename actions ?
 # reference https://github.com/KhronosGroup/glTF-Blender-IO/blob/main/addons/io_scene_gltf2/blender/exp/animation/gltf2_blender_gather_action.py#L481
@@ -26,50 +122,12 @@ def copy_animation_data(source, target):
         blender_actions = list(set(blender_actions))
         # sort animations alphabetically (case insensitive) so they have a defined order and match Blender's Action list
         blender_actions.sort(key = lambda a: a.name.lower())
-        
-        markers_per_animation = {}
-        animations_infos = []
-
-        for action in blender_actions:
-            animation_name = blender_tracks[action.name]
-            animations_infos.append(
-                f'(name: "{animation_name}", frame_start: {action.frame_range[0]}, frame_end: {action.frame_range[1]}, frames_length: {action.frame_range[1] - action.frame_range[0]}, frame_start_override: {action.frame_start}, frame_end_override: {action.frame_end})'
-            )
-            markers_per_animation[animation_name] = {}
-
-            for marker in action.pose_markers:
-                if marker.frame not in markers_per_animation[animation_name]:
-                    markers_per_animation[animation_name][marker.frame] = []
-                markers_per_animation[animation_name][marker.frame].append(marker.name)
-
-        # best method, using the built-in link animation operator
-        with bpy.context.temp_override(active_object=source, selected_editable_objects=[target]): 
-            bpy.ops.object.make_links_data(type='ANIMATION')
-        
-        """if target.animation_data == None:
-            target.animation_data_create()
-        target.animation_data.action = source.animation_data.action.copy()
-
-        print("copying animation data for", source.name, target.animation_data)
-        properties = [p.identifier for p in source.animation_data.bl_rna.properties if not p.is_readonly]
-        for prop in properties:
-            print("copying stuff", prop)
-            setattr(target.animation_data, prop, getattr(source.animation_data, prop))"""
-        
-        # we add an "AnimationInfos" component 
-        target['AnimationInfos'] = f'(animations: {animations_infos})'.replace("'","")
-        
-        # and animation markers
-        markers_formated = '{'
-        for animation in markers_per_animation.keys():
-            markers_formated += f'"{animation}":'
-            markers_formated += "{"
-            for frame in markers_per_animation[animation].keys():
-                markers = markers_per_animation[animation][frame]
-                markers_formated += f"{frame}:{markers}, ".replace("'", '"')
-            markers_formated += '}, '             
-        markers_formated += '}' 
-        target["AnimationMarkers"] = f'( {markers_formated} )'
+
+        link_animation_data(source, target)
+
+        (animation_infos_component, animation_markers_component) = animation_components(blender_actions, blender_tracks)
+        target['AnimationInfos'] = animation_infos_component
+        target["AnimationMarkers"] = animation_markers_component
         
 def duplicate_object(object, parent, combine_mode, destination_collection, blueprints_data, nester=""):
     copy = None
@@ -84,8 +142,9 @@ def duplicate_object(object, parent, combine_mode, destination_collection, bluep
         blueprint_path = original_collection['export_path'] if 'export_path' in original_collection else f'./{blueprint_name}' # TODO: the default requires the currently used extension !!
 
 
-        object.name = original_name + "____bak"
         empty_obj = make_empty(original_name, object.location, object.rotation_euler, object.scale, destination_collection)
+        # the original keeps its name, the empty gets it in the exported file
+        export_names.register(empty_obj, original_name, source=object)
         
         """we inject the collection/blueprint name & path, as a component called 'BlueprintInfo', but we only do this in the empty, not the original object"""
         empty_obj['SpawnBlueprint'] = '()'
@@ -100,9 +159,9 @@ def duplicate_object(object, parent, combine_mode, destination_collection, bluep
         # for objects which are NOT collection instances or when embeding
         # we create a copy of our object and its children, to leave the original one as it is
         original_name = object.name
-        object.name = original_name + "____bak"
         copy = object.copy()
-        copy.name = original_name
+        # the original keeps its name, the copy gets it in the exported file
+        export_names.register(copy, original_name, source=object)
 
         destination_collection.objects.link(copy)
 
@@ -3,6 +3,9 @@ import os
 import bpy
 
 from ....settings import load_settings
+from ....core.directory_listing import file_written
+from .export_manifest import export_manifest
+from .export_report import export_report
 
 def get_standard_exporter_settings():
     standard_gltf_exporter_settings = load_settings(".blenvy_gltf_settings")
@@ -78,9 +81,34 @@ def generate_gltf_export_settings(settings):
 
 
 #https://docs.blender.org/api/current/bpy.ops.export_scene.html#bpy.ops.export_scene.gltf
-def export_gltf (path, gltf_export_settings):
+# inputs: digest of the data the file is exported from, see export_inputs.py
+def export_gltf (path, gltf_export_settings, inputs=None):
     settings = {**gltf_export_settings, "filepath": path}
     # print("export settings",settings)
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    bpy.ops.export_scene.gltf(**settings)
+    output_path = gltf_output_file_path(path, gltf_export_settings)
+    # separate .gltf/.bin files reference each other by name, so they cannot be written under another name first
+    if settings.get('export_format', 'GLB') != 'GLTF_SEPARATE':
+        # export to a temporary file, and only replace the actual file if the content changed
+        temporary_path = export_manifest.temporary_path(path)
+        bpy.ops.export_scene.gltf(**{**settings, "filepath": temporary_path})
+        if export_manifest.replace_if_changed(gltf_output_file_path(temporary_path, gltf_export_settings), output_path, gltf_export_settings, inputs):
+            print("       written", output_path)
+            export_report.file(output_path, 'WRITTEN')
+        else:
+            print("       unchanged", output_path)
+            export_report.file(output_path, 'UNCHANGED')
+    else:
+        bpy.ops.export_scene.gltf(**settings)
+        export_manifest.record_written(output_path, gltf_export_settings, inputs)
+        export_report.file(output_path, 'WRITTEN')
+    file_written(output_path)
+
+# path: without the extension, as given to the gltf exporter
+def gltf_output_file_path(path, gltf_export_settings):
+    return path + ('.glb' if gltf_export_settings.get('export_format', 'GLB') == 'GLB' else '.gltf')
+
+# nothing that could change the exported file has changed since it was written
+def is_gltf_export_up_to_date(path, gltf_export_settings, inputs=None):
+    return export_manifest.is_up_to_date(gltf_output_file_path(path, gltf_export_settings), gltf_export_settings, inputs)
 
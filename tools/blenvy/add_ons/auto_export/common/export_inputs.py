@@ -0,0 +1,120 @@
+from ....blueprints.blueprints_graph import is_embedded
+from ..blueprints.get_blueprints_to_export import is_blueprint_always_export
+from ..levels.get_levels_to_export import is_level_always_export
+from .serialize_project import child_hash, digest_of
+from .stable_ids import stable_key
+
+# digests of the parts of the serialized project (see serialize_project.py) each exported file is made from, used by the export manifest
+# to skip exports of files whose own inputs did not change, even if other parts of the project did:
+#  - blueprint: its collection & all of its objects, plus the blueprints it nests: fully if they are embedded, only their collection if they are referenced
+#  - level: its scene (all of its objects), plus the blueprints it instances, likewise
+#  - material: the material (including its node tree)
+#  - animation: the armature object & the objects it animates
+# a digest of None means the file always gets exported: blueprints & levels marked as "always_export", anything missing from the snapshot etc
+class ExportInputs:
+    def __init__(self):
+        self.snapshot = None
+        self.blueprints_data = None
+        self.combine_mode = None
+        self.digests = {} # (kind, name) => digest
+        self.object_digests = None # object stable key => digest, for all the serialized scenes
+        self.visiting = set() # blueprints being digested, to deal with blueprints nesting each other
+
+    # snapshot: the serialized project, None to never skip any export
+    # digests: already computed digests (ie by the main process, for export workers)
+    def begin_run(self, snapshot, blueprints_data, combine_mode, digests=None):
+        self.snapshot = snapshot
+        self.blueprints_data = blueprints_data
+        self.combine_mode = combine_mode
+        self.digests = dict(digests) if digests is not None else {}
+        self.object_digests = None
+        self.visiting = set()
+
+    def end_run(self):
+        self.begin_run(None, None, None)
+
+    def cached(self, kind, name, compute):
+        key = (kind, name)
+        if not key in self.digests:
+            self.digests[key] = compute() if self.snapshot is not None else None
+        return self.digests[key]
+
+    def group(self, group_name):
+        return self.snapshot["children"][group_name]["children"]
+
+    def object_digest(self, object):
+        if self.object_digests is None:
+            self.object_digests = {}
+            for scene_node in self.group("scenes").values():
+                for (key, child) in scene_node["children"].items():
+                    self.object_digests[key] = child_hash(child)
+        return self.object_digests.get(stable_key(object), None)
+
+    def collection_digest(self, collection):
+        child = self.group("collections").get(stable_key(collection), None)
+        return child_hash(child) if child is not None else None
+
+    # the digest of a nested blueprint, as seen from a file containing instances of it
+    def nested_digest(self, nested_blueprint_name, instances):
+        nested_blueprint = self.blueprints_data.blueprints_per_name.get(nested_blueprint_name, None)
+        if nested_blueprint is None or nested_blueprint.collection is None:
+            return None
+        if any(is_embedded(instance, nested_blueprint, self.combine_mode) for instance in instances):
+            if nested_blueprint_name in self.visiting:
+                return nested_blueprint_name
+            # unlike the blueprint's own file, files embedding it do not need to be exported every time if it is marked as "always_export"
+            return self.cached('EMBEDDED_BLUEPRINT', nested_blueprint_name, lambda: self.blueprint_digest(nested_blueprint))
+        return self.collection_digest(nested_blueprint.collection)
+
+    # digests of all the parts, or None if any of them is missing
+    def digest_parts(self, parts):
+        if any(part is None for (_, part) in parts):
+            return None
+        return digest_of(parts)
+
+    def blueprint_digest(self, blueprint):
+        collection = blueprint.collection
+        self.visiting.add(blueprint.name)
+        try:
+            parts = [(collection.name, self.collection_digest(collection))]
+            parts += [(object.name, self.object_digest(object)) for object in sorted(collection.all_objects, key=lambda object: object.name)]
+            parts += [(nested_blueprint_name, self.nested_digest(nested_blueprint_name, instances)) for (nested_blueprint_name, instances) in sorted(blueprint.nested_instances.items())]
+        finally:
+            self.visiting.discard(blueprint.name)
+        return self.digest_parts(parts)
+
+    def blueprint(self, blueprint):
+        if is_blueprint_always_export(blueprint):
+            return None
+        return self.cached('BLUEPRINT', blueprint.name, lambda: self.blueprint_digest(blueprint))
+
+    def level(self, scene):
+        def compute():
+            scene_node = self.group("scenes").get(stable_key(scene), None)
+            parts = [(scene.name, child_hash(scene_node) if scene_node is not None else None)]
+            blueprint_instances = self.blueprints_data.blueprint_instances_per_level_scene.get(scene.name, {})
+            parts += [(blueprint_name, self.nested_digest(blueprint_name, instances)) for (blueprint_name, instances) in sorted(blueprint_instances.items())]
+            return self.digest_parts(parts)
+        if is_level_always_export(scene.name):
+            return None
+        return self.cached('LEVEL', scene.name, compute)
+
+    # levels exported without blueprints contain everything they instance, at any depth: they depend on the whole project
+    def whole_level(self, scene):
+        if is_level_always_export(scene.name):
+            return None
+        return self.cached('LEVEL', scene.name, lambda: self.snapshot["hash"])
+
+    def material(self, material):
+        def compute():
+            child = self.group("materials").get(stable_key(material), None)
+            return self.digest_parts([(material.name, child_hash(child) if child is not None else None)])
+        return self.cached('MATERIAL', material.name, compute)
+
+    def animation(self, animation):
+        def compute():
+            objects = [animation["armature_object"]] + sorted(animation["objects"], key=lambda object: object.name)
+            return self.digest_parts([(object.name, self.object_digest(object)) for object in objects])
+        return self.cached('ANIMATION', animation["armature"].name, compute)
+
+export_inputs = ExportInputs()
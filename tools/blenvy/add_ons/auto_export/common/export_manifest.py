@@ -0,0 +1,179 @@
+import errno
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from .streaming_hasher import StreamingHasher
+
+# manifest of the exported files, stored beside the assets folder (see manifest_path)
+# for each exported file, it records:
+#  - a fingerprint of the inputs it was exported from: the settings, the gltf export settings, and the part of the serialized project it was exported from (see export_inputs.py)
+#  - the hash of its content, together with its size & modification time, to tell whether the file was changed/removed since
+# this lets us:
+#  - skip exports entirely if nothing changed since the file was written (ie when everything gets exported because the file was not known to be up to date)
+#  - skip replacing files whose content would be identical, so that Bevy does not hot reload them, & anything downstream does not see a change
+MANIFEST_FILE_NAME = "blenvy_export_manifest.json"
+MANIFEST_VERSION = 2
+TEMPORARY_FILE_PREFIX = ".blenvy_tmp_"
+
+# beside the assets folder rather than inside it: it must not ship with the game's assets, nor be seen by Bevy's asset watcher
+# the name of the assets folder is part of the file name, for projects with several assets folders side by side
+def manifest_path(assets_path):
+    assets_path = os.path.abspath(assets_path)
+    return os.path.join(os.path.dirname(assets_path), f".{os.path.basename(assets_path)}.{MANIFEST_FILE_NAME}")
+
+def content_hash(path):
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+class ExportManifest:
+    def __init__(self):
+        self.assets_path = None # set during export runs only
+        self.entries = {} # output path, relative to the assets folder => {"inputs", "content", "size", "mtime"}
+        self.settings_fingerprint = None
+        self.dirty = False
+        self.recorded = set() # keys of the entries recorded since the last call to take_recorded
+        self.temporary_folder = None # created beside the assets folder on first use, see temporary_path
+
+    # settings_fingerprint: hash of the settings all exported files depend on, None to never skip any export
+    def begin_run(self, assets_path, settings_fingerprint):
+        self.assets_path = assets_path
+        self.settings_fingerprint = settings_fingerprint
+        self.entries = {}
+        self.dirty = False
+        self.recorded = set()
+        self.temporary_folder = None
+        try:
+            with open(manifest_path(assets_path)) as manifest_file:
+                manifest = json.load(manifest_file)
+            if manifest.get("version", None) == MANIFEST_VERSION:
+                self.entries = manifest["entries"]
+        except FileNotFoundError:
+            pass
+        except Exception as error:
+            print("failed to load the export manifest, ignoring it. Error:", error)
+
+    def end_run(self):
+        if self.assets_path is not None and self.dirty:
+            os.makedirs(os.path.dirname(manifest_path(self.assets_path)), exist_ok=True)
+            with open(manifest_path(self.assets_path), "w") as manifest_file:
+                json.dump({"version": MANIFEST_VERSION, "entries": self.entries}, manifest_file, indent=1, sort_keys=True)
+            # previous versions stored it inside the assets folder
+            previous_manifest_path = os.path.join(self.assets_path, MANIFEST_FILE_NAME)
+            if os.path.isfile(previous_manifest_path):
+                os.remove(previous_manifest_path)
+        if self.temporary_folder is not None:
+            shutil.rmtree(self.temporary_folder, ignore_errors=True)
+        self.temporary_folder = None
+        self.assets_path = None
+        self.settings_fingerprint = None
+        self.entries = {}
+        self.dirty = False
+        self.recorded = set()
+
+    def key(self, path):
+        return os.path.relpath(os.path.abspath(path), os.path.abspath(self.assets_path)).replace(os.sep, "/")
+
+    # where to export a file before it replaces the actual one (see replace_if_changed): outside of the assets folder, so that Bevy does not
+    # pick up temporary files, but beside it, so that it is most likely on the same drive & the file can be moved in place atomically
+    # path: the path of the actual file, without extension, as given to the gltf exporter
+    def temporary_path(self, path):
+        if self.assets_path is None:
+            return os.path.join(os.path.dirname(path), TEMPORARY_FILE_PREFIX + os.path.basename(path))
+        if self.temporary_folder is None:
+            self.temporary_folder = tempfile.mkdtemp(prefix=TEMPORARY_FILE_PREFIX, dir=os.path.dirname(os.path.abspath(self.assets_path)))
+        # flattened, as levels & blueprints etc can have the same names
+        return os.path.join(self.temporary_folder, self.key(path).replace("/", "__"))
+
+    # inputs: digest of the data the file is exported from (see export_inputs.py), None if it should always be exported
+    def inputs_fingerprint(self, path, extra_inputs, inputs):
+        if self.assets_path is None or self.settings_fingerprint is None or inputs is None:
+            return None
+        return StreamingHasher().update((self.settings_fingerprint, self.key(path), extra_inputs, inputs)).hexdigest()
+
+    # the entry for the file, if the file on disk is still the one we wrote
+    def current_entry(self, path):
+        if self.assets_path is None:
+            return None
+        entry = self.entries.get(self.key(path), None)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return entry if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime"] else None
+
+    def is_up_to_date(self, path, extra_inputs, inputs=None):
+        fingerprint = self.inputs_fingerprint(path, extra_inputs, inputs)
+        entry = self.current_entry(path)
+        return fingerprint is not None and entry is not None and entry["inputs"] == fingerprint
+
+    def record(self, path, inputs, content):
+        if self.assets_path is None:
+            return
+        stat = os.stat(path)
+        key = self.key(path)
+        self.entries[key] = {"inputs": inputs, "content": content, "size": stat.st_size, "mtime": stat.st_mtime_ns}
+        self.recorded.add(key)
+        self.dirty = True
+
+    # export workers do not save the manifest themselves: they send the entries they recorded back to the main process, which merges them
+    def take_recorded(self):
+        recorded = {key: self.entries[key] for key in self.recorded}
+        self.recorded = set()
+        return recorded
+
+    def merge(self, entries):
+        if self.assets_path is None or len(entries) == 0:
+            return
+        self.entries.update(entries)
+        self.dirty = True
+
+    # moves the freshly written file at temporary_path to path, unless the content is identical, in which case the existing file is left untouched
+    # returns True if the file was replaced
+    def replace_if_changed(self, temporary_path, path, extra_inputs, inputs=None):
+        fingerprint = self.inputs_fingerprint(path, extra_inputs, inputs)
+        new_content = content_hash(temporary_path)
+        entry = self.current_entry(path)
+        if entry is not None:
+            old_content = entry["content"]
+        else:
+            old_content = content_hash(path) if os.path.isfile(path) else None
+
+        replaced = new_content != old_content
+        if replaced:
+            try:
+                os.replace(temporary_path, path)
+            except OSError as error:
+                # the assets folder is on another drive than the folder beside it (ie it is a mount point)
+                if error.errno != errno.EXDEV:
+                    raise
+                shutil.move(temporary_path, path)
+        else:
+            os.remove(temporary_path)
+        self.record(path, fingerprint, new_content)
+        return replaced
+
+    def record_written(self, path, extra_inputs, inputs=None):
+        if self.assets_path is not None and os.path.isfile(path):
+            self.record(path, self.inputs_fingerprint(path, extra_inputs, inputs), content_hash(path))
+
+export_manifest = ExportManifest()
+
+# for small text files (.meta.ron etc): only write them if their content changed
+def write_text_if_changed(path, content):
+    try:
+        with open(path, "r") as existing_file:
+            if existing_file.read() == content:
+                return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        file.write(content)
+    return True
@@ -0,0 +1,25 @@
+# names of the objects in the temporary export scenes, as they should appear in the exported files
+# copies can not have the same names as their originals (names are unique in Blender), so they keep whatever name Blender gives them (ie "Cube.001"),
+# and get their original name back in the gltf files, through the gltf exporter's gather_node_hook (see gltf_gather_node_hook)
+# this way the original objects & collections are never renamed during exports
+class ExportNames:
+    def __init__(self):
+        self.names = {} # name of the copy => name to export it as
+        self.copied = set() # source objects already copied into the current temporary scene
+
+    def register(self, copy, name, source=None):
+        self.names[copy.name] = name
+        if source is not None:
+            self.copied.add(source)
+
+    def is_copied(self, source):
+        return source in self.copied
+
+    def export_name(self, name):
+        return self.names.get(name, None)
+
+    def clear(self):
+        self.names.clear()
+        self.copied.clear()
+
+export_names = ExportNames()
@@ -0,0 +1,62 @@
+import time
+from contextlib import contextmanager
+
+# what happened during the last export: how long each stage took, which files got exported (or not), & any errors
+# used by the command line export (see export_cli.py) to generate a machine readable report
+# possible statuses of files:
+#  - WRITTEN: the file was exported & its content changed
+#  - UNCHANGED: the file was exported, but its content is the same as before, so it was left untouched
+#  - UP_TO_DATE: the export was skipped, as nothing it depends on changed (see export_manifest.py)
+#  - FAILED: the export failed
+class ExportReport:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.stages = {} # stage name => duration in seconds
+        self.files = [] # {"path", "status"}
+        self.errors = []
+        self.changes = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def file(self, path, status):
+        self.files.append({"path": path, "status": status})
+
+    def error(self, message):
+        self.errors.append(message)
+
+    # export workers send the files they exported back to the main process, see export_workers.py
+    def take_files(self):
+        files = self.files
+        self.files = []
+        return files
+
+    def set_changes(self, changes_per_scene, changes_per_collection, changes_per_material, setting_changes):
+        self.changes = {
+            "settings": setting_changes,
+            "scenes": {scene_name: sorted(changes.keys()) for (scene_name, changes) in changes_per_scene.items()},
+            "collections": sorted(changes_per_collection.keys()),
+            "materials": sorted(changes_per_material.keys()),
+        }
+
+    def to_dict(self):
+        counts = {}
+        for file in self.files:
+            counts[file["status"]] = counts.get(file["status"], 0) + 1
+        return {
+            "success": len(self.errors) == 0,
+            "stages": self.stages,
+            "changes": self.changes,
+            "files": self.files,
+            "counts": counts,
+            "errors": self.errors,
+        }
+
+export_report = ExportReport()
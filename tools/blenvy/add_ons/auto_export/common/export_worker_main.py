@@ -0,0 +1,23 @@
+# entry point of the export workers, see export_workers.py, run as
+# blender --background <project snapshot> --python export_worker_main.py -- <jobs file>
+# this is run as a plain script, not as part of the add-on, so it only uses absolute imports
+import sys
+import json
+import importlib
+import addon_utils
+
+jobs_path = sys.argv[sys.argv.index("--") + 1]
+with open(jobs_path) as jobs_file:
+    job_data = json.load(jobs_file)
+addon_module = job_data["addon_module"]
+# in case the add-on is not installed (see export_cli.py)
+if not job_data["addon_path"] in sys.path:
+    sys.path.append(job_data["addon_path"])
+
+(_, loaded) = addon_utils.check(addon_module)
+if not loaded:
+    # the gltf exporter only calls the hooks of add-ons listed in the preferences (see glTF2ExportUserExtension), which are not saved in background mode
+    addon_utils.enable(addon_module, default_set=True, persistent=True)
+
+export_workers = importlib.import_module(addon_module + ".add_ons.auto_export.common.export_workers")
+export_workers.run_worker(jobs_path)
@@ -0,0 +1,253 @@
+import heapq
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import traceback
+import bpy
+
+from ....core.directory_listing import begin_export_run, end_export_run
+from .export_manifest import export_manifest
+from .export_inputs import export_inputs
+from .export_report import export_report
+from .generate_temporary_scene_and_export import failed_exports, export_scene_pool
+from ..blueprints.export_blueprints import export_blueprints
+from ..levels.export_levels import export_level_scene
+from ..materials.export_materials import export_materials
+from ..animations.export_animations import export_animations
+
+# parallel exports: the project is written to a snapshot .blend file, and the exports (blueprints, levels, materials & animations) are split
+# between a number of headless Blender processes (blender --background), that each load the snapshot & export their share of it
+# no display is needed, so this also works on build machines & co
+
+# the name of the add-on's root module (ie "blenvy", or "bl_ext.user_default.blenvy" when installed as an extension), so that workers can enable it
+ADDON_MODULE = __package__[:__package__.index(".add_ons.")]
+# where to import it from, if it is not installed (see export_cli.py)
+ADDON_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", ".."))
+WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), "export_worker_main.py")
+# jobs are run in this order inside each worker, like when exporting without workers
+JOB_KINDS_ORDER = ['MATERIAL', 'ANIMATION', 'LEVEL', 'BLUEPRINT']
+POLL_INTERVAL = 0.1
+
+# jobs are plain dicts, as they are written to json for the workers
+# the weight is a rough estimate of how long the export takes, used to balance the workers
+# the inputs are computed here, as workers do not have the serialized project, see export_inputs.py
+def make_export_jobs(blueprints, level_scene_names, materials, animations):
+    jobs = []
+    for material in materials:
+        jobs.append({"kind": 'MATERIAL', "name": material.name, "weight": 1, "inputs": export_inputs.material(material)})
+    for animation in animations:
+        jobs.append({
+            "kind": 'ANIMATION',
+            "name": animation["armature"].name,
+            "armature_object": animation["armature_object"].name,
+            "objects": [object.name for object in animation["objects"]],
+            "weight": 1 + len(animation["objects"]),
+            "inputs": export_inputs.animation(animation)
+        })
+    for scene_name in level_scene_names:
+        scene = bpy.data.scenes[scene_name]
+        jobs.append({"kind": 'LEVEL', "name": scene_name, "weight": 1 + len(scene.objects), "inputs": export_inputs.level(scene)})
+    for blueprint in blueprints:
+        jobs.append({"kind": 'BLUEPRINT', "name": blueprint.name, "weight": 1 + len(blueprint.objects) + len(blueprint.nested_blueprints), "inputs": export_inputs.blueprint(blueprint)})
+    return jobs
+
+# longest jobs first, each one to the least loaded worker
+def shard_jobs(jobs, workers_count):
+    shards = [[] for _ in range(max(1, min(workers_count, len(jobs))))]
+    loads = [(0, index) for index in range(len(shards))]
+    for job in sorted(jobs, key=lambda job: (-job["weight"], job["kind"], job["name"])):
+        (load, index) = heapq.heappop(loads)
+        shards[index].append(job)
+        heapq.heappush(loads, (load + job["weight"], index))
+    for shard in shards:
+        shard.sort(key=lambda job: JOB_KINDS_ORDER.index(job["kind"]))
+    return [shard for shard in shards if len(shard) > 0]
+
+def can_export_in_workers(settings, jobs):
+    return (
+        getattr(settings.auto_export, "export_workers") > 1
+        and len(jobs) > 1
+        and settings.auto_export.dry_run == "DISABLED"
+        and bpy.data.filepath != "" # relative paths (assets, textures etc) are resolved from the project's folder
+        and bpy.app.binary_path != ""
+    )
+
+# the snapshot only needs the data itself: no need to go through a full save (that would trigger our own save handler)
+# it is written to a temporary folder, not next to the project (where it could be left behind by a crash, & picked up as an asset), so relative paths are made absolute
+def write_project_snapshot(path):
+    datablocks = set()
+    for datablocks_of_type in [bpy.data.scenes, bpy.data.collections, bpy.data.objects, bpy.data.materials, bpy.data.armatures, bpy.data.actions, bpy.data.texts]:
+        datablocks.update(datablock for datablock in datablocks_of_type if datablock.library is None)
+    bpy.data.libraries.write(path, datablocks, path_remap='ABSOLUTE', fake_user=True)
+
+class ExportWorker:
+    def __init__(self, index, jobs, work_folder):
+        self.index = index
+        self.jobs = jobs
+        self.jobs_path = os.path.join(work_folder, f"worker_{index}_jobs.json")
+        self.results_path = os.path.join(work_folder, f"worker_{index}_results.jsonl")
+        self.log_path = os.path.join(work_folder, f"worker_{index}.log")
+        self.results = []
+        self.results_offset = 0
+        self.process = None
+
+    def start(self, snapshot_path, settings):
+        with open(self.jobs_path, "w") as jobs_file:
+            json.dump({
+                "addon_module": ADDON_MODULE,
+                "addon_path": ADDON_PATH,
+                "jobs": self.jobs,
+                "results_path": self.results_path,
+                "settings_fingerprint": export_manifest.settings_fingerprint,
+                "gltf_extension": settings.export_gltf_extension,
+                # the snapshot is not in the project's folder, so the paths relative to it need to be absolute
+                "project_root_path": settings.project_root_path_full,
+                # can be overriden for a single export, see command_line_export.py
+                "assets_path": settings.assets_path,
+            }, jobs_file)
+        open(self.results_path, "w").close()
+        with open(self.log_path, "w") as log_file:
+            self.process = subprocess.Popen(
+                [bpy.app.binary_path, "--background", "--python-exit-code", "1", snapshot_path, "--python", WORKER_SCRIPT, "--", self.jobs_path],
+                stdout=log_file,
+                stderr=subprocess.STDOUT
+            )
+
+    # results of the jobs finished since the last call
+    def poll_results(self):
+        with open(self.results_path, "rb") as results_file:
+            results_file.seek(self.results_offset)
+            content = results_file.read()
+        # only complete lines: the worker could be in the middle of writing one
+        complete = content[:content.rfind(b"\n") + 1]
+        self.results_offset += len(complete)
+        new_results = [json.loads(line) for line in complete.decode("utf-8").splitlines() if line.strip() != ""]
+        self.results += new_results
+        return new_results
+
+    def running(self):
+        return self.process is not None and self.process.poll() is None
+
+    # jobs without any results once the worker exited: it crashed or got killed
+    def missing_results(self):
+        finished = set((result["kind"], result["name"]) for result in self.results)
+        error = f"worker {self.index} exited with code {self.process.returncode if self.process is not None else None} before exporting it, see {self.log_path}"
+        return [{"kind": job["kind"], "name": job["name"], "ok": False, "error": error, "duration": 0, "manifest": {}, "files": []} for job in self.jobs if not (job["kind"], job["name"]) in finished]
+
+    def stop(self):
+        if self.running():
+            self.process.kill()
+            self.process.wait()
+
+# runs the jobs in workers_count background Blender processes, reporting progress as jobs finish
+# returns the results of all jobs: {"kind", "name", "ok", "error", "duration", "manifest", "files"}
+def run_export_workers(jobs, settings, workers_count):
+    shards = shard_jobs(jobs, workers_count)
+    work_folder = tempfile.mkdtemp(prefix="blenvy_export_")
+    snapshot_path = os.path.join(work_folder, "project_snapshot.blend")
+    window_manager = bpy.context.window_manager
+    tracker = window_manager.auto_export_tracker
+    workers = [ExportWorker(index, shard, work_folder) for (index, shard) in enumerate(shards)]
+    results = []
+
+    start = time.perf_counter()
+    print(f"exporting {len(jobs)} files using {len(workers)} workers")
+    write_project_snapshot(snapshot_path)
+    window_manager.progress_begin(0, len(jobs))
+    try:
+        for worker in workers:
+            worker.start(snapshot_path, settings)
+
+        def collect(new_results):
+            for result in new_results:
+                results.append(result)
+                export_manifest.merge(result["manifest"])
+                export_report.files += result["files"]
+                status = "exported" if result["ok"] else "FAILED to export"
+                print(f"   {status} {result['kind'].lower()} {result['name']} ({len(results)}/{len(jobs)}) in {result['duration']:.2f}s")
+                if not result["ok"]:
+                    print(result["error"])
+                    export_report.error(f"{result['kind'].lower()} {result['name']}: {result['error']}")
+            window_manager.progress_update(len(results))
+
+        # this blocks Blender (it runs from the save handler): its user interface is not redrawn until all the workers are done,
+        # so progress is only visible in the console & through the mouse cursor (progress_update)
+        while any(worker.running() for worker in workers):
+            time.sleep(POLL_INTERVAL)
+            for worker in workers:
+                collect(worker.poll_results())
+        for worker in workers:
+            collect(worker.poll_results())
+            collect(worker.missing_results())
+    finally:
+        for worker in workers:
+            worker.stop()
+        window_manager.progress_end()
+        # the workers did all the exports the tracker was waiting for
+        tracker.exports_count = 0
+        # the logs are kept on failures, but the snapshot is never needed afterwards
+        if os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+
+    failed = [result for result in results if not result["ok"]]
+    if len(failed) == 0:
+        shutil.rmtree(work_folder, ignore_errors=True)
+    else:
+        print("export workers logs are in", work_folder)
+    print(f"exported {len(results) - len(failed)}/{len(jobs)} files in {time.perf_counter() - start:.2f}s")
+    return results
+
+# everything below runs inside the worker processes, see export_worker_main.py
+def run_export_job(job, settings, blueprints_data):
+    start = time.perf_counter()
+    failed_exports.clear()
+    error = None
+    try:
+        kind = job["kind"]
+        if kind == 'MATERIAL':
+            export_materials([bpy.data.materials[job["name"]]], settings, blueprints_data)
+        elif kind == 'ANIMATION':
+            animation = {"armature": bpy.data.armatures[job["name"]], "armature_object": bpy.data.objects[job["armature_object"]], "objects": [bpy.data.objects[name] for name in job["objects"]]}
+            export_animations([animation], settings, blueprints_data)
+        elif kind == 'LEVEL':
+            export_level_scene(bpy.data.scenes[job["name"]], settings, blueprints_data)
+        elif kind == 'BLUEPRINT':
+            export_blueprints([blueprints_data.blueprints_per_name[job["name"]]], settings, blueprints_data)
+        else:
+            raise Exception(f"unknown export job kind: {kind}")
+        if len(failed_exports) > 0:
+            error = "\n".join(f"{path}: {message}" for (path, message) in failed_exports)
+    except Exception:
+        error = traceback.format_exc()
+    return {"kind": job["kind"], "name": job["name"], "ok": error is None, "error": error, "duration": time.perf_counter() - start, "manifest": export_manifest.take_recorded(), "files": export_report.take_files()}
+
+def run_worker(jobs_path):
+    with open(jobs_path) as jobs_file:
+        job_data = json.load(jobs_file)
+    blenvy = bpy.context.window_manager.blenvy
+    # the add-on might only have been enabled after the snapshot was loaded
+    blenvy.load_settings()
+    blenvy.settings_save_enabled = False
+    blenvy.project_root_path = job_data["project_root_path"]
+    blenvy.assets_path = job_data["assets_path"]
+    blenvy.export_gltf_extension = job_data["gltf_extension"]
+    blueprints_data = bpy.context.window_manager.blueprints_registry.refresh_blueprints(force=True)
+
+    begin_export_run()
+    # the manifest is not saved by the workers, see take_recorded
+    export_manifest.begin_run(blenvy.assets_path_full, job_data["settings_fingerprint"])
+    export_inputs.begin_run(None, blueprints_data, getattr(blenvy.auto_export, "collection_instances_combine_mode"), digests={(job["kind"], job["name"]): job["inputs"] for job in job_data["jobs"]})
+    export_scene_pool.begin_run()
+    try:
+        with open(job_data["results_path"], "a") as results_file:
+            for job in job_data["jobs"]:
+                result = run_export_job(job, blenvy, blueprints_data)
+                results_file.write(json.dumps(result) + "\n")
+                results_file.flush()
+    finally:
+        export_scene_pool.end_run()
+        export_inputs.end_run()
+        end_export_run()
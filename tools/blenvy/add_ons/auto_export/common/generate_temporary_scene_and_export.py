@@ -1,81 +1,170 @@
 import bpy
 from ....core.helpers_collections import set_active_collection
 from ....core.object_makers import make_empty
-from .duplicate_object import duplicate_object
-from .export_gltf import export_gltf
+from .duplicate_object import duplicate_object, clear_animation_components_cache
+from .export_gltf import export_gltf, is_gltf_export_up_to_date, gltf_output_file_path
+from .export_report import export_report
+from .export_names import export_names
 from ..constants import custom_properties_to_filter_out
 from ..utils import remove_unwanted_custom_properties
 from ....core.utils import exception_traceback, show_message_box
 
+# (output path, error) for each export that failed, so that callers exporting in bulk can report them (see export_workers.py)
+failed_exports = []
+
+# the temporary scene used for exports
+# during an export run (see begin_run), a single scene is created, reused for every export & cleared in between, 
+# and the context (active scene, collection & mode) is only switched & restored once, instead of once per exported file
+# outside of export runs, each export is a run of its own
+class ExportScenePool:
+    def __init__(self):
+        self.scene = None
+        self.active = False
+        self.window = None
+        self.saved_state = None
+        self.area = None
+        self.region = None
+
+    # returns False if a run is already in progress
+    def begin_run(self, scene_name="__temp_scene"):
+        if self.active:
+            return False
+        # there is no window in background mode (export workers, command line exports etc)
+        window = bpy.context.window
+        self.window = window
+        # save active scene, selected collection & mode
+        active_mode = bpy.context.active_object.mode if bpy.context.active_object is not None else None
+        self.saved_state = {
+            "scene": window.scene if window is not None else bpy.context.scene,
+            "active_collection": bpy.context.view_layer.active_layer_collection,
+            "mode": active_mode
+        }
+        # we change the mode to object mode, otherwise the gltf exporter is not happy
+        if active_mode is not None and active_mode != 'OBJECT':
+            print("setting to object mode", active_mode)
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        self.area = next((area for area in bpy.context.screen.areas if area.type == "VIEW_3D"), None) if bpy.context.screen is not None else None
+        self.region = [region for region in self.area.regions if region.type == 'WINDOW'][0] if self.area is not None else None
+
+        clear_animation_components_cache()
+        self.scene = bpy.data.scenes.new(name=scene_name)
+        # we set our active scene to be this one : this is needed otherwise the stand-in empties get generated in the wrong scene
+        if window is not None:
+            window.scene = self.scene
+        self.active = True
+        return True
+
+    def end_run(self):
+        if not self.active:
+            return
+        self.active = False
+        # reset active scene
+        if self.window is not None:
+            self.window.scene = self.saved_state["scene"]
+        if self.scene is not None:
+            bpy.data.scenes.remove(self.scene, do_unlink=True)
+            self.scene = None
+        clear_animation_components_cache()
+        # reset active collection
+        bpy.context.view_layer.active_layer_collection = self.saved_state["active_collection"]
+        # reset mode
+        if self.saved_state["mode"] is not None:
+            bpy.ops.object.mode_set( mode = self.saved_state["mode"] )
+        self.window = None
+        self.saved_state = None
+        self.area = None
+        self.region = None
+
+    def acquire(self, scene_name):
+        self.scene.name = scene_name
+        return self.scene
+
+    # the cleaners remove whatever the fillers created, anything else left over is only unlinked
+    def release(self):
+        export_names.clear()
+        scene = self.scene
+        root_collection = scene.collection
+        for object in list(root_collection.objects):
+            root_collection.objects.unlink(object)
+        for collection in list(root_collection.children):
+            root_collection.children.unlink(collection)
+        for key in list(scene.keys()):
+            try:
+                del scene[key]
+            except:pass
+
+    def context_override(self):
+        context_override = {"scene": self.scene, "view_layer": self.scene.view_layers[0]}
+        if self.area is not None:
+            context_override["area"] = self.area
+            context_override["region"] = self.region
+        return context_override
+
+export_scene_pool = ExportScenePool()
+
 """ 
 generates a temporary scene, fills it with data, cleans up after itself
     * named using temp_scene_name 
     * filled using the tempScene_filler
     * written on disk to gltf_output_path, with the gltf export parameters in gltf_export_settings
     * cleaned up using tempScene_cleaner
+    * skipped if the file is already up to date with the given inputs (see export_inputs.py)
 
 """
-def generate_temporary_scene_and_export(settings, gltf_export_settings, gltf_output_path, temp_scene_name="__temp_scene", tempScene_filler=None, tempScene_cleaner=None, additional_data=None): 
-
-    temp_scene = bpy.data.scenes.new(name=temp_scene_name)
-    temp_root_collection = temp_scene.collection
-
-    properties_black_list = custom_properties_to_filter_out
-    if additional_data is not None: # FIXME not a fan of having this here
-        for entry in dict(additional_data):
-            # we copy everything over except those on the black list
-            if entry not in properties_black_list:
-                print("entry in additional data", entry, "value", additional_data[entry], "in", additional_data.name)
-                temp_scene[entry] = additional_data[entry]
-
-    # we remove everything from the black list
-    remove_unwanted_custom_properties(temp_scene)
-  
-    # save active scene
-    active_scene = bpy.context.window.scene
-    # and selected collection
-    active_collection = bpy.context.view_layer.active_layer_collection
-    # and mode
-    active_mode = bpy.context.active_object.mode if bpy.context.active_object is not None else None
-    # we change the mode to object mode, otherwise the gltf exporter is not happy
-    if active_mode is not None and active_mode != 'OBJECT':
-        print("setting to object mode", active_mode)
-        bpy.ops.object.mode_set(mode='OBJECT')
-    # we set our active scene to be this one : this is needed otherwise the stand-in empties get generated in the wrong scene
-    bpy.context.window.scene = temp_scene
-
-    area = [area for area in bpy.context.screen.areas if area.type == "VIEW_3D"][0]
-    region = [region for region in area.regions if region.type == 'WINDOW'][0]
-    with bpy.context.temp_override(scene=temp_scene, area=area, region=region):
-        # detect scene mistmatch
-        scene_mismatch = bpy.context.scene.name != bpy.context.window.scene.name
-        if scene_mismatch:
-            show_message_box("Error in Gltf Exporter", icon="ERROR", lines=[f"Context scene mismatch, aborting: {bpy.context.scene.name} vs {bpy.context.window.scene.name}"])
-        else:
-            set_active_collection(bpy.context.scene, temp_root_collection.name)
-            # generate contents of temporary scene
-            
-            scene_filler_data = tempScene_filler(temp_root_collection)
-            # export the temporary scene
-            try:
-                print("dry_run MODE", settings.auto_export.dry_run)
-                if settings.auto_export.dry_run == "DISABLED":           
-                    export_gltf(gltf_output_path, gltf_export_settings)
-            except Exception as error:
-                print("failed to export gltf !", error) 
-                show_message_box("Error in Gltf Exporter", icon="ERROR", lines=exception_traceback(error))
-            finally:
-                print("restoring state of scene")
-                # restore everything
-                tempScene_cleaner(temp_scene, scene_filler_data)
-
-    # reset active scene
-    bpy.context.window.scene = active_scene
-    # reset active collection
-    bpy.context.view_layer.active_layer_collection = active_collection
-    # reset mode
-    if active_mode is not None:
-        bpy.ops.object.mode_set( mode = active_mode )
+def generate_temporary_scene_and_export(settings, gltf_export_settings, gltf_output_path, temp_scene_name="__temp_scene", tempScene_filler=None, tempScene_cleaner=None, additional_data=None, inputs=None): 
+    # no need to even generate the temporary scene (see export_manifest.py)
+    if is_gltf_export_up_to_date(gltf_output_path, gltf_export_settings, inputs):
+        print("       skipping", gltf_output_path, ": nothing changed since it was last exported")
+        export_report.file(gltf_output_file_path(gltf_output_path, gltf_export_settings), 'UP_TO_DATE')
+        return
+
+    own_run = export_scene_pool.begin_run(temp_scene_name)
+    try:
+        temp_scene = export_scene_pool.acquire(temp_scene_name)
+        temp_root_collection = temp_scene.collection
+
+        properties_black_list = custom_properties_to_filter_out
+        if additional_data is not None: # FIXME not a fan of having this here
+            for entry in dict(additional_data):
+                # we copy everything over except those on the black list
+                if entry not in properties_black_list:
+                    print("entry in additional data", entry, "value", additional_data[entry], "in", additional_data.name)
+                    temp_scene[entry] = additional_data[entry]
+
+        # we remove everything from the black list
+        remove_unwanted_custom_properties(temp_scene)
+
+        window = export_scene_pool.window
+        with bpy.context.temp_override(**export_scene_pool.context_override()):
+            # detect scene mistmatch
+            scene_mismatch = window is not None and bpy.context.scene.name != window.scene.name
+            if scene_mismatch:
+                show_message_box("Error in Gltf Exporter", icon="ERROR", lines=[f"Context scene mismatch, aborting: {bpy.context.scene.name} vs {window.scene.name}"])
+            else:
+                set_active_collection(bpy.context.scene, temp_root_collection.name)
+                # generate contents of temporary scene
+                
+                scene_filler_data = tempScene_filler(temp_root_collection)
+                # export the temporary scene
+                try:
+                    print("dry_run MODE", settings.auto_export.dry_run)
+                    if settings.auto_export.dry_run == "DISABLED":           
+                        export_gltf(gltf_output_path, gltf_export_settings, inputs)
+                except Exception as error:
+                    print("failed to export gltf !", error) 
+                    failed_exports.append((gltf_output_path, str(error)))
+                    export_report.file(gltf_output_file_path(gltf_output_path, gltf_export_settings), 'FAILED')
+                    export_report.error(f"{gltf_output_path}: {error}")
+                    show_message_box("Error in Gltf Exporter", icon="ERROR", lines=exception_traceback(error))
+                finally:
+                    print("restoring state of scene")
+                    # restore everything
+                    tempScene_cleaner(temp_scene, scene_filler_data)
+        export_scene_pool.release()
+    finally:
+        if own_run:
+            export_scene_pool.end_run()
 
 
 
@@ -84,7 +173,7 @@ def copy_hollowed_collection_into(source_collection, destination_collection, par
     collection_instances_combine_mode = getattr(settings.auto_export, "collection_instances_combine_mode")
 
     for object in source_collection.objects:
-        if object.name.endswith("____bak"): # some objects could already have been handled, ignore them
+        if export_names.is_copied(object): # some objects could already have been handled, ignore them
             continue       
         if filter is not None and filter(object) is False:
             continue
@@ -97,9 +186,8 @@ def copy_hollowed_collection_into(source_collection, destination_collection, par
         
     # for every child-collection of the source, copy its content into a new sub-collection of the destination
     for collection in source_collection.children:
-        original_name = collection.name
-        collection.name = original_name + "____bak"
-        collection_placeholder = make_empty(original_name, [0,0,0], [0,0,0], [1,1,1], destination_collection)
+        collection_placeholder = make_empty(collection.name, [0,0,0], [0,0,0], [1,1,1], destination_collection)
+        export_names.register(collection_placeholder, collection.name)
 
         if parent_empty is not None:
             collection_placeholder.parent = parent_empty
@@ -114,31 +202,10 @@ def copy_hollowed_collection_into(source_collection, destination_collection, par
     return {}
 
 
-# clear & remove "hollow scene"
+# clear "hollow scene" (the scene itself is reused for the next exports)
+# the original objects & collections are left untouched while building the hollow scene, so there is nothing to restore
 def clear_hollow_scene(temp_scene, original_root_collection):
-    def restore_original_names(collection):
-        if collection.name.endswith("____bak"):
-            collection.name = collection.name.replace("____bak", "")
-        for object in collection.all_objects:
-            """if object.instance_type == 'COLLECTION':
-                if object.name.endswith("____bak"):
-                    object.name = object.name.replace("____bak", "")
-            else: """
-            if object.name.endswith("____bak"):
-                object.name = object.name.replace("____bak", "")
-        for child_collection in collection.children:
-            restore_original_names(child_collection)
-    
-
-    # remove any data we created
+    # remove any data we created, all at once
     temp_root_collection = temp_scene.collection 
     temp_scene_objects = [o for o in temp_root_collection.all_objects]
-    for object in temp_scene_objects:
-        #print("removing", object.name)
-        bpy.data.objects.remove(object, do_unlink=True)
-
-    # remove the temporary scene
-    bpy.data.scenes.remove(temp_scene, do_unlink=True)
-    
-    # reset original names
-    restore_original_names(original_root_collection)
+    bpy.data.batch_remove(temp_scene_objects)
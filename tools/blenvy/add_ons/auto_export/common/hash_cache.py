@@ -0,0 +1,79 @@
+import bpy
+
+# persistent (for the duration of the Blender session) cache of the hashes of individual datablocks (meshes, materials, etc)
+# this allows us to only re-hash the datablocks that have actually changed since the last save:
+# the tracker drops the entries of any datablock reported as changed by the depsgraph, together with anything that depends on it
+# entries are keyed by (session_uid, facet) tuples, as names are not stable (renames) and python wrappers can change at any undo/redo
+class HashCache:
+    def __init__(self):
+        self.entries = {} # key => digest
+        self.dependencies = {} # key => session_uids or keys it depends on
+        self.dependents = {} # session_uid or key => set of keys that need to be dropped if it changes
+
+    def get(self, key):
+        return self.entries.get(key, None)
+
+    def set(self, key, digest, dependencies=()):
+        # the dependencies can change between two hashes of the same key: drop the previous ones
+        self.unlink(key)
+        self.entries[key] = digest
+        self.dependencies[key] = tuple(dependencies)
+        for dependency in dependencies:
+            if not dependency in self.dependents:
+                self.dependents[dependency] = set()
+            self.dependents[dependency].add(key)
+
+    # removes the reverse edges of the given key's dependencies, so that dependents does not grow forever
+    def unlink(self, key):
+        for dependency in self.dependencies.pop(key, ()):
+            dependents = self.dependents.get(dependency, None)
+            if dependents is None:
+                continue
+            dependents.discard(key)
+            if len(dependents) == 0:
+                del self.dependents[dependency]
+
+    def invalidate(self, key):
+        to_invalidate = [key]
+        while len(to_invalidate) > 0:
+            current = to_invalidate.pop()
+            self.entries.pop(current, None)
+            self.unlink(current)
+            to_invalidate += list(self.dependents.pop(current, []))
+
+    # drops all the entries that are not used by the given keys (ie the ones of deleted datablocks, or of datablocks that are not part of the project anymore)
+    def retain(self, keys):
+        used = set()
+        to_visit = list(keys)
+        while len(to_visit) > 0:
+            current = to_visit.pop()
+            if current in used:
+                continue
+            used.add(current)
+            # nested entries (node groups etc) are not visited when their parents' digests are reused
+            to_visit += [dependency for dependency in self.dependencies.get(current, ()) if dependency in self.entries]
+        for key in [key for key in self.entries.keys() if key not in used]:
+            self.invalidate(key)
+
+    def clear(self):
+        self.entries.clear()
+        self.dependencies.clear()
+        self.dependents.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+hash_cache = HashCache()
+
+def datablock_key(datablock):
+    return datablock.original.session_uid
+
+# called by the tracker for each depsgraph update
+def invalidate_datablock(datablock):
+    hash_cache.invalidate(datablock_key(datablock))
+    # changes to an object's geometry are not always reported for its data as well
+    if isinstance(datablock, bpy.types.Object) and datablock.data is not None:
+        hash_cache.invalidate(datablock_key(datablock.data))
+
+def clear_hash_cache():
+    hash_cache.clear()
@@ -0,0 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor
+from .streaming_hasher import StreamingHasher
+
+# change detection is split into two phases:
+#  - gathering: reading Blender data (into numpy buffers mostly), this can only happen on the main thread
+#  - digesting: hashing the gathered buffers; hashlib releases the GIL for large buffers, so this can run on a pool of worker threads
+# digests computed by the pool are represented by Deferred values, that get resolved once everything has been gathered
+class Deferred:
+    def __init__(self, future=None, compute=None):
+        self.future = future
+        self.compute = compute # for digests that depend on other deferred digests: computed on the main thread, when resolved
+        self.digest = None
+
+    def resolve(self):
+        if self.digest is None:
+            self.digest = self.future.result() if self.future is not None else self.compute()
+        return self.digest
+
+def new_hashing_pool(workers):
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="blenvy_hashing") if workers > 1 else None
+
+# gathered buffers can only contain plain python values & numpy arrays, as they are hashed outside of the main thread
+def hash_buffers(buffers):
+    return StreamingHasher().update(buffers).hexdigest()
+
+def digest_in_pool(pool, buffers):
+    if pool is None:
+        return hash_buffers(buffers)
+    return Deferred(future=pool.submit(hash_buffers, buffers))
+
+def digest_later(pool, compute):
+    if pool is None:
+        return compute()
+    return Deferred(compute=compute)
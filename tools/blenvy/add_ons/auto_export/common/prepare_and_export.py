@@ -3,11 +3,16 @@ import bpy
 from .project_diff import get_changes_per_scene
 from .auto_export import auto_export
 from .settings_diff import get_setting_changes
+from .snapshot_storage import save_previous_snapshot
+from .streaming_hasher import StreamingHasher
+from .change_journal import change_journal, export_context
+from .export_report import export_report
 from ....settings import upsert_settings
 
 # prepare export by gather the changes to the scenes & settings
 def prepare_and_export():
     print("prepare and export")
+    export_report.clear()
     #bpy.context.window_manager.auto_export_tracker.disable_change_detection()
     blenvy = bpy.context.window_manager.blenvy
     auto_export_settings = blenvy.auto_export
@@ -19,25 +24,34 @@ def prepare_and_export():
 
     if auto_export_settings.auto_export: # only do the actual exporting if auto export is actually enabled
         # determine changed objects
-        per_scene_changes, per_collection_changes, per_material_changes, project_hash = get_changes_per_scene(settings=blenvy)
+        with export_report.stage("change_detection"):
+            per_scene_changes, per_collection_changes, per_material_changes, renames, project_hash = get_changes_per_scene(settings=blenvy)
         # determine changed parameters 
-        setting_changes, current_common_settings, current_export_settings, current_gltf_settings = get_setting_changes()
+        with export_report.stage("settings_changes"):
+            setting_changes, current_common_settings, current_export_settings, current_gltf_settings = get_setting_changes()
+        export_report.set_changes(per_scene_changes, per_collection_changes, per_material_changes, setting_changes)
         print("changes: settings:", setting_changes)
         print("changes: scenes:", per_scene_changes)
         print("changes: collections:", per_collection_changes)
         print("changes: materials:", per_material_changes)
+        print("changes: renames:", renames)
+        print("change journal:", change_journal.stats())
 
         # do the actual export
         # blenvy.auto_export.dry_run = 'NO_EXPORT'#'DISABLED'#
-        auto_export(per_scene_changes, per_collection_changes, per_material_changes, setting_changes, blenvy)
+        # the settings all exported files depend on, besides their own part of the project (see export_inputs.py): files exported from the same inputs are not exported again
+        # without change detection, everything gets exported every time
+        settings_fingerprint = StreamingHasher().update((current_common_settings, current_export_settings, current_gltf_settings)).hexdigest() if auto_export_settings.change_detection else None
+        with export_report.stage("export"):
+            auto_export(per_scene_changes, per_collection_changes, per_material_changes, setting_changes, blenvy, settings_fingerprint=settings_fingerprint, project_snapshot=project_hash)
 
         # -------------------------------------
         # now that this point is reached, the export should have run correctly, so we can save all the current state to the "previous one"
-        for scene in bpy.data.scenes:
-            blenvy.scenes_to_scene_names[scene] = scene.name
-        print("bla", blenvy.scenes_to_scene_names, "hash", project_hash)
         # save the current project hash as previous
-        upsert_settings(".blenvy.project_serialized_previous", project_hash, overwrite=True)
+        with export_report.stage("save_snapshot"):
+            save_previous_snapshot(project_hash)
+        # start a new journal: from now on, it only contains changes since this export
+        change_journal.mark_exported(export_context(blenvy))
         # write the new settings to the old settings
         upsert_settings(".blenvy_common_settings_previous", current_common_settings, overwrite=True)
         upsert_settings(".blenvy_export_settings_previous", current_export_settings, overwrite=True)
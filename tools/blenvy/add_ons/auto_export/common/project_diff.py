@@ -1,165 +1,193 @@
 import json
 import traceback
 import bpy
-from .serialize_project import serialize_project
-from ....settings import load_settings
+from .serialize_project import serialize_project, project_snapshot, merkle_node, child_hash, SNAPSHOT_VERSION
+from .stable_ids import ensure_all_stable_ids
+from .hash_cache import hash_cache
+from .snapshot_storage import load_previous_snapshot
+from .change_journal import change_journal, export_context, mark_project_changed
 
 def bubble_up_changes(object, changes_per_scene):
     if object is not None and object.parent:
         changes_per_scene[object.parent.name] = bpy.data.objects[object.parent.name]
         bubble_up_changes(object.parent, changes_per_scene)
 
-import uuid
-def serialize_current(settings):
-    # sigh... you need to save & reset the frame otherwise it saves the values AT THE CURRENT FRAME WHICH CAN DIFFER ACROSS SCENES
-    current_frames = [scene.frame_current for scene in bpy.data.scenes]
-    """for scene in bpy.data.scenes:
-        scene.frame_set(0)
-        if scene.id_test == '':
-            print("GENERATE ID")
-            scene.id_test = str(uuid.uuid4())
-        print("SCENE ID", scene.id_test)"""
-    #https://blender.stackexchange.com/questions/216411/whats-the-replacement-for-id-or-hash-on-bpy-objects
-
-    current_scene = bpy.context.window.scene
-    bpy.context.window.scene = bpy.data.scenes[0]
-    #serialize scene at frame 0
-    # TODO: add back
-    """with bpy.context.temp_override(scene=bpy.data.scenes[1]):
-        bpy.context.scene.frame_set(0)"""
-    
-    current = serialize_project(settings)
-    bpy.context.window.scene = current_scene
-
-    # reset previous frames
-    for (index, scene) in enumerate(bpy.data.scenes):
-        scene.frame_set(int(current_frames[index]))
-    
-    return current
+# animated values are sampled at a canonical frame (see serialize_project), so there is no need to change the current frame
+# or the current scene: static scenes are never re-evaluated
+def serialize_current(settings, use_hash_cache=True):
+    return serialize_project(settings, use_hash_cache=use_hash_cache)
+
+# re-hashes the whole project, regardless of cached hashes, and returns the keys of any cached hash that turned out to be outdated
+# (ie changes that we were not notified about, for example changes done through scripts)
+def verify_all(settings):
+    previous_entries = dict(hash_cache.entries)
+    serialize_current(settings, use_hash_cache=False)
+    # whatever we missed, the next export should not rely on the journal
+    mark_project_changed()
+    current_entries = hash_cache.entries
+    return [key for key in previous_entries if key in current_entries and current_entries[key] != previous_entries[key]]
+
+# stable id => name, for all the nodes of a serialized project
+def snapshot_names(snapshot):
+    names = {}
+    if snapshot is None:
+        return names
+    for group in snapshot.get("children", {}).values():
+        names.update(group.get("names", {}))
+        for child in group["children"].values():
+            if isinstance(child, dict):
+                names.update(child.get("names", {}))
+    return names
 
 def get_changes_per_scene(settings):
-    previous = load_settings(".blenvy.project_serialized_previous")
+    previous = load_previous_snapshot()
+    # fast path: nothing at all was reported since the last export, so the project is still identical to its previous snapshot
+    # (the journal is reset after loading files & undo/redo, and in background mode we never get notified of changes)
+    # custom properties are part of the export context, as writing them from python does not trigger depsgraph updates
+    if previous is not None and not bpy.app.background and change_journal.is_clean(export_context(settings)):
+        print("no changes since the last export, skipping serialization")
+        return {}, {}, {}, {"scenes": {}, "objects": {}, "collections": {}, "materials": {}}, previous
+    if previous is not None:
+        previous = upgrade_snapshot(previous)
+    # make sure everything we track has a (unique) stable id before serializing
+    ensure_all_stable_ids(snapshot_names(previous))
     current = serialize_current(settings)
 
-    # so in Blender, there is no uuid per object, hash changes on undo redo, adress/pointer to object may change at any undo / redo without possible way of knowing when
-    # so... ugh
-    scenes_to_scene_names = {}
-    for scene in bpy.data.scenes:
-        scenes_to_scene_names[scene] = scene.name
-    print("cur scenes_to_scene_names", scenes_to_scene_names)
-    print("pre fpp", settings.scenes_to_scene_names)
-
-    scene_renames = {}
-    for scene in settings.scenes_to_scene_names:
-        if scene in scenes_to_scene_names:
-            previous_name_of_scene = settings.scenes_to_scene_names[scene]
-            current_name_of_scene = scenes_to_scene_names[scene]
-            if previous_name_of_scene != current_name_of_scene:
-                scene_renames[current_name_of_scene] = previous_name_of_scene
-                print("SCENE RENAMED !previous", previous_name_of_scene, "current", current_name_of_scene)
-    print("scene new name to old name", scene_renames)
-
     # determine changes
     changes_per_scene = {}
     changes_per_collection = {}
     changes_per_material = {}
+    renames = {}
     try:
-        (changes_per_scene, changes_per_collection, changes_per_material) = project_diff(previous, current, scene_renames, settings)
+        (changes_per_scene, changes_per_collection, changes_per_material, renames) = project_diff(previous, current, settings)
     except Exception as error:
         print(traceback.format_exc())
         print("failed to compare current serialized scenes to previous ones: Error:", error)
 
-    return changes_per_scene, changes_per_collection, changes_per_material, current
-
-
-def project_diff(previous, current, scene_renames, settings):
+    return changes_per_scene, changes_per_collection, changes_per_material, renames, current
+
+
+# snapshots saved before stable ids were introduced are keyed by name: we just compute the missing hashes
+# matching by name (see match_children) takes care of the rest
+def upgrade_snapshot(snapshot):
+    version = snapshot.get("version", 1)
+    if version == SNAPSHOT_VERSION:
+        return snapshot
+    if version == 1: # flat dicts of hashes
+        (scenes, collections, materials) = (snapshot.get("scenes", {}), snapshot.get("collections", {}), snapshot.get("materials", {}))
+    else: # merkle tree without names
+        groups = snapshot["children"]
+        scenes = {scene_name: scene["children"] for (scene_name, scene) in groups["scenes"]["children"].items()}
+        (collections, materials) = (groups["collections"]["children"], groups["materials"]["children"])
+    return project_snapshot(merkle_node({scene_name: merkle_node(objects) for (scene_name, objects) in scenes.items()}), merkle_node(collections), merkle_node(materials))
+
+def child_name(node, key):
+    return node["names"].get(key, key)
+
+# current key => previous key for all children present in both nodes
+# children are matched by stable id, with a fallback to names for anything without a match (snapshots from before stable ids, linked data)
+def match_children(previous_node, current_node):
+    previous_children = previous_node["children"]
+    current_children = current_node["children"]
+    unmatched_previous_keys_per_name = {child_name(previous_node, key): key for key in previous_children if key not in current_children}
+    matches = {}
+    for key in current_children:
+        if key in previous_children:
+            matches[key] = key
+        else:
+            previous_key = unmatched_previous_keys_per_name.get(child_name(current_node, key), None)
+            if previous_key is not None:
+                matches[key] = previous_key
+    return matches
+
+# returns the lists of added (current keys), removed (previous keys), changed & renamed (current key, previous key) children
+def diff_children(previous_node, current_node):
+    if previous_node["hash"] == current_node["hash"]:
+        return ([], [], [], [])
+    previous_children = previous_node["children"]
+    current_children = current_node["children"]
+    matches = match_children(previous_node, current_node)
+    matched_previous_keys = set(matches.values())
+
+    added = [key for key in current_children if key not in matches]
+    removed = [key for key in previous_children if key not in matched_previous_keys]
+    changed = [(key, previous_key) for (key, previous_key) in matches.items() if child_hash(current_children[key]) != child_hash(previous_children[previous_key])]
+    renamed = [(key, previous_key) for (key, previous_key) in matches.items() if child_name(current_node, key) != child_name(previous_node, previous_key)]
+    return (added, removed, changed, renamed)
+
+def project_diff(previous, current, settings):
     """print("previous", previous)
     print("current", current)"""
     if previous is None or current is None:
-        return {}
-    
+        return ({}, {}, {}, {})
+    previous = upgrade_snapshot(previous)
+
     changes_per_scene = {}
     changes_per_collection = {}
     changes_per_material = {}
-
-    # possible ? on each save, inject an id into each scene, that cannot be copied over
-    current_scenes = current["scenes"]
-    previous_scenes = previous["scenes"]
-
-    print("previous scenes", previous_scenes.keys())
-    print("current scenes", current_scenes.keys())
-    print("new names to old names", scene_renames)
-    print("")
-    for scene_name in current_scenes:
-        print("scene name", scene_name, scene_name in scene_renames)
-        current_scene = current_scenes[scene_name]
-        previous_scene = previous_scenes[scene_name] if not scene_name in scene_renames else previous_scenes[scene_renames[scene_name]]
-        current_object_names =list(current_scene.keys())
-
-        updated_scene_name = scene_name if not scene_name in scene_renames else scene_renames[scene_name]
-        if updated_scene_name in previous_scenes: # we can only compare scenes that are in both previous and current data, with the above we also account for renames
-
-            previous_object_names = list(previous_scene.keys())
-            added =  list(set(current_object_names) - set(previous_object_names))
-            removed = list(set(previous_object_names) - set(current_object_names))
-            
-            for obj in added:
-                if not scene_name in changes_per_scene:
-                    changes_per_scene[scene_name] = {}
-                changes_per_scene[scene_name][obj] = bpy.data.objects[obj] if obj in bpy.data.objects else None
-            
-            # TODO: how do we deal with this, as we obviously do not have data for removed objects ?
-            for obj in removed:
-                if not scene_name in changes_per_scene:
-                    changes_per_scene[scene_name] = {}
-                changes_per_scene[scene_name][obj] = None
-
-            for object_name in list(current_scene.keys()): # TODO : exclude directly added/removed objects  
-                if object_name in previous_scene:
-                    current_obj = current_scene[object_name]
-                    prev_obj = previous_scene[object_name]
-                    same = str(current_obj) == str(prev_obj)
-
-                    if not same:
-                        if not scene_name in changes_per_scene:
-                            changes_per_scene[scene_name] = {}
-
-                        target_object = bpy.data.objects[object_name] if object_name in bpy.data.objects else None
-                        changes_per_scene[scene_name][object_name] = target_object
-                        bubble_up_changes(target_object, changes_per_scene[scene_name])
-                        # now bubble up for instances & parents
-        else:
-            print(f"scene {scene_name} not present in previous data")
-
-
-
-    current_collections = current["collections"]
-    previous_collections = previous["collections"]
-
-    for collection_name in current_collections:
-        if collection_name in previous_collections:
-            current_collection = current_collections[collection_name]
-            prev_collection = previous_collections[collection_name]
-            same = str(current_collection) == str(prev_collection)
-
-            if not same:
-                #if not collection_name in changes_per_collection:
-                target_collection = bpy.data.collections[collection_name] if collection_name in bpy.data.collections else None
-                changes_per_collection[collection_name] = target_collection
+    # renames are only metadata: old name => new name, per type of data
+    renames = {"scenes": {}, "objects": {}, "collections": {}, "materials": {}}
+
+    # nothing changed anywhere in the project
+    if previous["hash"] == current["hash"]:
+        return (changes_per_scene, changes_per_collection, changes_per_material, renames)
+
+    current_scenes = current["children"]["scenes"]
+    previous_scenes = previous["children"]["scenes"]
+
+    (added_scenes, _, changed_scenes, renamed_scenes) = diff_children(previous_scenes, current_scenes)
+    for (scene_key, previous_scene_key) in renamed_scenes:
+        renames["scenes"][child_name(previous_scenes, previous_scene_key)] = child_name(current_scenes, scene_key)
+    for scene_key in added_scenes: # we can only compare scenes that are in both previous and current data
+        print(f"scene {child_name(current_scenes, scene_key)} not present in previous data")
+
+    # scenes whose objects are unchanged are skipped entirely, renamed or not
+    for (scene_key, previous_scene_key) in changed_scenes:
+        scene_name = child_name(current_scenes, scene_key)
+        current_scene = current_scenes["children"][scene_key]
+        previous_scene = previous_scenes["children"][previous_scene_key]
+        (added, removed, changed, renamed) = diff_children(previous_scene, current_scene)
+        if len(added) + len(removed) + len(changed) + len(renamed) > 0:
+            changes_per_scene[scene_name] = {}
+
+        for key in added:
+            object_name = child_name(current_scene, key)
+            changes_per_scene[scene_name][object_name] = bpy.data.objects.get(object_name, None)
+
+        # TODO: how do we deal with this, as we obviously do not have data for removed objects ?
+        for previous_key in removed:
+            changes_per_scene[scene_name][child_name(previous_scene, previous_key)] = None
+
+        for (key, _) in changed:
+            target_object = bpy.data.objects.get(child_name(current_scene, key), None)
+            changes_per_scene[scene_name][child_name(current_scene, key)] = target_object
+            # now bubble up for instances & parents
+            bubble_up_changes(target_object, changes_per_scene[scene_name])
+
+        # the names of objects are part of the exported data, so the level/blueprint containing them still needs an update
+        # but unlike actual changes, this does not bubble up to their parents
+        for (key, previous_key) in renamed:
+            object_name = child_name(current_scene, key)
+            renames["objects"][child_name(previous_scene, previous_key)] = object_name
+            changes_per_scene[scene_name][object_name] = bpy.data.objects.get(object_name, None)
+
+    current_collections = current["children"]["collections"]
+    previous_collections = previous["children"]["collections"]
+    (_, _, changed_collections, renamed_collections) = diff_children(previous_collections, current_collections)
+    for (key, _) in changed_collections:
+        collection_name = child_name(current_collections, key)
+        changes_per_collection[collection_name] = bpy.data.collections.get(collection_name, None)
+    for (key, previous_key) in renamed_collections:
+        renames["collections"][child_name(previous_collections, previous_key)] = child_name(current_collections, key)
 
     # process changes to materials
-    current_materials = current["materials"]
-    previous_materials = previous["materials"]
-
-    for material_name in current_materials:
-        if material_name in previous_materials:
-            current_material = current_materials[material_name]
-            prev_material = previous_materials[material_name]
-            same = str(current_material) == str(prev_material)
-
-            if not same:
-                #if not material_name in changes_per_material:
-                target_material = bpy.data.materials[material_name] if material_name in bpy.data.materials else None
-                changes_per_material[material_name] = target_material
-        
-    return (changes_per_scene, changes_per_collection, changes_per_material)
\ No newline at end of file
+    current_materials = current["children"]["materials"]
+    previous_materials = previous["children"]["materials"]
+    (_, _, changed_materials, renamed_materials) = diff_children(previous_materials, current_materials)
+    for (key, _) in changed_materials:
+        material_name = child_name(current_materials, key)
+        changes_per_material[material_name] = bpy.data.materials.get(material_name, None)
+    for (key, previous_key) in renamed_materials:
+        renames["materials"][child_name(previous_materials, previous_key)] = child_name(current_materials, key)
+
+    return (changes_per_scene, changes_per_collection, changes_per_material, renames)
@@ -2,19 +2,14 @@ import collections
 import collections.abc
 import inspect
 import json
-from mathutils import Color
+from mathutils import Color, Vector, Euler, Quaternion, Matrix
 import numpy as np
 import bpy
 from ..constants import TEMPSCENE_PREFIX
-
-import hashlib
-
-# horrible and uneficient
-def h1_hash(w):
-    try:
-        w = w.encode('utf-8')
-    except: pass
-    return hashlib.md5(w).hexdigest()
+from .hash_cache import hash_cache, datablock_key
+from .streaming_hasher import StreamingHasher
+from .stable_ids import stable_key
+from .hashing_pool import Deferred, new_hashing_pool, digest_in_pool, digest_later
 
 fields_to_ignore_generic = [
     "tag", "type", "update_tag", "use_extra_user", "use_fake_user", "user_clear", "user_of_id", "user_remap", "users",
@@ -23,105 +18,110 @@ fields_to_ignore_generic = [
     'override_create', 'override_hierarchy_create', 'override_library', 'preview', 'preview_ensure', 'rna_type',
     'session_uid', 'copy', 'id_type', 'is_embedded_data', 'is_evaluated', 'is_library_indirect', 'is_missing', 'is_runtime_data',
 
-    'components_meta', 'cycles'
+    'components_meta', 'cycles', 'blenvy_id'
 ]
 
+# all the hashing below streams values directly into a hasher, instead of building huge strings & hashing those
+# Blender data is fed in through feed_value, which uses the type lookups further down
+def new_hasher():
+    return StreamingHasher(fallback=feed_value)
+
+def digest_of(value):
+    return new_hasher().update(value).hexdigest()
 
 def generic_fields_hasher(data, fields_to_ignore):
-    all_field_names = dir(data)
-    field_values = [getattr(data, prop, None) for prop in all_field_names  if not prop.startswith("__") and not prop in fields_to_ignore and not prop.startswith("show") and not callable(getattr(data, prop, None))  ]
-    return str(field_values)
+    (_, fields) = get_fields_plan(data, fields_to_ignore)
+    hasher = new_hasher()
+    for field_name in fields:
+        hasher.update(getattr(data, field_name, None))
+    return hasher.hexdigest()
 
-def peel_value( value ):
-        try:
-            len( value )
-            return [ peel_value( x ) for x in value ]
-        except TypeError:
-            return value
+def _lookup_sequence(hasher, data):
+    hasher.update_sequence(data)
 
-def _lookup_color(data):
-    return peel_value(data)
+def _lookup_euler(hasher, data):
+    hasher.update_sequence(data)
+    hasher.update_text(data.order)
 
-def _lookup_array(data):
-    return peel_value(data)
+def _lookup_prop_group(hasher, data):
+    feed_fields(hasher, data, fields_to_ignore=fields_to_ignore_generic)
 
-def _lookup_array2(data):
-    print("mystery vectors")
-    return peel_value(data)
+def _lookup_collection(hasher, data):
+    hasher.update_int(len(data))
+    for item in data:
+        feed_fields(hasher, item, fields_to_ignore=fields_to_ignore_generic)
 
-def _lookup_prop_group(data):
-    return generic_fields_hasher_evolved(data, fields_to_ignore=fields_to_ignore_generic)
+def _lookup_materialLineArt(hasher, data):
+    feed_fields(hasher, data, fields_to_ignore=fields_to_ignore_generic)
 
-def _lookup_collection(data):
-    return [generic_fields_hasher_evolved(item, fields_to_ignore=fields_to_ignore_generic) for item in data]
+def _lookup_object(hasher, data):
+    hasher.update_text(data.name)
 
-def _lookup_materialLineArt(data):
-    return generic_fields_hasher_evolved(data, fields_to_ignore=fields_to_ignore_generic)
+# other datablocks are only referenced by name: their own changes are tracked separately
+def _lookup_id(hasher, data):
+    hasher.update_text(type(data).__name__)
+    hasher.update_text(data.name)
 
-def _lookup_object(data):
-    return data.name
-    return generic_fields_hasher_evolved(data, fields_to_ignore=fields_to_ignore_generic)
+# structs we do not know how to hash: their string representation contains their memory address, which changes between sessions
+def _lookup_struct(hasher, data):
+    hasher.update_text(type(data).__name__)
+    hasher.update(getattr(data, "name", None))
 
-def _lookup_generic(data):
-    return generic_fields_hasher_evolved(data, fields_to_ignore=fields_to_ignore_generic)
+def _lookup_generic(hasher, data):
+    feed_fields(hasher, data, fields_to_ignore=fields_to_ignore_generic)
+
+node_fields_to_ignore = fields_to_ignore_generic + ['internal_links', 'inputs', 'outputs']
+
+# state of the serialization in progress, needed by the type lookups, that only get the values to hash
+class SerializationState:
+    cache = None # see new_serialization_cache
+    # datablocks whose cached hashes are being computed, with the keys of the cached hashes they used (ie node groups used by a material):
+    # those become dependencies, so that a change to a node group also invalidates the hashes of everything using it
+    dependency_frames = []
 
 # used for various node trees: shaders, modifiers etc
-def node_tree(node_tree):
+# node trees (including nested node groups) are only hashed once, and their digests are kept until they are reported as changed
+def node_tree(hasher, node_tree):
+    hasher.update(node_tree_digest(node_tree))
+
+def node_tree_digest(node_tree):
+    cache = SerializationState.cache
+    if cache is None: # outside of serialize_project
+        return compute_node_tree_digest(node_tree)
+    # embedded trees (ie the trees of materials) are part of their owner, which is what gets reported as changed
+    owner = SerializationState.dependency_frames[-1]["datablock"] if node_tree.is_embedded_data and len(SerializationState.dependency_frames) > 0 else None
+    return cached_hash(cache, node_tree, "node_tree", lambda: compute_node_tree_digest(node_tree), dependencies=[owner])
+
+def compute_node_tree_digest(node_tree):
     #print("SCANNING NODE TREE", node_tree)
+    hasher = new_hasher()
+    hasher.update(dict(node_tree)) # probably useless for materials, contains settings for certain modifiers
 
-    # storage for hashing
-    links_hashes = []
-    nodes_hashes = []
-    root_inputs = dict(node_tree) # probably useless for materials, contains settings for certain modifiers
-
+    hasher.update_int(len(node_tree.nodes))
     for node in node_tree.nodes:
         #print("node", node, node.type, node.name, node.label)
-
-        input_hashes = []
-        for input in node.inputs:
-            #print(" input", input, "label", input.label, "name", input.name, dir(input))
-            default_value = getattr(input, 'default_value', None)
-            input_hash = f"{convert_field(default_value)}"
-            input_hashes.append(input_hash)
-
-        output_hashes = []
+        feed_fields(hasher, node, node_fields_to_ignore)
         # IF the node itself is a group input, its outputs are the inputs of the geometry node (yes, not easy)
-        node_in_use = True
-        for (index, output) in enumerate(node.outputs):
-            # print(" output", output, "label", output.label, "name", output.name, "generated name", f"Socket_{index+1}")
-            default_value = getattr(output, 'default_value', None)
-            output_hash = f"{convert_field(default_value)}"
-            output_hashes.append(output_hash)
-
-            node_in_use = node_in_use and default_value is not None
-        #print("NODE IN USE", node_in_use)
-
-        node_fields_to_ignore = fields_to_ignore_generic + ['internal_links', 'inputs', 'outputs']
-        node_hash = f"{generic_fields_hasher_evolved(node, node_fields_to_ignore)}_{str(input_hashes)}_{str(output_hashes)}"
-        #print("node hash", node_hash)
-        #print("node hash", str(input_hashes))
-        nodes_hashes.append(node_hash)
+        hasher.update_sequence([getattr(input, 'default_value', None) for input in node.inputs])
+        hasher.update_sequence([getattr(output, 'default_value', None) for output in node.outputs])
 
+    hasher.update_int(len(node_tree.links))
     for link in node_tree.links:
-        """print("LINK", link, dir(link))
-        print("FROM", link.from_node, link.from_socket)
-        print("TO", link.to_node, link.to_socket)"""
-
         from_socket_default = link.from_socket.default_value if hasattr(link.from_socket, "default_value") else None
         to_socket_default = link.to_socket.default_value if hasattr(link.to_socket, "default_value") else None
-        link_hash = f"{link.from_node.name}_{link.from_socket.name}_{from_socket_default}+{link.to_node.name}_{link.to_socket.name}_{to_socket_default}"
-
-        links_hashes.append(link_hash)
-
-    #print("node hashes",nodes_hashes, "links_hashes", links_hashes)
-    return f"{str(root_inputs)}_{str(nodes_hashes)}_{str(links_hashes)}"
+        hasher.update_sequence((link.from_node.name, link.from_socket.name, from_socket_default, link.to_node.name, link.to_socket.name, to_socket_default))
+    return hasher.hexdigest()
 
 
 type_lookups = {
-    Color: _lookup_color,#lambda input: print("dsf")',
+    Color: _lookup_sequence,
+    Vector: _lookup_sequence,
+    Quaternion: _lookup_sequence,
+    Matrix: _lookup_sequence,
+    Euler: _lookup_euler,
     bpy.types.Object: _lookup_object,
-    bpy.types.FloatVectorAttribute: _lookup_array2,
-    bpy.types.bpy_prop_array: _lookup_array,
+    bpy.types.FloatVectorAttribute: _lookup_generic,
+    bpy.types.bpy_prop_array: _lookup_sequence,
     bpy.types.PropertyGroup: _lookup_prop_group,
     bpy.types.bpy_prop_collection: _lookup_collection,
     bpy.types.MaterialLineArt: _lookup_materialLineArt,
@@ -130,34 +130,39 @@ type_lookups = {
     bpy.types.RaytraceEEVEE: _lookup_generic,
     bpy.types.CurveMapping: _lookup_generic,
     bpy.types.MaterialGPencilStyle: _lookup_generic,
+    bpy.types.ID: _lookup_id,
+    bpy.types.bpy_struct: _lookup_struct,
 }
 
-def convert_field(raw_value, field_name="", scan_node_tree=True):
-    """# nodes are a special case: # TODO: find out their types & move these to type lookups
-    if field_name in ["node_tree", "node_group"] and scan_node_tree:
-        print("scan node tree", inspect.getmro(type(raw_value)))
-        return node_tree(raw_value)
-"""
-    conversion_lookup = None # type_lookups.get(type(raw_value), None)
-    all_types = inspect.getmro(type(raw_value))            
-    for s_type in all_types:
+# converters per python type, so that we only walk the class hierarchy once per type
+converters_per_type = {}
+
+def get_converter(value_type):
+    if value_type in converters_per_type:
+        return converters_per_type[value_type]
+    conversion_lookup = None
+    for s_type in inspect.getmro(value_type):
         #print("  stype", s_type)
         if type_lookups.get(s_type, None) is not None:
             conversion_lookup = type_lookups[s_type]
             break
-
-    field_value = None
+    converters_per_type[value_type] = conversion_lookup
+    return conversion_lookup
+
+# called by the hasher for any value it cannot encode by itself
+def feed_value(hasher, raw_value):
+    if isinstance(raw_value, Deferred):
+        hasher.update(raw_value.resolve())
+        return
+    conversion_lookup = get_converter(type(raw_value))
     if conversion_lookup is not None:
-        field_value =  conversion_lookup(raw_value)
-        #print("field_name",field_name,"conv value", field_value)
+        conversion_lookup(hasher, raw_value)
+    elif hasattr(raw_value, "to_dict"): # custom property groups
+        hasher.update(raw_value.to_dict())
+    elif hasattr(raw_value, "to_list"): # custom property arrays
+        hasher.update(raw_value.to_list())
     else:
-        #print("field_name",field_name,"raw value", raw_value)
-        """try:
-            field_value=_lookup_generic(raw_value)
-        except:pass"""
-        field_value = raw_value
-    
-    return field_value
+        hasher.update_text(str(raw_value))
 
 # just a helper , for shorthand
 def obj_to_dict(object):
@@ -165,35 +170,204 @@ def obj_to_dict(object):
         return dict(object)
     except:
         return {}
-    
+
+# which fields are hashable only depends on the type of the data & on the fields to ignore
+# so we compute these "plans" once per type, instead of calling dir(), getattr() & callable() for every field of every value
+fields_plans = {}
+
+def get_fields_plan(data, fields_to_ignore):
+    plan_key = (type(data), frozenset(fields_to_ignore))
+    plan = fields_plans.get(plan_key, None)
+    if plan is not None:
+        return plan
+
+    fields = []
+    for field_name in dir(data):
+        if not field_name.startswith("__") and not field_name in fields_to_ignore and not field_name.startswith("show") and not callable(getattr(data, field_name, None)):
+            fields.append(field_name)
+
+    # not all types support custom properties, no need to try for every value
+    supports_custom_properties = True
+    try:
+        dict(data)
+    except:
+        supports_custom_properties = False
+
+    plan = (supports_custom_properties, fields)
+    fields_plans[plan_key] = plan
+    return plan
+
+def feed_fields(hasher, data, fields_to_ignore):
+    (supports_custom_properties, fields) = get_fields_plan(data, fields_to_ignore)
+    dict_data = {}
+    if supports_custom_properties: # in some cases, some data is in the key/value pairs of the object
+        dict_data = {key: value for (key, value) in data.items() if key not in fields_to_ignore}# we need to filter out fields here too
+    hasher.update(dict_data)
+    for field_name in fields:
+        hasher.update(getattr(data, field_name, None))
+
 # TODO: replace the first one with this once if its done 
 def generic_fields_hasher_evolved(data, fields_to_ignore, scan_node_tree=True):
-    dict_data = obj_to_dict(data) # in some cases, some data is in the key/value pairs of the object
-    dict_data = {key: dict_data[key] for key in dict_data.keys() if key not in fields_to_ignore}# we need to filter out fields here too
-    all_field_names = dir(data)
-    field_values = []
-    for field_name in all_field_names:
-        if not field_name.startswith("__") and not field_name in fields_to_ignore and not field_name.startswith("show") and not callable(getattr(data, field_name, None)):
-            raw_value = getattr(data, field_name, None)
-            #print("raw value", raw_value, "type", type(raw_value), isinstance(raw_value, Color), isinstance(raw_value, bpy.types.bpy_prop_array))
-            field_value = convert_field(raw_value, field_name, scan_node_tree)
-            #print("field name", field_name, "raw", raw_value, "converted", field_value)
+    hasher = new_hasher()
+    feed_fields(hasher, data, fields_to_ignore)
+    return hasher.hexdigest()
+
+# generic attributes data types => (name of the field holding the values, number of values per element, numpy type for foreach_get)
+attribute_layouts = {
+    'FLOAT': ('value', 1, np.float32),
+    'INT': ('value', 1, np.int32),
+    'INT8': ('value', 1, np.int32),
+    'BOOLEAN': ('value', 1, bool),
+    'FLOAT2': ('vector', 2, np.float32),
+    'INT32_2D': ('value', 2, np.int32),
+    'FLOAT_VECTOR': ('vector', 3, np.float32),
+    'FLOAT_COLOR': ('color', 4, np.float32),
+    'BYTE_COLOR': ('color', 4, np.float32),
+    'QUATERNION': ('value', 4, np.float32),
+    'FLOAT4X4': ('value', 16, np.float32),
+}
+# these are already covered by the vertices/edges/loops/polygons arrays
+attributes_to_ignore = ['position', 'material_index', 'sharp_face']
+
+# fetch a whole property of all the items of a collection at once, as a numpy array
+def gather_array(collection, field_name, values_per_item, dtype):
+    values = np.empty(len(collection) * values_per_item, dtype=dtype)
+    collection.foreach_get(field_name, values)
+    return values
+
+# full mesh fingerprint: all arrays are fetched in bulk & streamed into a single hash (see digest_in_pool), without any per element python code
+def mesh_arrays(mesh):
+    arrays = [
+        ("vertices", gather_array(mesh.vertices, "co", 3, np.float32)),
+        ("edges", gather_array(mesh.edges, "vertices", 2, np.int32)),
+        ("loops", gather_array(mesh.loops, "vertex_index", 1, np.int32)),
+        ("polygons_loop_start", gather_array(mesh.polygons, "loop_start", 1, np.int32)),
+        ("polygons_loop_total", gather_array(mesh.polygons, "loop_total", 1, np.int32)),
+        ("polygons_material_index", gather_array(mesh.polygons, "material_index", 1, np.int32)),
+        ("polygons_smooth", gather_array(mesh.polygons, "use_smooth", 1, bool)),
+    ]
+    # UV maps & color attributes are generic attributes as well, so this covers them too
+    # internal attributes (starting with a ".") are either covered above, or ui state (selection, hidden etc)
+    for attribute in sorted(mesh.attributes, key=lambda attribute: attribute.name):
+        layout = attribute_layouts.get(attribute.data_type, None)
+        if layout is None or attribute.name.startswith(".") or attribute.name in attributes_to_ignore:
+            continue
+        (field_name, values_per_item, dtype) = layout
+        arrays.append((f"attribute_{attribute.name}_{attribute.domain}_{attribute.data_type}", gather_array(attribute.data, field_name, values_per_item, dtype)))
 
-            field_values.append(str(field_value))
+    if mesh.has_custom_normals:
+        arrays.append(("custom_normals", gather_array(mesh.loops, "normal", 3, np.float32)))
 
-    return str(dict_data) + str(field_values)
+    if mesh.shape_keys is not None:
+        for key_block in mesh.shape_keys.key_blocks:
+            key_block_settings = f"{key_block.name}_{key_block.value}_{key_block.mute}_{key_block.relative_key.name}_{key_block.slider_min}_{key_block.slider_max}"
+            arrays.append((f"shape_key_{key_block_settings}", gather_array(key_block.data, "co", 3, np.float32)))
+    return arrays
 
-# possible alternatives https://blender.stackexchange.com/questions/286010/bpy-detect-modified-mesh-data-vertices-edges-loops-or-polygons-for-cachin
-def mesh_hash(obj):
-    # this is incomplete, how about edges ?
-    vertex_count = len(obj.data.vertices)
-    vertices_np = np.empty(vertex_count * 3, dtype=np.float32)
-    obj.data.vertices.foreach_get("co", vertices_np)
-    h = str(h1_hash(vertices_np.tobytes()))
-    return h
+transform_data_paths = ["location", "rotation_euler", "rotation_quaternion", "rotation_axis_angle", "scale"]
+
+# animated transform channels of an object: (data_path, index) => fcurve
+def animated_transform_channels(object):
+    channels = {}
+    for action in animation_dependencies(object):
+        if action is None:
+            continue
+        for fcurve in action.fcurves:
+            if fcurve.data_path in transform_data_paths and not (fcurve.data_path, fcurve.array_index) in channels:
+                channels[(fcurve.data_path, fcurve.array_index)] = fcurve
+    return channels
+
+# the transforms of animated objects depend on the current frame: instead of changing frames (and evaluating whole scenes)
+# we evaluate their transform F-curves at a fixed frame; changes to the animations themselves are covered by the animation hash
+def canonical_matrix_basis(object, channels, frame):
+    values = {data_path: list(getattr(object, data_path)) for data_path in transform_data_paths}
+    for ((data_path, index), fcurve) in channels.items():
+        if index < len(values[data_path]):
+            values[data_path][index] = fcurve.evaluate(frame)
+
+    if object.rotation_mode == 'QUATERNION':
+        rotation = Quaternion(values["rotation_quaternion"])
+    elif object.rotation_mode == 'AXIS_ANGLE':
+        axis_angle = values["rotation_axis_angle"]
+        rotation = Quaternion(axis_angle[1:], axis_angle[0])
+    else:
+        rotation = Euler(values["rotation_euler"], object.rotation_mode)
+    return Matrix.LocRotScale(Vector(values["location"]), rotation, Vector(values["scale"]))
+
+# transforms & visibility of all the objects of a scene, fetched in bulk: one row per object
+# we use the local transforms (what ends up in the exported nodes), so moving a parent does not change its children
+def transforms_array(scene):
+    objects = scene.objects
+    count = len(objects)
+    view_layer = scene.view_layers[0]
+    visibility = np.fromiter((object.visible_get(view_layer=view_layer) for object in objects), dtype=np.float32, count=count)
+    transforms = np.concatenate((
+        gather_array(objects, "matrix_basis", 16, np.float32).reshape(count, 16),
+        gather_array(objects, "matrix_parent_inverse", 16, np.float32).reshape(count, 16),
+        gather_array(objects, "hide_viewport", 1, bool).astype(np.float32).reshape(count, 1),
+        gather_array(objects, "hide_render", 1, bool).astype(np.float32).reshape(count, 1),
+        visibility.reshape(count, 1),
+    ), axis=1)
+
+    canonical_frame = scene.frame_start
+    for (index, object) in enumerate(objects):
+        if object.animation_data is None:
+            continue
+        channels = animated_transform_channels(object)
+        if len(channels) > 0:
+            # matrices are fetched in column major order by foreach_get
+            transforms[index, 0:16] = np.array(canonical_matrix_basis(object, channels, canonical_frame).transposed(), dtype=np.float32).ravel()
+    return transforms + 0.0 # -0.0 => 0.0
+
+# the transforms of each scene during the previous serialization: scene session_uid => (session_uids of the objects, transforms, digest per row)
+# since we compare actual values, this never needs to be invalidated
+transforms_per_scene = {}
+
+# only the rows that differ from the previous ones get hashed again
+def transforms_digests(scene):
+    objects = scene.objects
+    transforms = transforms_array(scene)
+    uids = gather_array(objects, "session_uid", 1, np.int32)
+    scene_key = datablock_key(scene)
+
+    previous = transforms_per_scene.get(scene_key, None)
+    if previous is not None and np.array_equal(previous[0], uids):
+        (_, previous_transforms, digests) = previous
+        digests = list(digests)
+        changed_rows = np.flatnonzero(np.any(transforms != previous_transforms, axis=1))
+    else:
+        digests = [None] * len(objects)
+        changed_rows = range(len(objects))
+
+    for row in changed_rows:
+        digests[row] = StreamingHasher().update_array(transforms[row]).hexdigest()
+    transforms_per_scene[scene_key] = (uids, transforms, digests)
+    return digests
+
+# keyframe data fetched in bulk for each F-curve: (field name, number of values per keyframe)
+keyframe_fields = [("co", 2), ("handle_left", 2), ("handle_right", 2)]
+
+# full fingerprint of an action: all of its keyframes, not just its name & frame range
+def action_buffers(action):
+    buffers = [
+        (tuple(action.frame_range), action.use_frame_range, action.frame_start, action.frame_end),
+        [(marker.name, marker.frame) for marker in action.pose_markers]
+    ]
+    for fcurve in action.fcurves:
+        keyframes = fcurve.keyframe_points
+        buffers.append((fcurve.data_path, fcurve.array_index, fcurve.mute, fcurve.extrapolation, len(fcurve.modifiers)))
+        buffers += [gather_array(keyframes, field_name, values_per_item, np.float32) for (field_name, values_per_item) in keyframe_fields]
+        # enums cannot be fetched with foreach_get
+        buffers.append([(keyframe.interpolation, keyframe.easing) for keyframe in keyframes])
+    return buffers
+
+nla_strip_fields = [
+    "name", "frame_start", "frame_end", "action_frame_start", "action_frame_end", "scale", "repeat",
+    "blend_type", "blend_in", "blend_out", "extrapolation", "influence", "mute", "use_reverse"
+]
 
 # TODO: redo this one, this is essentially modified copy & pasted data, not fitting
-def animation_hash(obj):
+def animation_hash(obj, cache):
     animation_data = obj.animation_data
     if animation_data is None:
         return None
@@ -228,7 +402,16 @@ def animation_hash(obj):
                 markers_per_animation[animation_name][marker.frame] = []
             markers_per_animation[animation_name][marker.frame].append(marker.name)
 
-    compact_result = h1_hash(str((blender_actions, blender_tracks, markers_per_animation, animations_infos)))
+    # actions can be shared by many objects: each action is only hashed once
+    action_digests = {action.name: cached_hash(cache, action, "action", lambda action=action: digest_in_pool(cache["pool"], action_buffers(action))) for action in blender_actions}
+    active_action = cached_hash(cache, animation_data.action, "action", lambda: digest_in_pool(cache["pool"], action_buffers(animation_data.action))) if animation_data.action is not None else None
+    nla_settings = [
+        (track.name, track.mute, track.is_solo, [[getattr(strip, field_name) for field_name in nla_strip_fields] + [strip.action.name if strip.action else None] for strip in track.strips])
+        for track in animation_data.nla_tracks
+    ]
+
+    # the action digests might still be in the works
+    compact_result = digest_later(cache["pool"], lambda: digest_of((action_digests, active_action, nla_settings, blender_tracks, markers_per_animation, animations_infos)))
     return compact_result
 
 
@@ -237,58 +420,113 @@ def animation_hash(obj):
 def custom_properties_hash(obj):
     custom_properties = {}
     for property_name in obj.keys():        
-        if property_name not in '_RNA_UI' and property_name != 'components_meta' and property_name != 'user_assets':
+        if property_name not in '_RNA_UI' and property_name != 'components_meta' and property_name != 'user_assets' and property_name != 'blenvy_id':
             custom_properties[property_name] = obj[property_name] #generic_fields_hasher_evolved(data=obj[property_name],fields_to_ignore=fields_to_ignore_generic)
         """if property_name == "user_assets":
         print("tptp")
         custom_properties[property_name] = generic_fields_hasher_evolved(data=obj[property_name],fields_to_ignore=fields_to_ignore_generic)"""
-    return str(h1_hash(str(custom_properties)))
+    return digest_of(custom_properties)
+
+# digest of the custom properties (components etc) of everything that is serialized: scenes, their objects, collections & materials
+def custom_properties_fingerprint(settings):
+    hasher = StreamingHasher()
+    scenes = [scene for scene in settings.level_scenes + settings.library_scenes if not scene.name.startswith(TEMPSCENE_PREFIX)]
+    for datablocks in [scenes] + [scene.objects for scene in scenes] + [bpy.data.collections, bpy.data.materials]:
+        for datablock in datablocks:
+            if len(datablock.keys()) > 0:
+                hasher.update((datablock.name_full, custom_properties_hash(datablock)))
+    return hasher.hexdigest()
 
 def camera_hash(obj):
     camera_data = obj.data
     # TODO: the above is not enough, certain fields are left as bpy.data.xx
-    return str(generic_fields_hasher(camera_data, fields_to_ignore_generic))
+    return generic_fields_hasher(camera_data, fields_to_ignore_generic)
 
 def light_hash(obj):
     light_data = obj.data
-    return str(generic_fields_hasher(light_data, fields_to_ignore_generic))
+    return generic_fields_hasher(light_data, fields_to_ignore_generic)
+
+# bone data fetched in bulk: (field name, number of values per bone, numpy type for foreach_get)
+# the roll of bones is only available on edit bones, but it is part of matrix_local
+bone_fields = [
+    ("head_local", 3, np.float32),
+    ("tail_local", 3, np.float32),
+    ("matrix_local", 16, np.float32),
+    ("head_radius", 1, np.float32),
+    ("tail_radius", 1, np.float32),
+    ("envelope_distance", 1, np.float32),
+    ("use_deform", 1, bool),
+    ("use_connect", 1, bool),
+    ("use_inherit_rotation", 1, bool),
+    ("use_local_location", 1, bool),
+    ("use_relative_parent", 1, bool),
+]
 
-def bones_hash(bones):
-    fields_to_ignore = fields_to_ignore_generic + ['AxisRollFromMatrix', 'MatrixFromAxisRoll', 'evaluate_envelope', 'convert_local_to_pose', 'foreach_get', 'foreach_set', 'get', 'set', 'find', 'items', 'keys', 'values']
-    
-    bones_result = []
-    for bone in bones: 
-        all_field_names = dir(bone)
-        fields = [getattr(bone, prop, None)  for prop in all_field_names if not prop.startswith("__") and not prop in fields_to_ignore and not prop.startswith("show_")]
-        bones_result.append(fields)
-    #print("fields of bone", bones_result)
-    return str(h1_hash(str(bones_result)))
-
-# fixme: not good enough ?
-def armature_hash(obj):
-    fields_to_ignore = fields_to_ignore_generic + ['display_type', 'is_editmode', 'pose_position', 'foreach_get', 'get']
-    fields_to_convert = {'bones': bones_hash}#, 'collections_all': bones_hash}
-    armature_data = obj.data
-    all_field_names = dir(armature_data)
-
-    fields = [getattr(armature_data, prop, None) if not prop in fields_to_convert.keys() else fields_to_convert[prop](getattr(armature_data, prop)) for prop in all_field_names if not prop.startswith("__") and not prop in fields_to_ignore and not prop.startswith("show_")]
-
-    """for bone in armature_data.bones:
-        print("bone", bone, bone_hash(bone))"""
-    return str(fields)
+def bones_buffers(bones):
+    names = [bone.name for bone in bones]
+    indices = {name: index for (index, name) in enumerate(names)}
+    buffers = [
+        names,
+        np.fromiter((indices[bone.parent.name] if bone.parent is not None else -1 for bone in bones), dtype=np.int32, count=len(bones))
+    ]
+    buffers += [gather_array(bones, field_name, values_per_item, dtype) for (field_name, values_per_item, dtype) in bone_fields]
+    buffers.append({bone.name: custom_properties_hash(bone) for bone in bones if len(bone.keys()) > 0})
+    return buffers
+
+# pose & edit mode state (pose_position, display settings, etc) is not part of the exported data, and thus ignored
+def armature_buffers(armature_data):
+    return [
+        bones_buffers(armature_data.bones),
+        [(collection.name, [bone.name for bone in collection.bones]) for collection in getattr(armature_data, "collections_all", [])],
+        custom_properties_hash(armature_data) if len(armature_data.keys()) > 0 else None
+    ]
+
+# returns the hash of the given facet of a datablock, either from the persistent hash cache or by computing it
+# entries are dropped from the cache whenever the datablock (or any of the given dependencies) is reported as changed
+def cached_hash(cache, datablock, facet, compute, dependencies=()):
+    uid = datablock_key(datablock)
+    key = (uid, facet)
+    dependency_frames = SerializationState.dependency_frames
+    if len(dependency_frames) > 0:
+        dependency_frames[-1]["keys"].append(key)
+    # digests still being computed by the hashing pool
+    if key in cache["pending"]:
+        return cache["pending"][key][0]
+    # even when not using the persistent cache, we never hash the same datablock twice in a single pass
+    if cache["use_hash_cache"] or key in cache["hashed"]:
+        digest = hash_cache.get(key)
+        if digest is not None:
+            cache["hashed"].add(key)
+            return digest
+    dependency_frames.append({"datablock": datablock, "keys": []})
+    try:
+        digest = compute()
+    finally:
+        frame = dependency_frames.pop()
+    dependencies = [uid] + [datablock_key(dependency) for dependency in dependencies if dependency is not None] + frame["keys"]
+    if isinstance(digest, Deferred):
+        cache["pending"][key] = (digest, dependencies)
+    else:
+        hash_cache.set(key, digest, dependencies=dependencies)
+    cache["hashed"].add(key)
+    return digest
+
+# once everything has been gathered, wait for the hashing pool & store the results in the hash cache
+def resolve_pending(cache):
+    for (key, (digest, dependencies)) in cache["pending"].items():
+        hash_cache.set(key, digest.resolve(), dependencies=dependencies)
+    cache["pending"].clear()
 
 def material_hash(material, cache, settings):
-    cached_hash = cache['materials'].get(material.name, None)
-    if cached_hash:
-        return cached_hash
-    else:
-        scan_node_tree = settings.auto_export.materials_in_depth_scan
+    if material is None:
+        return None
+    scan_node_tree = settings.auto_export.materials_in_depth_scan
+    def compute():
         #print("HASHING MATERIAL", material.name)
         hashed_material = generic_fields_hasher_evolved(material, fields_to_ignore_generic, scan_node_tree=scan_node_tree)
         #print("HASHED MATERIAL", hashed_material)
-        hashed_material = str(hashed_material)
-        cache['materials'][material.name] = hashed_material
         return hashed_material
+    return cached_hash(cache, material, ("material", scan_node_tree), compute)
 
 # TODO: this is partially taken from export_materials utilities, perhaps we could avoid having to fetch things multiple times ?
 def materials_hash(obj, cache, settings):
@@ -299,7 +537,7 @@ def materials_hash(obj, cache, settings):
         mat = material_hash(material, cache, settings)
         materials.append(mat)
 
-    return str(h1_hash(str(materials)))
+    return digest_of(materials)
 
 
 def modifier_hash(modifier_data, settings):
@@ -307,7 +545,7 @@ def modifier_hash(modifier_data, settings):
     #print("HASHING MODIFIER", modifier_data.name)
     hashed_modifier = generic_fields_hasher_evolved(modifier_data, fields_to_ignore_generic, scan_node_tree=scan_node_tree)
     #print("modifier", modifier_data.name, "hashed", hashed_modifier)
-    return str(hashed_modifier)
+    return hashed_modifier
     
 def modifiers_hash(object, settings):
     modifiers = []
@@ -315,57 +553,116 @@ def modifiers_hash(object, settings):
         #print("modifier", modifier )# modifier.node_group)
         modifiers.append(modifier_hash(modifier, settings))
         #print("  ")
-    return str(h1_hash(str(modifiers)))
+    return digest_of(modifiers)
 
-
-def serialize_project(settings): 
-    cache = {"materials":{}}
+# any datablock used by the animations of an object: a change to one of them needs to invalidate the cached animation hash
+def animation_dependencies(obj):
+    animation_data = obj.animation_data
+    if animation_data is None:
+        return []
+    actions = [animation_data.action]
+    for track in animation_data.nla_tracks:
+        actions += [strip.action for strip in track.strips]
+    return actions
+
+def modifiers_dependencies(obj):
+    return [getattr(modifier, "node_group", None) for modifier in obj.modifiers]
+
+# the serialized project is a merkle tree: project => scenes/collections/materials => scene => objects
+# the hash of each node is derived from the keys, names & hashes of its children, so comparing the hashes of two nodes
+# tells us in O(1) if anything changed in the whole subtree
+# children are keyed by stable id (see stable_ids.py), names are kept separately, so that renames are not seen as content changes
+SNAPSHOT_VERSION = 3
+
+def child_hash(child):
+    return child["hash"] if isinstance(child, dict) else child
+
+def merkle_node(children, names=None):
+    names = {} if names is None else names
+    hasher = StreamingHasher()
+    for key in sorted(children.keys()):
+        hasher.update_text(key)
+        hasher.update(names.get(key, key))
+        hasher.update(child_hash(children[key]))
+    return {"hash": hasher.hexdigest(), "children": children, "names": names}
+
+def project_snapshot(scenes, collections, materials):
+    snapshot = merkle_node({"scenes": scenes, "collections": collections, "materials": materials})
+    snapshot["version"] = SNAPSHOT_VERSION
+    return snapshot
+
+# pool: hashing pool (see hashing_pool.py), or None to compute all digests directly
+def new_serialization_cache(use_hash_cache, pool=None):
+    return {"use_hash_cache": use_hash_cache, "hashed": set(), "pending": {}, "pool": pool}
+
+
+# use_hash_cache: reuse the hashes of datablocks that have not been reported as changed since the last serialization
+# if False, everything gets re-hashed (and the persistent hash cache refreshed)
+def serialize_project(settings, use_hash_cache=True): 
+    # in background mode (scripts, tests etc) there is no guarantee that we get notified of changes, so we cannot trust the cache
+    pool = new_hashing_pool(settings.auto_export.hashing_workers)
+    cache = new_serialization_cache(use_hash_cache=use_hash_cache and not bpy.app.background, pool=pool)
+    SerializationState.cache = cache
+    # whatever happens, nothing (hashing threads, half computed state) is carried over to the next serialization
+    try:
+        return serialize_project_with_cache(settings, cache)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        SerializationState.cache = None
+        SerializationState.dependency_frames.clear()
+
+def serialize_project_with_cache(settings, cache):
     print("serializing project")
 
-    per_scene = {}
+    # object digests are only computed once all the digests from the hashing pool are available
+    objects_per_scene = {} # scene key => (objects_hashes, object_names, [(object_key, object_field_hashes)])
+    scene_names = {}
     for scene in settings.level_scenes + settings.library_scenes: #bpy.data.scenes:
         print("scene", scene.name)
         # ignore temporary scenes
         if scene.name.startswith(TEMPSCENE_PREFIX):
             continue
-        per_scene[scene.name] = {}
-        
+        scene_key = stable_key(scene)
+        scene_names[scene_key] = scene.name
+        objects_hashes = {}
+        object_names = {}
+        objects_fields = []
 
         custom_properties = custom_properties_hash(scene) if len(scene.keys()) > 0 else None
         # render settings are injected into each scene
-        eevee_settings = generic_fields_hasher_evolved(scene.eevee, fields_to_ignore=fields_to_ignore_generic) # TODO: ignore most of the fields
-        view_settings = generic_fields_hasher_evolved(scene.view_settings, fields_to_ignore=fields_to_ignore_generic)
+        render_settings = cached_hash(cache, scene, "render_settings", lambda: digest_of((
+            generic_fields_hasher_evolved(scene.eevee, fields_to_ignore=fields_to_ignore_generic), # TODO: ignore most of the fields
+            generic_fields_hasher_evolved(scene.view_settings, fields_to_ignore=fields_to_ignore_generic)
+        )))
         
         scene_field_hashes = {
             "custom_properties": custom_properties,
-            "eevee": eevee_settings,
-            "view_settings": view_settings,
+            "render_settings": render_settings,
         }
         #generic_fields_hasher_evolved(scene.eevee, fields_to_ignore=fields_to_ignore_generic)
         # FIXME: how to deal with this cleanly
-        per_scene[scene.name]["____scene_settings"] = str(h1_hash(str(scene_field_hashes)))
+        objects_hashes["____scene_settings"] = digest_of(scene_field_hashes)
 
 
-        for object in scene.objects:
-            object = bpy.data.objects[object.name]
-            #loc, rot, scale = bpy.context.object.matrix_world.decompose()
-            transform = str((object.location, object.rotation_euler, object.scale)) #str((object.matrix_world.to_translation(), object.matrix_world.to_euler('XYZ'), object.matrix_world.to_quaternion()))#
-            visibility = object.visible_get()            
+        # transforms & visibility
+        transforms = transforms_digests(scene)
+        for (index, object) in enumerate(scene.objects):
             custom_properties = custom_properties_hash(object) if len(object.keys()) > 0 else None
-            animations = animation_hash(object)
-            mesh = mesh_hash(object) if object.type == 'MESH' else None
-            camera = camera_hash(object) if object.type == 'CAMERA' else None
-            light = light_hash(object) if object.type == 'LIGHT' else None
-            armature = armature_hash(object) if object.type == 'ARMATURE' else None
-            parent = object.parent.name if object.parent else None
-            collections = [collection.name for collection in object.users_collection]
+            animations = cached_hash(cache, object, "animations", lambda: animation_hash(object, cache), dependencies=animation_dependencies(object)) if object.animation_data else None
+            # object data can be shared between multiple objects, so it is cached per data, not per object
+            mesh = cached_hash(cache, object.data, "mesh", lambda: digest_in_pool(cache["pool"], mesh_arrays(object.data))) if object.type == 'MESH' else None
+            camera = cached_hash(cache, object.data, "camera", lambda: camera_hash(object)) if object.type == 'CAMERA' else None
+            light = cached_hash(cache, object.data, "light", lambda: light_hash(object)) if object.type == 'LIGHT' else None
+            armature = cached_hash(cache, object.data, "armature", lambda: digest_in_pool(cache["pool"], armature_buffers(object.data))) if object.type == 'ARMATURE' else None
+            parent = stable_key(object.parent) if object.parent else None
+            collections = [stable_key(collection) for collection in object.users_collection]
             materials = materials_hash(object, cache, settings) if len(object.material_slots) > 0 else None
-            modifiers = modifiers_hash(object, settings) if len(object.modifiers) > 0 else None
+            modifiers = cached_hash(cache, object, ("modifiers", settings.auto_export.modifiers_in_depth_scan), lambda: modifiers_hash(object, settings), dependencies=modifiers_dependencies(object)) if len(object.modifiers) > 0 else None
 
+            # the name is not part of the hash: renames are tracked separately
             object_field_hashes = {
-                "name": object.name,
-                "transforms": transform,
-                "visibility": visibility,
+                "transforms": transforms[index],
                 "custom_properties": custom_properties,
                 "animations": animations,
                 "mesh": mesh,
@@ -379,10 +676,14 @@ def serialize_project(settings):
             }
 
             object_field_hashes_filtered = {key: object_field_hashes[key] for key in object_field_hashes.keys() if object_field_hashes[key] is not None}
-            objectHash = str(h1_hash(str(object_field_hashes_filtered)))
-            per_scene[scene.name][object.name] = objectHash
+            object_key = stable_key(object)
+            objects_fields.append((object_key, object_field_hashes_filtered))
+            object_names[object_key] = object.name
+
+        objects_per_scene[scene_key] = (objects_hashes, object_names, objects_fields)
 
     per_collection = {}
+    collection_names = {}
     # also hash collections (important to catch component changes per blueprints/collections)
     # collections_in_scene = [collection for collection in bpy.data.collections if scene.user_of_id(collection)]
     for collection in bpy.data.collections:# collections_in_scene:
@@ -393,7 +694,6 @@ def serialize_project(settings):
         #collections = [collection.name for collection in object.users_collection]
 
         collection_field_hashes = {
-            "name": collection.name,
             # "visibility": visibility,
             "custom_properties": custom_properties,
             #"parent": parent,
@@ -402,15 +702,30 @@ def serialize_project(settings):
 
         collection_field_hashes_filtered = {key: collection_field_hashes[key] for key in collection_field_hashes.keys() if collection_field_hashes[key] is not None}
 
-        collectionHash = str(h1_hash(str(collection_field_hashes_filtered)))
-        per_collection[collection.name] = collectionHash
+        collectionHash = digest_of(collection_field_hashes_filtered)
+        collection_key = stable_key(collection)
+        per_collection[collection_key] = collectionHash
+        collection_names[collection_key] = collection.name
 
     # and also hash materials to avoid constanstly exporting materials libraries, and only 
     # actually this should be similar to change detections for scenes
     per_material = {}
+    material_names = {}
     for material in bpy.data.materials:
-        per_material[material.name] = str(h1_hash(material_hash(material, cache, settings)))
+        material_key = stable_key(material)
+        per_material[material_key] = material_hash(material, cache, settings)
+        material_names[material_key] = material.name
+
+    # digest phase: wait for the hashing pool, then compute the object digests (Deferred values get resolved by feed_value)
+    resolve_pending(cache)
+    # entries of datablocks that were not part of this pass are not needed anymore
+    hash_cache.retain(cache["hashed"])
+    per_scene = {}
+    for (scene_key, (objects_hashes, object_names, objects_fields)) in objects_per_scene.items():
+        for (object_key, object_field_hashes) in objects_fields:
+            objects_hashes[object_key] = digest_of(object_field_hashes)
+        per_scene[scene_key] = merkle_node(objects_hashes, object_names)
 
-    return {"scenes": per_scene, "collections": per_collection, "materials": per_material}
+    return project_snapshot(merkle_node(per_scene, scene_names), merkle_node(per_collection, collection_names), merkle_node(per_material, material_names))
 
 
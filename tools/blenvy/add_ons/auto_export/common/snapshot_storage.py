@@ -0,0 +1,224 @@
+import base64
+import json
+import struct
+import zlib
+import bpy
+
+# storage of the previous serialized project (see serialize_project.py), used to determine what changed since the last export
+# instead of json, the snapshot is stored in a compact binary format:
+#  - digests are stored as fixed width binary values instead of hex strings
+#  - all keys & names are interned in a string table
+#  - the whole thing is zlib compressed (if that helps)
+# as text datablocks can only contain text, the result is base64 encoded, with a prefix to tell it apart from the old json format
+SNAPSHOT_TEXT_NAME = ".blenvy.project_serialized_previous"
+SNAPSHOT_PREFIX = "blenvy_snapshot:"
+FORMAT_VERSION = 1
+DIGEST_SIZE = 16
+
+FLAG_COMPRESSED = 1
+
+VALUE_DIGEST = 0
+VALUE_NODE = 1
+VALUE_NONE = 2
+VALUE_STRING = 3
+
+def write_varint(buffer, value):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def read_varint(data, offset):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return (value, offset)
+        shift += 7
+
+def as_digest(value):
+    if len(value) != DIGEST_SIZE * 2:
+        return None
+    try:
+        return bytes.fromhex(value)
+    except ValueError:
+        return None
+
+class SnapshotWriter:
+    def __init__(self):
+        self.strings = {} # string => index in the string table
+        self.body = bytearray()
+
+    def intern(self, string):
+        if not string in self.strings:
+            self.strings[string] = len(self.strings)
+        return self.strings[string]
+
+    def write_value(self, value):
+        if value is None:
+            self.body.append(VALUE_NONE)
+        elif isinstance(value, dict):
+            self.body.append(VALUE_NODE)
+            self.write_node(value)
+        else:
+            digest = as_digest(value)
+            if digest is not None:
+                self.body.append(VALUE_DIGEST)
+                self.body += digest
+            else:
+                self.body.append(VALUE_STRING)
+                write_varint(self.body, self.intern(value))
+
+    def write_node(self, node):
+        self.write_value(node["hash"])
+        children = node["children"]
+        names = node.get("names", {})
+        write_varint(self.body, len(children))
+        for (key, child) in children.items():
+            write_varint(self.body, self.intern(key))
+            # 0 means no name, otherwise index + 1
+            write_varint(self.body, self.intern(names[key]) + 1 if key in names else 0)
+            self.write_value(child)
+
+    def string_table(self):
+        table = bytearray()
+        write_varint(table, len(self.strings))
+        for string in self.strings: # dicts keep insertion order, so this is in index order
+            encoded = string.encode("utf-8")
+            write_varint(table, len(encoded))
+            table += encoded
+        return table
+
+class SnapshotReader:
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+        self.strings = []
+
+    def varint(self):
+        (value, self.offset) = read_varint(self.data, self.offset)
+        return value
+
+    def read_string_table(self):
+        for _ in range(self.varint()):
+            length = self.varint()
+            self.strings.append(bytes(self.data[self.offset:self.offset + length]).decode("utf-8"))
+            self.offset += length
+
+    def read_value(self):
+        kind = self.data[self.offset]
+        self.offset += 1
+        if kind == VALUE_NONE:
+            return None
+        if kind == VALUE_NODE:
+            return self.read_node()
+        if kind == VALUE_DIGEST:
+            digest = bytes(self.data[self.offset:self.offset + DIGEST_SIZE]).hex()
+            self.offset += DIGEST_SIZE
+            return digest
+        if kind == VALUE_STRING:
+            return self.strings[self.varint()]
+        raise ValueError(f"invalid value kind {kind} in snapshot")
+
+    def read_node(self):
+        node_hash = self.read_value()
+        children = {}
+        names = {}
+        for _ in range(self.varint()):
+            key = self.strings[self.varint()]
+            name_index = self.varint()
+            if name_index > 0:
+                names[key] = self.strings[name_index - 1]
+            children[key] = self.read_value()
+        return {"hash": node_hash, "children": children, "names": names}
+
+def encode_snapshot(snapshot, compress=True):
+    writer = SnapshotWriter()
+    writer.write_node(snapshot)
+    payload = bytearray()
+    write_varint(payload, snapshot.get("version", 1))
+    payload += writer.string_table()
+    payload += writer.body
+
+    flags = 0
+    if compress:
+        compressed = zlib.compress(bytes(payload), 6)
+        if len(compressed) < len(payload):
+            (payload, flags) = (compressed, FLAG_COMPRESSED)
+    blob = struct.pack("<BB", FORMAT_VERSION, flags) + bytes(payload)
+    return SNAPSHOT_PREFIX + base64.b64encode(blob).decode("ascii")
+
+def decode_snapshot(text):
+    blob = base64.b64decode(text[len(SNAPSHOT_PREFIX):])
+    (format_version, flags) = struct.unpack_from("<BB", blob)
+    if format_version != FORMAT_VERSION:
+        raise ValueError(f"unsupported snapshot format {format_version}")
+    payload = blob[2:]
+    if flags & FLAG_COMPRESSED:
+        payload = zlib.decompress(payload)
+
+    reader = SnapshotReader(memoryview(payload))
+    snapshot_version = reader.varint()
+    reader.read_string_table()
+    snapshot = reader.read_node()
+    snapshot["version"] = snapshot_version
+    return snapshot
+
+# the snapshot is only decoded once per session (or after loading a file, undo/redo), and only if needed
+# after each export, we keep the current snapshot around, so the next diff does not need to read it back at all
+class SnapshotStore:
+    def __init__(self):
+        self.snapshot = None
+        self.loaded = False
+
+    def forget(self):
+        self.snapshot = None
+        self.loaded = False
+
+snapshot_store = SnapshotStore()
+
+def load_previous_snapshot():
+    if not snapshot_store.loaded:
+        snapshot_store.snapshot = read_snapshot_text()
+        snapshot_store.loaded = True
+    return snapshot_store.snapshot
+
+def read_snapshot_text():
+    stored = bpy.data.texts.get(SNAPSHOT_TEXT_NAME, None)
+    if stored is None:
+        return None
+    text = stored.as_string()
+    try:
+        if text.startswith(SNAPSHOT_PREFIX):
+            return decode_snapshot(text)
+        # snapshots from older versions are stored as json, they get converted the next time the snapshot is saved
+        return json.loads(text)
+    except Exception as error:
+        print("failed to load the previous serialized project, Error:", error)
+        return None
+
+def save_previous_snapshot(snapshot):
+    previous = load_previous_snapshot()
+    stored = bpy.data.texts.get(SNAPSHOT_TEXT_NAME, None)
+    # nothing changed: no need to write anything
+    unchanged = stored is not None and previous is not None and previous.get("version", 1) == snapshot.get("version", 1) and previous.get("hash", None) == snapshot["hash"]
+    if not unchanged:
+        if stored is None:
+            stored = bpy.data.texts.new(SNAPSHOT_TEXT_NAME)
+        stored.clear()
+        stored.write(encode_snapshot(snapshot))
+    snapshot_store.snapshot = snapshot
+    snapshot_store.loaded = True
+
+def forget_previous_snapshot():
+    snapshot_store.forget()
+
+def clear_previous_snapshot():
+    snapshot_store.forget()
+    texts = bpy.data.texts
+    stored = texts.get(SNAPSHOT_TEXT_NAME, None)
+    if stored is not None:
+        texts.remove(stored, do_unlink=True)
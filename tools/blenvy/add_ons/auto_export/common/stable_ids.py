@@ -0,0 +1,40 @@
+import uuid
+import bpy
+
+# Blender has no persistent identity for datablocks: names change on renames, and session_uid/pointers do not survive reloading the file
+# so we stamp our own id on the datablocks we track changes for; it is stored as a property, and thus saved together with the .blend file
+def new_stable_id():
+    return uuid.uuid4().hex
+
+def tracked_datablocks():
+    return [bpy.data.scenes, bpy.data.objects, bpy.data.collections, bpy.data.materials]
+
+# key used in the serialized project: the stable id if there is one, the name otherwise (ie for linked datablocks, that we cannot modify)
+def stable_key(datablock):
+    return datablock.blenvy_id if datablock.blenvy_id != "" else datablock.name
+
+# previous_names: stable id => name in the previous serialized project
+def ensure_stable_ids(datablocks, previous_names={}):
+    datablocks_per_id = {}
+    for datablock in datablocks:
+        if datablock.library is not None:
+            continue
+        if not datablock.blenvy_id in datablocks_per_id:
+            datablocks_per_id[datablock.blenvy_id] = []
+        datablocks_per_id[datablock.blenvy_id].append(datablock)
+
+    for (stable_id, owners) in datablocks_per_id.items():
+        if stable_id == "":
+            for datablock in owners:
+                datablock.blenvy_id = new_stable_id()
+        elif len(owners) > 1:
+            # copies (duplicated objects, copied scenes etc) carry over the id of their original: the original keeps it, the copies get new ones
+            previous_name = previous_names.get(stable_id, None)
+            original = next((datablock for datablock in owners if datablock.name == previous_name), owners[0])
+            for datablock in owners:
+                if datablock != original:
+                    datablock.blenvy_id = new_stable_id()
+
+def ensure_all_stable_ids(previous_names={}):
+    for datablocks in tracked_datablocks():
+        ensure_stable_ids(datablocks, previous_names)
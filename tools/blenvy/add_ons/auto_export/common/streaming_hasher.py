@@ -0,0 +1,94 @@
+import hashlib
+import math
+import struct
+import numpy as np
+
+# feeds typed values directly into an incremental blake2b hash, instead of converting everything to (huge) strings first
+# every value is written as a type tag + a canonical encoding, with lengths for anything variable sized,
+# so that different values (or nestings of values) can never end up with the same byte stream
+class StreamingHasher:
+    def __init__(self, fallback=None, digest_size=16):
+        self.hasher = hashlib.blake2b(digest_size=digest_size)
+        # called for any value the hasher does not know how to encode (ie Blender data): fallback(hasher, value)
+        self.fallback = fallback
+
+    def update(self, value):
+        if value is None:
+            self.hasher.update(b"N")
+        elif isinstance(value, bool):
+            self.hasher.update(b"T" if value else b"F")
+        elif isinstance(value, int):
+            self.update_int(value)
+        elif isinstance(value, float):
+            self.update_float(value)
+        elif isinstance(value, str):
+            self.update_text(value)
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            self.update_bytes(value)
+        elif isinstance(value, np.ndarray):
+            self.update_array(value)
+        elif isinstance(value, np.generic):
+            self.update(value.item())
+        elif isinstance(value, dict):
+            self.update_dict(value)
+        elif isinstance(value, (list, tuple)):
+            self.update_sequence(value)
+        elif isinstance(value, (set, frozenset)):
+            self.update_set(value)
+        elif self.fallback is not None:
+            self.fallback(self, value)
+        else:
+            self.update_text(str(value))
+        return self
+
+    def update_int(self, value):
+        if -2**63 <= value < 2**63:
+            self.hasher.update(b"I" + struct.pack("<q", value))
+        else:
+            self.update_text(str(value))
+
+    def update_float(self, value):
+        # -0.0 and 0.0 are considered equal, and all NaNs are the same NaN
+        if value == 0.0:
+            value = 0.0
+        elif math.isnan(value):
+            value = math.nan
+        self.hasher.update(b"D" + struct.pack("<d", value))
+
+    def update_text(self, value):
+        self.update_bytes(value.encode("utf-8"), tag=b"S")
+
+    def update_bytes(self, value, tag=b"B"):
+        self.hasher.update(tag + struct.pack("<Q", len(value)))
+        self.hasher.update(value)
+
+    def update_array(self, value):
+        value = np.ascontiguousarray(value)
+        self.update_text(value.dtype.str)
+        self.hasher.update(b"A" + struct.pack("<Q", value.ndim) + struct.pack(f"<{value.ndim}Q", *value.shape))
+        # hashlib releases the GIL for large buffers, no copy needed
+        self.hasher.update(memoryview(value).cast("B"))
+
+    def update_sequence(self, value):
+        self.hasher.update(b"L" + struct.pack("<Q", len(value)))
+        for item in value:
+            self.update(item)
+
+    def update_dict(self, value):
+        self.hasher.update(b"M" + struct.pack("<Q", len(value)))
+        for key in sorted(value.keys(), key=str):
+            self.update(key)
+            self.update(value[key])
+
+    def update_set(self, value):
+        # sets have no defined order, so we sort the digests of their items
+        item_digests = sorted(StreamingHasher(self.fallback).update(item).digest() for item in value)
+        self.hasher.update(b"E" + struct.pack("<Q", len(item_digests)))
+        for item_digest in item_digests:
+            self.hasher.update(item_digest)
+
+    def digest(self):
+        return self.hasher.digest()
+
+    def hexdigest(self):
+        return self.hasher.hexdigest()
@@ -5,12 +5,14 @@ from bpy.types import (PropertyGroup)
 from bpy.props import (PointerProperty, IntProperty, StringProperty)
 
 from .prepare_and_export import prepare_and_export
+from .hash_cache import invalidate_datablock, clear_hash_cache
+from .snapshot_storage import forget_previous_snapshot
+from .change_journal import record_update, clear_change_journal
 
 from ..constants import TEMPSCENE_PREFIX
 
 class AutoExportTracker(PropertyGroup):
 
-    changed_objects_per_scene = {}
     change_detection_enabled = True
     export_params_changed = False
 
@@ -43,7 +45,11 @@ class AutoExportTracker(PropertyGroup):
     def register(cls):
         bpy.types.WindowManager.auto_export_tracker = PointerProperty(type=AutoExportTracker)
 
-        bpy.types.Scene.id_test = StringProperty(default="")
+        # stable ids used for change detection, see stable_ids.py
+        bpy.types.Scene.blenvy_id = StringProperty(default="", options={'HIDDEN'})
+        bpy.types.Object.blenvy_id = StringProperty(default="", options={'HIDDEN'})
+        bpy.types.Collection.blenvy_id = StringProperty(default="", options={'HIDDEN'})
+        bpy.types.Material.blenvy_id = StringProperty(default="", options={'HIDDEN'})
 
         # setup handlers for updates & saving
         #bpy.app.handlers.save_post.append(cls.save_handler)
@@ -60,7 +66,10 @@ class AutoExportTracker(PropertyGroup):
         except:pass"""
         del bpy.types.WindowManager.auto_export_tracker
 
-        del bpy.types.Scene.id_test
+        del bpy.types.Scene.blenvy_id
+        del bpy.types.Object.blenvy_id
+        del bpy.types.Collection.blenvy_id
+        del bpy.types.Material.blenvy_id
 
     @classmethod
     def save_handler(cls, scene, depsgraph):
@@ -70,8 +79,6 @@ class AutoExportTracker(PropertyGroup):
         # (re)set a few things after exporting
         # reset wether the gltf export paramters were changed since the last save 
         cls.export_params_changed = False
-        # reset whether there have been changed objects since the last save 
-        cls.changed_objects_per_scene.clear()
         # all our logic is done, mark this as done
 
     @classmethod
@@ -79,6 +86,15 @@ class AutoExportTracker(PropertyGroup):
         # print("change detection enabled", cls.change_detection_enabled)
         #print("change detected", list(map(lambda x: x.name, list(bpy.data.scenes))))
 
+        # always drop the cached hashes of changed datablocks, even when exporting, or when bailing out below
+        # likewise, the journal needs to see every change, otherwise exports could wrongly skip serializing the project (see project_diff)
+        # the actual work happens later: the journal coalesces repeated updates & gets flushed by a timer
+        record_changes = not scene.name.startswith(TEMPSCENE_PREFIX)
+        for update in depsgraph.updates:
+            invalidate_datablock(update.id)
+            if record_changes:
+                record_update(update, scene.name)
+
         """ops = bpy.context.window_manager.operators
         print("last operators", ops)
         for op in ops:
@@ -108,59 +124,6 @@ class AutoExportTracker(PropertyGroup):
                 print("setting stuff for auto_export")
                 return
 
-        # only deal with changes if we are NOT in the mids of saving/exporting
-        if cls.change_detection_enabled:
-            # ignore anything going on with temporary scenes
-            if not scene.name.startswith(TEMPSCENE_PREFIX):
-                #print("depsgraph_update_post", scene.name)
-                changed_scene = scene.name or ""
-                #print("-------------")
-                if not changed_scene in cls.changed_objects_per_scene:
-                    cls.changed_objects_per_scene[changed_scene] = {}
-                # print("cls.changed_objects_per_scene", cls.changed_objects_per_scene)
-                # depsgraph = bpy.context.evaluated_depsgraph_get()
-                for obj in depsgraph.updates:
-                    #print("depsgraph update", obj)
-                    if isinstance(obj.id, bpy.types.Object):
-                        # get the actual object
-                        object = bpy.data.objects[obj.id.name]
-                        #print("  changed object", obj.id.name, "changes", obj, "evalutated", obj.id.is_evaluated, "transforms", obj.is_updated_transform, "geometry", obj.is_updated_geometry)
-                        if obj.is_updated_transform or obj.is_updated_geometry:
-                            cls.changed_objects_per_scene[scene.name][obj.id.name] = object
-                        
-                    elif isinstance(obj.id, bpy.types.Material): # or isinstance(obj.id, bpy.types.ShaderNodeTree):
-                        # print("  changed material", obj.id, "scene", scene.name,)
-                        material = bpy.data.materials[obj.id.name]
-                        #now find which objects are using the material
-                        for obj in bpy.data.objects:
-                            for slot in obj.material_slots:
-                                if slot.material == material:
-                                    cls.changed_objects_per_scene[scene.name][obj.name] = obj
-                #print("changed_objects_per_scene", cls.changed_objects_per_scene)
-                """for obj_name_original in cls.changed_objects_per_scene[scene_name]:
-                    if obj_name_original != ls.changed_objects_per_scene[scene_name][obj_name_original]"""
-                items = 0
-                for scene_name in cls.changed_objects_per_scene:
-                    items += len(cls.changed_objects_per_scene[scene_name].keys())
-                if items == 0:
-                    cls.changed_objects_per_scene.clear()
-                #print("changed_objects_per_scene", cls.changed_objects_per_scene)
-
-        # filter out invalid objects
-        """for scene_name in cls.changed_objects_per_scene.keys():
-            bla = {}
-            for object_name in cls.changed_objects_per_scene[scene.name]:
-                object = cls.changed_objects_per_scene[scene.name][object_name]"""
-                #print("sdfsd", object, object.valid)
-                #if not cls.changed_objects_per_scene[scene.name][object_name].invalid:
-                #    bla[object_name] = cls.changed_objects_per_scene[scene.name][object_name]
-            #cls.changed_objects_per_scene[scene.name]= bla
-            #cls.changed_objects_per_scene[scene_name] = [o for o in cls.changed_objects_per_scene[scene_name] if not o.invalid]
-        
-        # get a list of exportable collections for display
-        # keep it simple, just use Simplenamespace for compatibility with the rest of our code
-        # TODO: debounce
-
     def disable_change_detection(self):
         #print("disable change detection")
         self.change_detection_enabled = False
@@ -174,9 +137,15 @@ class AutoExportTracker(PropertyGroup):
         #print("bpy.context.window_manager.auto_export_tracker.change_detection_enabled", bpy.context.window_manager.auto_export_tracker.change_detection_enabled)
         return None
     
+    # after loading a file or undo/redo, datablocks (including the stored previous snapshot) can change without us being notified
+    @classmethod
+    def reset_caches(cls):
+        clear_hash_cache()
+        clear_change_journal()
+        forget_previous_snapshot()
+
     def clear_changes(self):
-        self.changed_objects_per_scene.clear()
-        self.__class__.changed_objects_per_scene.clear()
+        clear_change_journal()
 
     def export_finished(self):
         #print("export_finished")
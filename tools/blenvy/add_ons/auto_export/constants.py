@@ -7,5 +7,6 @@ custom_properties_to_filter_out = [
     'components_meta', 'Components_meta', 
     '_combine', 'template', 
     'Blenvy_scene_type', 'blenvy_scene_type',
+    'blenvy_id',
     'materials_path', 'export_path',
 ]
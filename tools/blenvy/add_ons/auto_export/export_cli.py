@@ -0,0 +1,78 @@
+# command line export, for build machines, continuous integration & co: no user interface (nor display) needed
+#   blender --background <project.blend> --python-exit-code 1 --python <path to blenvy>/add_ons/auto_export/export_cli.py -- [options]
+# (without --python-exit-code, Blender exits with code 0 if this script fails before calling sys.exit)
+# run it with --help for the list of options, see also README-export.md
+# this is run as a plain script, not as part of the add-on, so it only uses absolute imports
+import sys
+import os
+import json
+import argparse
+import traceback
+import importlib
+import addon_utils
+
+REPORT_PREFIX = "BLENVY_EXPORT_REPORT "
+
+def parse_arguments():
+    arguments = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="export_cli.py", description="Exports the Blenvy project loaded in Blender (in background mode) to gltf files")
+    parser.add_argument("--mode", choices=["incremental", "full"], default="incremental", help="incremental: only export what changed since the last export (default), full: export everything")
+    parser.add_argument("--dry-run", action="store_true", help="go through the whole export process, without writing any gltf file")
+    parser.add_argument("--output-dir", default=None, help="assets folder to export to (default: the one in the project's settings)")
+    parser.add_argument("--workers", type=int, default=None, help="number of background Blender processes exporting in parallel (default: the one in the project's settings)")
+    parser.add_argument("--report", default=None, help=f"path of the json report to write (default: printed to the console, on a line starting with '{REPORT_PREFIX.strip()}')")
+    parser.add_argument("--addon-module", default=None, help="module name of the Blenvy add-on (default: found automatically)")
+    return parser.parse_args(arguments)
+
+# the module name of the add-on this script is part of, whether it is installed as an add-on, as an extension, or not at all
+def find_addon_module(addon_root):
+    for module in addon_utils.modules():
+        if os.path.normcase(os.path.dirname(os.path.abspath(module.__file__))) == os.path.normcase(addon_root):
+            return module.__name__
+    # not installed: import it directly from where it is
+    sys.path.append(os.path.dirname(addon_root))
+    return os.path.basename(addon_root)
+
+# whatever got into the export report before the failure (if the add-on got that far), plus the failure itself
+def failure_report(addon_module):
+    export_report = sys.modules.get(addon_module + ".add_ons.auto_export.common.export_report", None) if addon_module is not None else None
+    report = export_report.export_report.to_dict() if export_report is not None else {"stages": {}, "changes": {}, "files": [], "counts": {}, "errors": []}
+    report["errors"].append(traceback.format_exc())
+    report["success"] = False
+    return report
+
+def write_report(report, report_path):
+    if report_path is not None:
+        with open(report_path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+    else:
+        print(REPORT_PREFIX + json.dumps(report))
+
+def main():
+    arguments = parse_arguments()
+    addon_module = None
+    # anything failing outside of the export itself (enabling the add-on, change detection etc) must still produce a report & a failure exit code
+    try:
+        addon_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+        addon_module = arguments.addon_module if arguments.addon_module is not None else find_addon_module(addon_root)
+        (_, loaded) = addon_utils.check(addon_module)
+        if not loaded:
+            # the gltf exporter only calls the hooks of add-ons listed in the preferences (see glTF2ExportUserExtension), which are not saved in background mode
+            # failures are only printed by addon_utils, not raised
+            if addon_utils.enable(addon_module, default_set=True, persistent=True) is None:
+                raise RuntimeError(f"could not enable the Blenvy add-on ({addon_module})")
+
+        command_line_export = importlib.import_module(addon_module + ".add_ons.auto_export.common.command_line_export")
+        report = command_line_export.run_command_line_export(
+            full=arguments.mode == "full",
+            dry_run=arguments.dry_run,
+            output_dir=os.path.abspath(arguments.output_dir) if arguments.output_dir is not None else None,
+            workers=arguments.workers
+        )
+    except Exception:
+        traceback.print_exc()
+        report = failure_report(addon_module)
+    write_report(report, arguments.report)
+    sys.exit(0 if report["success"] else 1)
+
+main()
@@ -2,7 +2,9 @@ import os
 
 from ..constants import TEMPSCENE_PREFIX
 from ..common.generate_temporary_scene_and_export import generate_temporary_scene_and_export, copy_hollowed_collection_into, clear_hollow_scene
-from ..common.export_gltf import (generate_gltf_export_settings, export_gltf)
+from ..common.export_gltf import (generate_gltf_export_settings, export_gltf, is_gltf_export_up_to_date, gltf_output_file_path)
+from ..common.export_report import export_report
+from ..common.export_inputs import export_inputs
 from .is_object_dynamic import is_object_dynamic, is_object_static
 from ..utils import upsert_scene_assets, write_level_metadata_file
 
@@ -41,7 +43,8 @@ def export_level_scene(scene, settings, blueprints_data):
                 gltf_export_settings=gltf_export_settings,
                 gltf_output_path=gltf_output_path,
                 tempScene_filler= lambda temp_collection: copy_hollowed_collection_into(scene.collection, temp_collection, blueprints_data=blueprints_data, filter=is_object_static, settings=settings),
-                tempScene_cleaner= lambda temp_scene, params: clear_hollow_scene(original_root_collection=scene.collection, temp_scene=temp_scene, **params)
+                tempScene_cleaner= lambda temp_scene, params: clear_hollow_scene(original_root_collection=scene.collection, temp_scene=temp_scene, **params),
+                inputs=export_inputs.level(scene)
             )
 
             # then export all dynamic objects
@@ -53,7 +56,8 @@ def export_level_scene(scene, settings, blueprints_data):
                 gltf_export_settings=gltf_export_settings,
                 gltf_output_path=gltf_output_path,
                 tempScene_filler= lambda temp_collection: copy_hollowed_collection_into(scene.collection, temp_collection, blueprints_data=blueprints_data, filter=is_object_dynamic, settings=settings),
-                tempScene_cleaner= lambda temp_scene, params: clear_hollow_scene(original_root_collection=scene.collection, temp_scene=temp_scene, **params)
+                tempScene_cleaner= lambda temp_scene, params: clear_hollow_scene(original_root_collection=scene.collection, temp_scene=temp_scene, **params),
+                inputs=export_inputs.level(scene)
             )
 
         else:
@@ -65,14 +69,20 @@ def export_level_scene(scene, settings, blueprints_data):
                 gltf_export_settings=gltf_export_settings,
                 gltf_output_path=gltf_output_path,
                 tempScene_filler= lambda temp_collection: copy_hollowed_collection_into(scene.collection, temp_collection, blueprints_data=blueprints_data, settings=settings),
-                tempScene_cleaner= lambda temp_scene, params: clear_hollow_scene(original_root_collection=scene.collection, temp_scene=temp_scene, **params)
+                tempScene_cleaner= lambda temp_scene, params: clear_hollow_scene(original_root_collection=scene.collection, temp_scene=temp_scene, **params),
+                inputs=export_inputs.level(scene)
             )
 
     else:
         gltf_output_path = os.path.join(assets_path_full, scene.name)
         print("       exporting gltf to", gltf_output_path, ".gltf/glb")
         if settings.auto_export.dry_run == "DISABLED":
-            export_gltf(gltf_output_path, gltf_export_settings)
+            inputs = export_inputs.whole_level(scene)
+            if is_gltf_export_up_to_date(gltf_output_path, gltf_export_settings, inputs):
+                print("       skipping export of", gltf_output_path, ": already up to date")
+                export_report.file(gltf_output_file_path(gltf_output_path, gltf_export_settings), 'UP_TO_DATE')
+            else:
+                export_gltf(gltf_output_path, gltf_export_settings, inputs)
 
 
 
@@ -1,7 +1,9 @@
 import bpy
 from ....blueprints.blueprint_helpers import check_if_blueprint_on_disk
+from ....blueprints.blueprints_graph import is_embedded
 
 # IF collection_instances_combine_mode is not 'split' check for each scene if any object in changes_per_scene has an instance in the scene
+# changes to blueprints nested (at any depth) inside embedded blueprints are taken into account, see blueprints_graph.py
 def changed_object_in_scene(scene_name, changes_per_scene, blueprints_data, collection_instances_combine_mode):
     # Embed / EmbedExternal
     blueprints_from_objects = blueprints_data.blueprints_from_objects
@@ -9,28 +11,16 @@ def changed_object_in_scene(scene_name, changes_per_scene, blueprints_data, coll
     blueprint_instances_in_scene = blueprints_data.blueprint_instances_per_level_scene.get(scene_name, None)
     if blueprint_instances_in_scene is not None:
         changed_objects = [object_name for change in changes_per_scene.values() for object_name in change.keys()] 
-        changed_blueprints = [blueprints_from_objects[changed] for changed in changed_objects if changed in blueprints_from_objects]
-        changed_blueprints_with_instances_in_scene = [blueprint for blueprint in changed_blueprints if blueprint.name in blueprint_instances_in_scene.keys()]
-
-
-        changed_blueprint_instances= [object for blueprint in changed_blueprints_with_instances_in_scene for object in blueprint_instances_in_scene[blueprint.name]]
-        # print("changed_blueprint_instances", changed_blueprint_instances,)
-
-        level_needs_export = False
-        for blueprint_instance in changed_blueprint_instances:
-            blueprint = blueprints_data.blueprint_name_from_instances[blueprint_instance]
-            combine_mode = blueprint_instance['_combine'] if '_combine' in blueprint_instance else collection_instances_combine_mode
-            #print("COMBINE MODE FOR OBJECT", combine_mode)
-            if combine_mode == 'Embed':
-                level_needs_export = True
-                break
-            elif combine_mode == 'EmbedExternal' and not blueprint.local:
-                level_needs_export = True
-                break
-        # changes => list of changed objects (regardless of wether they have been changed in level scene or in lib scene)
-        # wich of those objects are blueprint instances
-        # we need a list of changed objects that are blueprint instances
-        return level_needs_export
+        changed_blueprint_names = set(blueprints_from_objects[changed].name for changed in changed_objects if changed in blueprints_from_objects)
+        invalidated_blueprint_names = blueprints_data.blueprints_graph.invalidate(changed_blueprint_names, collection_instances_combine_mode)
+
+        for (blueprint_name, blueprint_instances) in blueprint_instances_in_scene.items():
+            blueprint = blueprints_data.blueprints_per_name.get(blueprint_name, None)
+            if blueprint is None or not blueprint_name in invalidated_blueprint_names:
+                continue
+            # the level only needs to be exported if the changed blueprint is actually embedded into it
+            if any(is_embedded(blueprint_instance, blueprint, collection_instances_combine_mode) for blueprint_instance in blueprint_instances):
+                return True
     return False
 
 def is_level_always_export(scene_name):
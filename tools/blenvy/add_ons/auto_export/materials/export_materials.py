@@ -4,6 +4,7 @@ from ....core.helpers_collections import traverse_tree
 from ....core.object_makers import make_cube
 from ..common.generate_temporary_scene_and_export import generate_temporary_scene_and_export
 from ..common.export_gltf import (generate_gltf_export_settings)
+from ..common.export_inputs import export_inputs
 
 # material library logic
 # To avoid redundant materials (can be very costly, mostly when using high res textures)
@@ -65,8 +66,7 @@ def clear_materials_scene(temp_scene):
         try:
             bpy.data.objects.remove(object, do_unlink=True)
         except:pass
-
-    bpy.data.scenes.remove(temp_scene)
+    # the temporary scene itself is reused for the next exports, see generate_temporary_scene_and_export.py
 
 # exports the materials used inside the current project:
 def export_materials(materials_to_export, settings, blueprints_data):
@@ -92,7 +92,8 @@ def export_materials(materials_to_export, settings, blueprints_data):
             temp_scene_name="__materials_scene",
             gltf_output_path=gltf_output_path,
             tempScene_filler= lambda temp_collection: generate_material_scene_content(temp_collection, material.name),
-            tempScene_cleaner= lambda temp_scene, params: clear_materials_scene(temp_scene=temp_scene)
+            tempScene_cleaner= lambda temp_scene, params: clear_materials_scene(temp_scene=temp_scene),
+            inputs=export_inputs.material(material)
         )
 
     
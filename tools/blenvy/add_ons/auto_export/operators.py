@@ -0,0 +1,18 @@
+from bpy_types import (Operator)
+
+from .common.project_diff import verify_all
+
+class BLENVY_OT_auto_export_verify_all(Operator):
+    """Re-hash the whole project instead of relying on cached hashes (use this if data was changed in ways Blender does not notify about, like scripts)"""
+    bl_idname = "blenvy.auto_export_verify_all"
+    bl_label = "Verify all"
+
+    def execute(self, context):
+        blenvy = context.window_manager.blenvy
+        try:
+            outdated = verify_all(blenvy)
+        except Exception as error:
+            self.report({"ERROR"}, f"Failed to verify change detection data: {error}")
+            return {"CANCELLED"}
+        self.report({"INFO"}, f"Change detection data verified: {len(outdated)} outdated entries refreshed")
+        return {'FINISHED'}
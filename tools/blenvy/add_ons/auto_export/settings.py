@@ -1,7 +1,8 @@
 import bpy
 from bpy_types import (PropertyGroup)
-from bpy.props import (EnumProperty, BoolProperty)
+from bpy.props import (EnumProperty, BoolProperty, IntProperty)
 from ...settings import load_settings, upsert_settings, generate_complete_settings_dict, clear_settings
+from .common.snapshot_storage import clear_previous_snapshot
 
 # list of settings we do NOT want to save
 settings_black_list = ['settings_save_enabled', 'dry_run']
@@ -45,6 +46,24 @@ class AutoExportSettings(PropertyGroup):
         update=save_settings
     ) # type: ignore
 
+    hashing_workers: IntProperty(
+        name='Hashing workers',
+        description='number of threads used to hash meshes, armatures & animations during change detection (1 to hash everything on the main thread)',
+        default=4,
+        min=1,
+        max=32,
+        update=save_settings
+    ) # type: ignore
+
+    export_workers: IntProperty(
+        name='Export workers',
+        description='number of background Blender processes exporting blueprints, levels, materials & animations in parallel (1 to export everything in this Blender instance)',
+        default=1,
+        min=1,
+        max=32,
+        update=save_settings
+    ) # type: ignore
+
     # matching visuals between Blender & Bevy
     match_blender_visuals: BoolProperty(
         name='Match Blender visuals in Bevy',
@@ -137,4 +156,4 @@ class AutoExportSettings(PropertyGroup):
         clear_settings(".blenvy_export_settings")
         clear_settings(".blenvy_export_settings_previous")
         clear_settings(".blenvy_gltf_settings_previous")
-        clear_settings(".blenvy.project_serialized_previous")
+        clear_previous_snapshot()
@@ -1,3 +1,5 @@
+from .common.change_journal import change_journal
+
 def draw_settings_ui(layout, auto_export_settings):
     controls_enabled = auto_export_settings.auto_export
         
@@ -24,6 +26,7 @@ def draw_settings_ui(layout, auto_export_settings):
         op.gltf_export_id = "blenvy" # we specify that we are in a special case
 
         section.prop(auto_export_settings, "match_blender_visuals")    
+        section.prop(auto_export_settings, "export_workers")
 
     header, panel = layout.panel("Change Detection", default_closed=False)
     header.label(text="Change Detection")
@@ -38,6 +41,10 @@ def draw_settings_ui(layout, auto_export_settings):
 
         section.prop(auto_export_settings, "materials_in_depth_scan", text="Detailed materials scan")
         section.prop(auto_export_settings, "modifiers_in_depth_scan", text="Detailed modifiers scan")
+        section.prop(auto_export_settings, "hashing_workers")
+        section.operator("blenvy.auto_export_verify_all", text="Verify all (ignore cached data)")
+        stats = change_journal.stats()
+        section.label(text=f"Changes since last export: {stats['entries'] + stats['pending']} (flush latency: {stats['last_flush_latency'] * 1000:.0f} ms)")
 
     header, panel = layout.panel("Blueprints", default_closed=False)
     header.label(text="Blueprints")
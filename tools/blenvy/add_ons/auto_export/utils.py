@@ -45,6 +45,11 @@ def upsert_blueprint_assets(blueprint, blueprints_data, settings):
     blueprint.collection["BlueprintAssets"] = assets_to_fake_ron(local_assets)
 
 import os 
+from .common.export_manifest import write_text_if_changed
+
+def metadata_file_content(formated_assets):
+    return "(\n " + " assets:\n   [ " + "".join(formated_assets) + "\n   ]\n" + ")"
+
 def write_level_metadata_file(scene, blueprints_data, settings):
     levels_path_full = getattr(settings,"levels_path_full")
     all_assets_raw = get_level_scene_assets_tree2(level_scene=scene, blueprints_data=blueprints_data, settings=settings)
@@ -56,14 +61,8 @@ def write_level_metadata_file(scene, blueprints_data, settings):
         formated_assets.append(formated_asset)
     
     metadata_file_path_full = os.path.join(levels_path_full, scene.name+".meta.ron")
-    os.makedirs(os.path.dirname(metadata_file_path_full), exist_ok=True)
-
-    with open(metadata_file_path_full, "w") as assets_file:
-        assets_file.write("(\n ")
-        assets_file.write(" assets:\n   [ ")
-        assets_file.writelines(formated_assets)
-        assets_file.write("\n   ]\n")
-        assets_file.write(")")
+    # only written if the content changed, to avoid needless hot reloading on the Bevy side
+    write_text_if_changed(metadata_file_path_full, metadata_file_content(formated_assets))
 
 def write_blueprint_metadata_file(blueprint, blueprints_data, settings):
     blueprints_path_full = getattr(settings,"blueprints_path_full")
@@ -77,11 +76,5 @@ def write_blueprint_metadata_file(blueprint, blueprints_data, settings):
 
 
     metadata_file_path_full = os.path.join(blueprints_path_full, blueprint.name+".meta.ron")
-    os.makedirs(os.path.dirname(metadata_file_path_full), exist_ok=True)
-
-    with open(metadata_file_path_full, "w") as assets_file:
-        assets_file.write("(\n ")
-        assets_file.write(" assets:\n   [ ")
-        assets_file.writelines(formated_assets)
-        assets_file.write("\n   ]\n")
-        assets_file.write(")")
\ No newline at end of file
+    # only written if the content changed, to avoid needless hot reloading on the Bevy side
+    write_text_if_changed(metadata_file_path_full, metadata_file_content(formated_assets))
\ No newline at end of file
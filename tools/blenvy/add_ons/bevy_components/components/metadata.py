@@ -5,6 +5,7 @@ from bpy_types import (PropertyGroup)
 from ..propGroups.conversions_from_prop_group import property_group_value_to_custom_property_value
 from ..propGroups.conversions_to_prop_group import property_group_value_from_custom_property_value
 from ..utils import add_component_to_ui_list
+from ....core.project_changes import notify_project_changed
 
 class ComponentMetadata(bpy.types.PropertyGroup):
     short_name : bpy.props.StringProperty(
@@ -137,6 +138,8 @@ def upsert_bevy_component(item, long_name, value):
     bevy_components[long_name] = value
     item['bevy_components'] = json.dumps(bevy_components)
     #item['bevy_components'][long_name] = value # Sigh, this does not work, hits Blender's 63 char length limit
+    # custom properties written from python are not reported by the depsgraph
+    notify_project_changed()
 
 def remove_bevy_component(item, long_name):
     if 'bevy_components' in item:
@@ -146,6 +149,7 @@ def remove_bevy_component(item, long_name):
             item['bevy_components'] = json.dumps(bevy_components)
     if long_name in item:
         del item[long_name]
+    notify_project_changed()
 
 def get_bevy_components(item):
     if 'bevy_components' in item:
@@ -304,6 +308,7 @@ def apply_propertyGroup_values_to_item_customProperties_for_component(item, comp
     if component_definition is not None:
         value = property_group_value_to_custom_property_value(propertyGroup, component_definition, registry, None)
         item[component_name] = value
+        notify_project_changed()
     
     components_metadata = item.components_meta.components
     componentMeta = next(filter(lambda component: component["long_name"] == component_name, components_metadata), None)
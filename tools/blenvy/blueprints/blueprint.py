@@ -8,6 +8,7 @@ class Blueprint:
         self.instances = []
         self.objects = []
         self.nested_blueprints = []
+        self.nested_instances = {} # nested blueprint name => instances of it inside this blueprint
 
         self.collection = None # should we just sublclass ?
     
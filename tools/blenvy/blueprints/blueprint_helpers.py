@@ -4,20 +4,21 @@ import json
 import bpy
 from pathlib import Path
 import posixpath
+from ..core.directory_listing import file_on_disk
 
 def find_blueprints_not_on_disk(blueprints, folder_path, extension):
     not_found_blueprints = []
     for blueprint in blueprints:
         gltf_output_path = os.path.join(folder_path, blueprint.name + extension)
         # print("gltf_output_path", gltf_output_path)
-        found = os.path.exists(gltf_output_path) and os.path.isfile(gltf_output_path)
+        found = file_on_disk(gltf_output_path)
         if not found:
             not_found_blueprints.append(blueprint)
     return not_found_blueprints
 
 def check_if_blueprint_on_disk(scene_name, folder_path, extension):
     gltf_output_path = os.path.join(folder_path, scene_name + extension)
-    found = os.path.exists(gltf_output_path) and os.path.isfile(gltf_output_path)
+    found = file_on_disk(gltf_output_path)
     return found
 
 def inject_export_path_into_internal_blueprints(internal_blueprints, blueprints_path, gltf_extension, settings):
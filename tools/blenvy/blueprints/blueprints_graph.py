@@ -0,0 +1,93 @@
+import heapq
+
+# dependencies between blueprints: an edge from a blueprint to another one for each blueprint it contains instances of
+# whether a change to a nested blueprint affects the exported file of its parent depends on the combine mode of the instances:
+#  - Split: the parent only references the nested blueprint, so it does not need to be exported again
+#  - Embed: the nested blueprint is embedded into the parent, so the parent needs to be exported again
+#  - EmbedExternal: same as Embed, but only for external blueprints (local ones are referenced, like with Split)
+def instance_combine_mode(instance, default_combine_mode):
+    return instance['_combine'] if '_combine' in instance else default_combine_mode
+
+def is_embedded(instance, nested_blueprint, default_combine_mode):
+    combine_mode = instance_combine_mode(instance, default_combine_mode)
+    return combine_mode == 'Embed' or (combine_mode == 'EmbedExternal' and not nested_blueprint.local)
+
+class BlueprintsGraph:
+    def __init__(self, blueprints_per_name):
+        self.blueprints_per_name = blueprints_per_name
+        self.dependencies = {} # blueprint name => {nested blueprint name => [instances]}
+        self.dependents = {} # blueprint name => set of names of the blueprints containing instances of it
+        for blueprint in blueprints_per_name.values():
+            self.dependencies[blueprint.name] = {}
+            self.dependents.setdefault(blueprint.name, set())
+        for blueprint in blueprints_per_name.values():
+            for (nested_blueprint_name, instances) in blueprint.nested_instances.items():
+                if not nested_blueprint_name in blueprints_per_name:
+                    continue
+                self.dependencies[blueprint.name][nested_blueprint_name] = instances
+                self.dependents[nested_blueprint_name].add(blueprint.name)
+        self.cycles = self.find_cycles()
+        for cycle in self.cycles:
+            print("WARNING: blueprints containing each other:", " -> ".join(cycle))
+
+    # depth first search, returns the list of blueprint names of each cycle found
+    def find_cycles(self):
+        cycles = []
+        state = {} # name => 'VISITING' or 'DONE'
+        for root in sorted(self.dependencies.keys()):
+            if root in state:
+                continue
+            path = [root]
+            state[root] = 'VISITING'
+            stack = [iter(sorted(self.dependencies[root].keys()))]
+            while len(stack) > 0:
+                nested_blueprint_name = next(stack[-1], None)
+                if nested_blueprint_name is None:
+                    state[path.pop()] = 'DONE'
+                    stack.pop()
+                elif not nested_blueprint_name in state:
+                    state[nested_blueprint_name] = 'VISITING'
+                    path.append(nested_blueprint_name)
+                    stack.append(iter(sorted(self.dependencies[nested_blueprint_name].keys())))
+                elif state[nested_blueprint_name] == 'VISITING':
+                    cycles.append(path[path.index(nested_blueprint_name):] + [nested_blueprint_name])
+        return cycles
+
+    def embeds(self, blueprint_name, nested_blueprint_name, default_combine_mode):
+        nested_blueprint = self.blueprints_per_name[nested_blueprint_name]
+        instances = self.dependencies.get(blueprint_name, {}).get(nested_blueprint_name, [])
+        return any(is_embedded(instance, nested_blueprint, default_combine_mode) for instance in instances)
+
+    # the changed blueprints, together with all the blueprints that embed any of them, directly or not
+    def invalidate(self, changed_blueprint_names, default_combine_mode):
+        invalidated = set(name for name in changed_blueprint_names if name in self.blueprints_per_name)
+        to_check = list(invalidated)
+        while len(to_check) > 0:
+            blueprint_name = to_check.pop()
+            for dependent_name in self.dependents.get(blueprint_name, []):
+                if not dependent_name in invalidated and self.embeds(dependent_name, blueprint_name, default_combine_mode):
+                    invalidated.add(dependent_name)
+                    to_check.append(dependent_name)
+        return invalidated
+
+    # nested blueprints come before the blueprints containing them; blueprints that are part of a cycle are sorted by name
+    def topological_order(self, blueprint_names):
+        blueprint_names = set(blueprint_names)
+        remaining = {name: len([nested for nested in self.dependencies.get(name, {}) if nested in blueprint_names and nested != name]) for name in blueprint_names}
+        ready = [name for (name, count) in remaining.items() if count == 0]
+        heapq.heapify(ready)
+        ordered = []
+        while len(remaining) > 0:
+            if len(ready) == 0: # cycle: break it
+                heapq.heappush(ready, min(remaining.keys()))
+            name = heapq.heappop(ready)
+            if not name in remaining:
+                continue
+            del remaining[name]
+            ordered.append(name)
+            for dependent_name in self.dependents.get(name, []):
+                if dependent_name in remaining and dependent_name != name:
+                    remaining[dependent_name] -= 1
+                    if remaining[dependent_name] == 0:
+                        heapq.heappush(ready, dependent_name)
+        return ordered
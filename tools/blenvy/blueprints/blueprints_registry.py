@@ -12,19 +12,67 @@ from .blueprints_scan import blueprints_scan
 
 
 
-def refresh_blueprints():
-    try:
-        blueprints_registry = bpy.context.window_manager.blueprints_registry
-        blueprints_registry.refresh_blueprints()
-    except:pass
+# only structural changes can affect the blueprints: objects & collections being added/removed/renamed, collection membership & children,
+# collections marked as blueprints or assets, and which collection objects instance
+# the depsgraph reports updates for lots of other things (the scene is part of nearly every update), so for each updated datablock
+# we compare these to what they were at the time of the last scan (see structure_signature) instead of trusting the updates themselves
+def structure_signature(datablock):
+    if isinstance(datablock, bpy.types.Object):
+        return (datablock.name, datablock.instance_type, datablock.instance_collection.session_uid if datablock.instance_collection is not None else None)
+    if isinstance(datablock, bpy.types.Collection):
+        return (
+            datablock.name,
+            datablock.asset_data is not None,
+            datablock.get('AutoExport', None) == True,
+            tuple(object.session_uid for object in datablock.objects),
+            tuple(child.session_uid for child in datablock.children)
+        )
+    if isinstance(datablock, bpy.types.Scene):
+        # scenes are part of nearly every update: only look at the size of their root collection, any deeper change also updates the collections involved
+        return (datablock.name, len(datablock.collection.objects), len(datablock.collection.children))
+    return None
 
-    return 3
+def structure_signatures():
+    signatures = {}
+    for datablocks in (bpy.data.objects, bpy.data.collections, bpy.data.scenes):
+        for datablock in datablocks:
+            signatures[datablock.session_uid] = structure_signature(datablock)
+    return signatures
+
+# signatures: session_uid => structure signature, updated in place
+def affects_blueprints(update, signatures):
+    # moving things around does not change anything about blueprints
+    if update.is_updated_transform and not update.is_updated_geometry:
+        return False
+    datablock = update.id.original
+    signature = structure_signature(datablock)
+    if signature is None:
+        return False
+    previous = signatures.get(datablock.session_uid, None)
+    signatures[datablock.session_uid] = signature
+    return previous != signature
+
+# objects & collections that got added or removed
+def datablock_counts():
+    return (len(bpy.data.objects), len(bpy.data.collections), len(bpy.data.scenes))
+
+# collections marked as blueprints or assets: scripts & operators can set 'AutoExport' without triggering any depsgraph update,
+# so this is checked on each refresh, it is cheap compared to a scan
+def marked_collections():
+    return tuple(collection.session_uid for collection in bpy.data.collections if collection.get('AutoExport', None) == True or collection.asset_data is not None)
 
 # this is where we store the information for all available Blueprints
 class BlueprintsRegistry(PropertyGroup):
     blueprints_data = None
     blueprints_list = []
 
+    # instead of rescanning all the blueprints periodically, the scan results are kept until something relevant changes
+    # each such change bumps the generation counter, see deps_post_update_handler
+    generation = 0
+    scanned = None # (generation, level scene names, library scene names, marked collections) at the time of the last scan
+    signatures = {} # structure signatures at the time of the last scan, see affects_blueprints
+    counts = None
+
     asset_name_selector: StringProperty(
         name="asset name",
         description="name of asset to add",
@@ -49,24 +97,43 @@ class BlueprintsRegistry(PropertyGroup):
     @classmethod
     def register(cls):
         bpy.types.WindowManager.blueprints_registry = PointerProperty(type=BlueprintsRegistry)
-        bpy.app.timers.register(refresh_blueprints)
 
     @classmethod
     def unregister(cls):
-        try:
-            bpy.app.timers.unregister(refresh_blueprints)
-        except: pass
-        
+        cls.blueprints_data = None
+        cls.scanned = None
+        cls.signatures = {}
+        cls.counts = None
         del bpy.types.WindowManager.blueprints_registry
 
+    @classmethod
+    def mark_dirty(cls):
+        cls.generation += 1
+
+    @classmethod
+    def deps_post_update_handler(cls, scene, depsgraph):
+        counts = datablock_counts()
+        changed = counts != cls.counts
+        cls.counts = counts
+        # all the updates are checked, so that the signatures stay up to date
+        for update in depsgraph.updates:
+            changed = affects_blueprints(update, cls.signatures) or changed
+        if changed:
+            cls.mark_dirty()
+
 
     def add_blueprint(self, blueprint): 
         self.blueprints_list.append(blueprint)
 
-    def refresh_blueprints(self):
-        #print("titi", self)
+    # returns the cached blueprints data, unless something changed since the last scan
+    def refresh_blueprints(self, force=False):
         blenvy = bpy.context.window_manager.blenvy
         settings = blenvy
-        blueprints_data = blueprints_scan(settings.level_scenes, settings.library_scenes, settings)
-        self.blueprints_data = blueprints_data
-        return blueprints_data
+        cls = self.__class__
+        scan_key = (cls.generation, tuple(scene.name for scene in settings.level_scenes), tuple(scene.name for scene in settings.library_scenes), marked_collections())
+        if force or cls.blueprints_data is None or cls.scanned != scan_key:
+            cls.blueprints_data = blueprints_scan(settings.level_scenes, settings.library_scenes, settings)
+            cls.scanned = scan_key
+            cls.signatures = structure_signatures()
+            cls.counts = datablock_counts()
+        return cls.blueprints_data
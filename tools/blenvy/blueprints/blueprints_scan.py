@@ -1,12 +1,46 @@
 from types import SimpleNamespace
 import bpy
 from .blueprint import Blueprint
+from .blueprints_graph import BlueprintsGraph
+from ..core.helpers_collections import traverse_tree
 
 # blueprints: any collection with either
 # - an instance
 # - marked as asset
 # - with the "auto_export" flag
 # https://blender.stackexchange.com/questions/167878/how-to-get-all-collections-of-the-current-scene
+
+# collection => the first library scene containing it (at any depth), for all the collections defined in library scenes
+# built in a single walk over the collection tree of each library scene
+def library_scenes_per_collection(library_scenes):
+    scenes_per_collection = {}
+    for scene in library_scenes:
+        for child in scene.collection.children:
+            for collection in traverse_tree(child):
+                if collection not in scenes_per_collection:
+                    scenes_per_collection[collection] = scene
+    return scenes_per_collection
+
+# fills in the objects & nested blueprints of a blueprint, and the reverse lookup from objects to blueprints, in a single pass over all the objects of its collection
+# add_instance: called for every collection instance inside the blueprint, if any
+def scan_blueprint_objects(blueprint, blueprints_from_objects, add_instance=None):
+    objects = []
+    nested_blueprints = []
+    nested_instances = {}
+    for object in blueprint.collection.all_objects:
+        if object.instance_type == 'COLLECTION':
+            nested_blueprints.append(object.instance_collection.name) # FIXME: not precise enough, aka "what is a blueprint"
+            nested_instances.setdefault(object.instance_collection.name, []).append(object)
+            if add_instance is not None:
+                add_instance(object.instance_collection.name, object)
+        else:
+            objects.append(object.name)
+        # reverse lookup , so you can find the collection from any of its contained objects
+        blueprints_from_objects[object.name] = blueprint
+    blueprint.objects = objects
+    blueprint.nested_blueprints = nested_blueprints
+    blueprint.nested_instances = nested_instances
+
 def blueprints_scan(level_scenes, library_scenes, settings):
     blueprints = {}
     blueprints_from_objects = {}
@@ -26,6 +60,8 @@ def blueprints_scan(level_scenes, library_scenes, settings):
             collection_category[collection_name] = [] #.append(collection_name)
         collection_category[collection_name].append(object)
 
+    library_scene_per_collection = library_scenes_per_collection(library_scenes)
+
     for scene in level_scenes:# should it only be level scenes ? what about collection instances inside other scenes ?
         for object in scene.objects:
             #print("object", object.name)
@@ -34,11 +70,7 @@ def blueprints_scan(level_scenes, library_scenes, settings):
                 collection_name = object.instance_collection.name
                 #print("  from collection:", collection_name)
 
-                collection_from_library = False
-                for library_scene in library_scenes: # should be only in library scenes
-                    collection_from_library = library_scene.user_of_id(collection) > 0 # TODO: also check if it is an imported asset
-                    if collection_from_library:
-                        break
+                collection_from_library = collection in library_scene_per_collection # TODO: also check if it is an imported asset
 
                 add_object_to_collection_instances(collection_name=collection_name, object=object, internal = collection_from_library)
                 
@@ -69,41 +101,26 @@ def blueprints_scan(level_scenes, library_scenes, settings):
     for collection in bpy.data.collections: 
         #print("collection", collection, collection.name_full, "users", collection.users)
 
-        collection_from_library = False
-        defined_in_scene = None
-        for scene in library_scenes: # should be only in library scenes
-            collection_from_library = scene.user_of_id(collection) > 0
-            if collection_from_library:
-                defined_in_scene = scene
-                break
-        if not collection_from_library: 
+        defined_in_scene = library_scene_per_collection.get(collection, None) # should be only in library scenes
+        if defined_in_scene is None:
             continue
 
         
         if (
             'AutoExport' in collection and collection['AutoExport'] == True # get marked collections
             or collection.asset_data is not None # or if you have marked collections as assets you can auto export them too
-            or collection.name in list(internal_collection_instances.keys()) # or if the collection has an instance in one of the level scenes
+            or collection.name in internal_collection_instances # or if the collection has an instance in one of the level scenes
             ):
             blueprint = Blueprint(collection.name)
             blueprint.local = True
             blueprint.marked = 'AutoExport' in collection and collection['AutoExport'] == True or collection.asset_data is not None
-            blueprint.objects = [object.name for object in collection.all_objects if not object.instance_type == 'COLLECTION'] # inneficient, double loop
-            blueprint.nested_blueprints = [object.instance_collection.name for object in collection.all_objects if object.instance_type == 'COLLECTION'] # FIXME: not precise enough, aka "what is a blueprint"
             blueprint.collection = collection
             blueprint.instances = internal_collection_instances[collection.name] if collection.name in internal_collection_instances else []
             blueprint.scene = defined_in_scene
             blueprints[collection.name] = blueprint
 
-            # add nested collections to internal/external_collection instances 
-            # FIXME: inneficient, third loop over all_objects
-            for object in collection.all_objects:
-                if object.instance_type == 'COLLECTION':
-                    add_object_to_collection_instances(collection_name=object.instance_collection.name, object=object, internal = blueprint.local)
-
-            # now create reverse lookup , so you can find the collection from any of its contained objects
-            for object in collection.all_objects:
-                blueprints_from_objects[object.name] = blueprint#collection.name
+            # also adds nested collections to internal/external_collection instances
+            scan_blueprint_objects(blueprint, blueprints_from_objects, add_instance=lambda collection_name, object: add_object_to_collection_instances(collection_name=collection_name, object=object, internal=True))
 
         #
         collections.append(collection)
@@ -114,45 +131,33 @@ def blueprints_scan(level_scenes, library_scenes, settings):
         blueprint = Blueprint(collection.name)
         blueprint.local = False
         blueprint.marked = True #external ones are always marked, as they have to have been marked in their original file #'AutoExport' in collection and collection['AutoExport'] == True
-        blueprint.objects = [object.name for object in collection.all_objects if not object.instance_type == 'COLLECTION'] # inneficient, double loop
-        blueprint.nested_blueprints = [object.instance_collection.name for object in collection.all_objects if object.instance_type == 'COLLECTION'] # FIXME: not precise enough, aka "what is a blueprint"
         blueprint.collection = collection
         blueprint.instances = external_collection_instances[collection.name] if collection.name in external_collection_instances else []
         blueprints[collection.name] = blueprint
         #print("EXTERNAL COLLECTION", collection, dict(collection))
 
-        # add nested collections to internal/external_collection instances 
-        # FIXME: inneficient, third loop over all_objects
-        """for object in collection.all_objects:
-            if object.instance_type == 'COLLECTION':
-                add_object_to_collection_instances(collection_name=object.instance_collection.name, object=object, internal = blueprint.local)"""
-
-        # now create reverse lookup , so you can find the collection from any of its contained objects
-        for object in collection.all_objects:
-            blueprints_from_objects[object.name] = blueprint#collection.name
+        # nested collections of external blueprints are not added to the collection instances
+        scan_blueprint_objects(blueprint, blueprints_from_objects)
 
 
     # then add any nested collections at root level (so we can have a flat list, regardless of nesting)
-    # TODO: do this recursively
-    for blueprint_name in list(blueprints.keys()):
-        parent_blueprint = blueprints[blueprint_name]
+    # newly added blueprints are checked in turn, so this goes down to any depth
+    to_check = list(blueprints.keys())
+    while len(to_check) > 0:
+        parent_blueprint = blueprints[to_check.pop(0)]
 
         for nested_blueprint_name in parent_blueprint.nested_blueprints:
             if not nested_blueprint_name in blueprints.keys():
                 collection = bpy.data.collections[nested_blueprint_name]
                 blueprint = Blueprint(collection.name)
                 blueprint.local = parent_blueprint.local
-                blueprint.objects = [object.name for object in collection.all_objects if not object.instance_type == 'COLLECTION'] # inneficient, double loop
-                blueprint.nested_blueprints = [object.instance_collection.name for object in collection.all_objects if object.instance_type == 'COLLECTION'] # FIXME: not precise enough, aka "what is a blueprint"
                 blueprint.collection = collection
                 blueprint.instances = external_collection_instances[collection.name] if collection.name in external_collection_instances else []
                 blueprint.scene = parent_blueprint.scene if parent_blueprint.local else None
                 blueprints[collection.name] = blueprint
 
-
-                # now create reverse lookup , so you can find the collection from any of its contained objects
-                for object in collection.all_objects:
-                    blueprints_from_objects[object.name] = blueprint#collection.name
+                scan_blueprint_objects(blueprint, blueprints_from_objects)
+                to_check.append(blueprint.name)
 
 
     blueprints = dict(sorted(blueprints.items()))
@@ -233,7 +238,10 @@ def blueprints_scan(level_scenes, library_scenes, settings):
         "internal_collection_instances": internal_collection_instances,
         "external_collection_instances": external_collection_instances,
 
-        "blueprint_name_from_instances": blueprint_name_from_instances
+        "blueprint_name_from_instances": blueprint_name_from_instances,
+
+        # which blueprints contain which, see blueprints_graph.py
+        "blueprints_graph": BlueprintsGraph(blueprints_per_name)
     }
 
     return SimpleNamespace(**data)
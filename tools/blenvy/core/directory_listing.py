@@ -0,0 +1,57 @@
+import os
+
+# cache of the files present in the output folders, used to check which blueprints/levels/materials etc have already been exported
+# checking each file individually means several round trips per file, which is slow on network drives & co
+# so during an export run (see begin_export_run), each folder is only listed once, and files written during the run are added to the cache
+# outside of export runs, nothing is cached
+class DirectoryListingCache:
+    def __init__(self):
+        self.listings = {} # folder path => set of file names
+        self.active = False
+
+    def folder_key(self, folder_path):
+        return os.path.normcase(os.path.abspath(folder_path))
+
+    def files_in(self, folder_path):
+        key = self.folder_key(folder_path)
+        listing = self.listings.get(key, None)
+        if listing is None:
+            listing = set()
+            try:
+                with os.scandir(folder_path) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            listing.add(os.path.normcase(entry.name))
+            except (FileNotFoundError, NotADirectoryError):
+                pass
+            self.listings[key] = listing
+        return listing
+
+    def file_exists(self, path):
+        if not self.active:
+            return os.path.isfile(path)
+        return os.path.normcase(os.path.basename(path)) in self.files_in(os.path.dirname(path))
+
+    def add_file(self, path):
+        listing = self.listings.get(self.folder_key(os.path.dirname(path)), None)
+        if listing is not None:
+            listing.add(os.path.normcase(os.path.basename(path)))
+
+    def clear(self):
+        self.listings.clear()
+
+directory_listing = DirectoryListingCache()
+
+def begin_export_run():
+    directory_listing.clear()
+    directory_listing.active = True
+
+def end_export_run():
+    directory_listing.active = False
+    directory_listing.clear()
+
+def file_on_disk(path):
+    return directory_listing.file_exists(path)
+
+def file_written(path):
+    directory_listing.add_file(path)
@@ -0,0 +1,15 @@
+# changes to the project that Blender does not report through depsgraph updates (ie custom properties written from python by the
+# bevy_components operators): anything caching data derived from the project (auto export etc) registers a listener to be notified of them
+project_change_listeners = []
+
+def add_project_change_listener(listener):
+    if not listener in project_change_listeners:
+        project_change_listeners.append(listener)
+
+def remove_project_change_listener(listener):
+    if listener in project_change_listeners:
+        project_change_listeners.remove(listener)
+
+def notify_project_changed():
+    for listener in project_change_listeners:
+        listener()
@@ -1,6 +1,7 @@
 import os
 import posixpath
 from ..core.helpers_collections import (traverse_tree)
+from ..core.directory_listing import file_on_disk
 from ..add_ons.bevy_components.components.metadata import apply_propertyGroup_values_to_item_customProperties_for_component, upsert_bevy_component, get_bevy_component_value_by_long_name
 
 def find_materials_not_on_disk(materials, materials_path_full, extension):
@@ -8,14 +9,14 @@ def find_materials_not_on_disk(materials, materials_path_full, extension):
     for material in materials:
         gltf_output_path = os.path.join(materials_path_full, material.name + extension)
         # print("gltf_output_path", gltf_output_path)
-        found = os.path.exists(gltf_output_path) and os.path.isfile(gltf_output_path)
+        found = file_on_disk(gltf_output_path)
         if not found:
             not_found_materials.append(material)
     return not_found_materials
 
 def check_if_material_on_disk(scene_name, folder_path, extension):
     gltf_output_path = os.path.join(folder_path, scene_name + extension)
-    found = os.path.exists(gltf_output_path) and os.path.isfile(gltf_output_path)
+    found = file_on_disk(gltf_output_path)
     return found
 
 
@@ -0,0 +1,65 @@
+import time
+import bpy
+
+from ..blueprints.blueprints_scan import blueprints_scan, library_scenes_per_collection
+
+# benchmarks for the blueprints scan: these are not part of the standard test run (not named test_*), run them explicitly with
+# pytest -svv --blender-executable <path_to_blender> tests/benchmark_blueprints_scan.py
+
+def best_time(function, repeats=5):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+# library scenes with blueprints_count blueprints (each with a few objects & a nested blueprint), and a level scene with instances_count instances of them
+def make_project(blueprints_count, instances_count, library_scenes_count=4):
+    library_scenes = [bpy.data.scenes.new(f"__benchmark_library_{index}") for index in range(library_scenes_count)]
+    level_scene = bpy.data.scenes.new("__benchmark_level")
+    blueprint_collections = []
+    for index in range(blueprints_count):
+        collection = bpy.data.collections.new(f"__benchmark_blueprint_{index}")
+        library_scenes[index % library_scenes_count].collection.children.link(collection)
+        for object_index in range(5):
+            collection.objects.link(bpy.data.objects.new(f"__benchmark_blueprint_{index}_object_{object_index}", None))
+        if index > 0:
+            nested = bpy.data.objects.new(f"__benchmark_blueprint_{index}_nested", None)
+            nested.instance_type = 'COLLECTION'
+            nested.instance_collection = blueprint_collections[index - 1]
+            collection.objects.link(nested)
+        blueprint_collections.append(collection)
+
+    for index in range(instances_count):
+        instance = bpy.data.objects.new(f"__benchmark_instance_{index}", None)
+        instance.instance_type = 'COLLECTION'
+        instance.instance_collection = blueprint_collections[index % blueprints_count]
+        level_scene.collection.objects.link(instance)
+    return (level_scene, library_scenes, blueprint_collections)
+
+def remove_project(level_scene, library_scenes, blueprint_collections):
+    for object in [object for object in bpy.data.objects if object.name.startswith("__benchmark_")]:
+        bpy.data.objects.remove(object, do_unlink=True)
+    for collection in blueprint_collections:
+        bpy.data.collections.remove(collection)
+    for scene in [level_scene] + library_scenes:
+        bpy.data.scenes.remove(scene)
+
+def test_benchmark_blueprints_scan():
+    (level_scene, library_scenes, blueprint_collections) = make_project(blueprints_count=200, instances_count=5000)
+    try:
+        blueprints_data = blueprints_scan([level_scene], library_scenes, None)
+        assert len(blueprints_data.internal_blueprints) == len(blueprint_collections)
+        assert blueprints_data.blueprints_per_name["__benchmark_blueprint_1"].nested_blueprints == ["__benchmark_blueprint_0"]
+        assert blueprints_data.blueprints_from_objects["__benchmark_blueprint_1_object_0"].name == "__benchmark_blueprint_1"
+        assert len(blueprints_data.blueprint_instances_per_level_scene[level_scene.name]) == len(blueprint_collections)
+
+        # what used to be done for every single instance
+        instances = [object for object in level_scene.objects if object.instance_type == 'COLLECTION']
+        per_instance_time = best_time(lambda: [any(scene.user_of_id(instance.instance_collection) > 0 for scene in library_scenes) for instance in instances])
+        index_time = best_time(lambda: library_scenes_per_collection(library_scenes))
+        scan_time = best_time(lambda: blueprints_scan([level_scene], library_scenes, None))
+        print(f"{len(instances)} instances of {len(blueprint_collections)} blueprints: library lookups per instance: {per_instance_time:.3f}s, collection index: {index_time:.3f}s, full scan: {scan_time:.3f}s")
+    finally:
+        remove_project(level_scene, library_scenes, blueprint_collections)
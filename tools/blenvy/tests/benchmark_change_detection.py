@@ -0,0 +1,123 @@
+import time
+import inspect
+import hashlib
+import random
+import bpy
+from mathutils import Color
+
+from ..add_ons.auto_export.common.serialize_project import generic_fields_hasher_evolved, fields_to_ignore_generic, node_fields_to_ignore
+from ..add_ons.auto_export.common.streaming_hasher import StreamingHasher
+
+# benchmarks for change detection: these are not part of the standard test run (not named test_*), run them explicitly with
+# pytest -svv --blender-executable <path_to_blender> tests/benchmark_change_detection.py
+
+def best_time(function, repeats=5):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def make_materials(count):
+    materials = []
+    for index in range(count):
+        material = bpy.data.materials.new(name=f"__benchmark_material_{index}")
+        material.use_nodes = True
+        nodes = material.node_tree.nodes
+        principled = nodes.get("Principled BSDF")
+        principled.inputs["Base Color"].default_value = (index / count, 0.5, 0.2, 1.0)
+        noise = nodes.new("ShaderNodeTexNoise")
+        ramp = nodes.new("ShaderNodeValToRGB")
+        material.node_tree.links.new(noise.outputs["Fac"], ramp.inputs["Fac"])
+        material.node_tree.links.new(ramp.outputs["Color"], principled.inputs["Base Color"])
+        materials.append(material)
+    return materials
+
+def remove_materials(materials):
+    for material in materials:
+        bpy.data.materials.remove(material, do_unlink=True)
+
+# reference implementation of the hasher before per type "fields plans" & streaming digests were introduced, for comparison
+# everything gets converted to one big string, that then gets hashed
+def naive_digest(value):
+    return hashlib.md5(str(value).encode('utf-8')).hexdigest()
+
+def peel_value( value ):
+        try:
+            len( value )
+            return [ peel_value( x ) for x in value ]
+        except TypeError:
+            return value
+
+def naive_fields_hasher(data, fields_to_ignore):
+    try:
+        dict_data = dict(data)
+    except:
+        dict_data = {}
+    dict_data = {key: dict_data[key] for key in dict_data.keys() if key not in fields_to_ignore}
+    field_values = []
+    for field_name in dir(data):
+        if not field_name.startswith("__") and not field_name in fields_to_ignore and not field_name.startswith("show") and not callable(getattr(data, field_name, None)):
+            field_values.append(str(naive_convert_field(getattr(data, field_name, None))))
+    return str(dict_data) + str(field_values)
+
+def naive_node_tree(node_tree):
+    nodes_hashes = []
+    for node in node_tree.nodes:
+        input_hashes = [f"{naive_convert_field(getattr(input, 'default_value', None))}" for input in node.inputs]
+        output_hashes = [f"{naive_convert_field(getattr(output, 'default_value', None))}" for output in node.outputs]
+        nodes_hashes.append(f"{naive_fields_hasher(node, node_fields_to_ignore)}_{str(input_hashes)}_{str(output_hashes)}")
+    links_hashes = []
+    for link in node_tree.links:
+        from_socket_default = link.from_socket.default_value if hasattr(link.from_socket, "default_value") else None
+        to_socket_default = link.to_socket.default_value if hasattr(link.to_socket, "default_value") else None
+        links_hashes.append(f"{link.from_node.name}_{link.from_socket.name}_{from_socket_default}+{link.to_node.name}_{link.to_socket.name}_{to_socket_default}")
+    return f"{str(dict(node_tree))}_{str(nodes_hashes)}_{str(links_hashes)}"
+
+naive_type_lookups = {
+    Color: peel_value,
+    bpy.types.Object: lambda data: data.name,
+    bpy.types.FloatVectorAttribute: peel_value,
+    bpy.types.bpy_prop_array: peel_value,
+    bpy.types.PropertyGroup: lambda data: naive_fields_hasher(data, fields_to_ignore_generic),
+    bpy.types.bpy_prop_collection: lambda data: [naive_fields_hasher(item, fields_to_ignore_generic) for item in data],
+    bpy.types.MaterialLineArt: lambda data: naive_fields_hasher(data, fields_to_ignore_generic),
+    bpy.types.NodeTree: naive_node_tree,
+    bpy.types.CurveProfile: lambda data: naive_fields_hasher(data, fields_to_ignore_generic),
+    bpy.types.RaytraceEEVEE: lambda data: naive_fields_hasher(data, fields_to_ignore_generic),
+    bpy.types.CurveMapping: lambda data: naive_fields_hasher(data, fields_to_ignore_generic),
+    bpy.types.MaterialGPencilStyle: lambda data: naive_fields_hasher(data, fields_to_ignore_generic),
+}
+
+def naive_convert_field(raw_value):
+    for s_type in inspect.getmro(type(raw_value)):
+        if naive_type_lookups.get(s_type, None) is not None:
+            return naive_type_lookups[s_type](raw_value)
+    return raw_value
+
+
+def test_benchmark_fields_plans():
+    materials = make_materials(200)
+    try:
+        # any change needs to be picked up by both implementations
+        before = generic_fields_hasher_evolved(materials[0], fields_to_ignore_generic)
+        materials[0].roughness += 0.1
+        assert generic_fields_hasher_evolved(materials[0], fields_to_ignore_generic) != before
+
+        naive_time = best_time(lambda: [naive_digest(naive_fields_hasher(material, fields_to_ignore_generic)) for material in materials])
+        planned_time = best_time(lambda: [generic_fields_hasher_evolved(material, fields_to_ignore_generic) for material in materials])
+        print(f"hashing {len(materials)} materials: naive: {naive_time:.3f}s, with fields plans & streaming: {planned_time:.3f}s, speedup: {naive_time / planned_time:.2f}x")
+    finally:
+        remove_materials(materials)
+
+def test_benchmark_streaming_digest():
+    # roughly the shape of the per object data: nested lists of floats, strings & dicts
+    random.seed(0)
+    values = [
+        {"name": f"object_{index}", "transforms": [[random.random() for _ in range(3)] for _ in range(3)], "custom_properties": {"speed": random.random(), "tag": "enemy"}}
+        for index in range(20000)
+    ]
+    string_time = best_time(lambda: naive_digest(values))
+    streaming_time = best_time(lambda: StreamingHasher().update(values).hexdigest())
+    print(f"hashing {len(values)} values: str() + md5: {string_time:.3f}s, streaming: {streaming_time:.3f}s, speedup: {string_time / streaming_time:.2f}x")
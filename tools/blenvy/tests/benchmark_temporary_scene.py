@@ -0,0 +1,80 @@
+import time
+from types import SimpleNamespace
+import bpy
+
+from ..add_ons.auto_export.common.generate_temporary_scene_and_export import generate_temporary_scene_and_export, copy_hollowed_collection_into, clear_hollow_scene, export_scene_pool
+from ..add_ons.auto_export.constants import TEMPSCENE_PREFIX
+
+# benchmarks for the temporary export scenes: these are not part of the standard test run (not named test_*), run them explicitly with
+# pytest -svv --blender-executable <path_to_blender> tests/benchmark_temporary_scene.py
+
+# small blueprints (a couple of objects each), in a library scene
+def make_blueprints(count):
+    library_scene = bpy.data.scenes.new("__benchmark_library")
+    collections = []
+    for index in range(count):
+        collection = bpy.data.collections.new(f"__benchmark_blueprint_{index}")
+        library_scene.collection.children.link(collection)
+        parent = bpy.data.objects.new(f"__benchmark_blueprint_{index}_parent", None)
+        child = bpy.data.objects.new(f"__benchmark_blueprint_{index}_child", None)
+        child.parent = parent
+        collection.objects.link(parent)
+        collection.objects.link(child)
+        collections.append(collection)
+    return (library_scene, collections)
+
+def remove_blueprints(library_scene, collections):
+    for object in [object for object in bpy.data.objects if object.name.startswith("__benchmark_")]:
+        bpy.data.objects.remove(object, do_unlink=True)
+    for collection in collections:
+        bpy.data.collections.remove(collection)
+    bpy.data.scenes.remove(library_scene)
+
+# everything but the actual gltf export, so only the overhead per exported file is measured
+def export_all(collections, settings, blueprints_data):
+    for collection in collections:
+        generate_temporary_scene_and_export(
+            settings,
+            temp_scene_name=TEMPSCENE_PREFIX+collection.name,
+            additional_data=collection,
+            gltf_export_settings={},
+            gltf_output_path=f"/tmp/{collection.name}",
+            tempScene_filler=lambda temp_collection: copy_hollowed_collection_into(collection, temp_collection, blueprints_data=blueprints_data, settings=settings),
+            tempScene_cleaner=lambda temp_scene, params: clear_hollow_scene(original_root_collection=collection, temp_scene=temp_scene, **params)
+        )
+
+def export_all_in_run(collections, settings, blueprints_data):
+    export_scene_pool.begin_run()
+    try:
+        export_all(collections, settings, blueprints_data)
+    finally:
+        export_scene_pool.end_run()
+
+def test_benchmark_temporary_scene():
+    count = 500
+    settings = SimpleNamespace(auto_export=SimpleNamespace(dry_run="NO_EXPORT", collection_instances_combine_mode="Split"))
+    blueprints_data = SimpleNamespace(internal_blueprints=[])
+    (library_scene, collections) = make_blueprints(count)
+    scenes_count = len(bpy.data.scenes)
+    object_names = sorted(object.name for object in bpy.data.objects)
+    collection_names = sorted(collection.name for collection in bpy.data.collections)
+    try:
+        # one temporary scene & context switch per exported blueprint
+        start = time.perf_counter()
+        export_all(collections, settings, blueprints_data)
+        per_export_time = time.perf_counter() - start
+
+        # one temporary scene & context switch for all of them
+        start = time.perf_counter()
+        export_all_in_run(collections, settings, blueprints_data)
+        per_run_time = time.perf_counter() - start
+
+        # nothing is left behind
+        assert len(bpy.data.scenes) == scenes_count
+        assert not export_scene_pool.active
+        # & the original objects & collections are never renamed
+        assert sorted(object.name for object in bpy.data.objects) == object_names
+        assert sorted(collection.name for collection in bpy.data.collections) == collection_names
+        print(f"{count} blueprints: temporary scene per export: {per_export_time:.3f}s ({per_export_time / count * 1000:.2f} ms each), pooled temporary scene: {per_run_time:.3f}s ({per_run_time / count * 1000:.2f} ms each)")
+    finally:
+        remove_blueprints(library_scene, collections)
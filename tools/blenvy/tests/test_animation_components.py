@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+from ..add_ons.auto_export.common.duplicate_object import animation_components, animation_components_cache, clear_animation_components_cache
+
+def make_action(name, frame_range, markers=[]):
+    return SimpleNamespace(
+        name=name,
+        name_full=name,
+        frame_range=frame_range,
+        frame_start=frame_range[0],
+        frame_end=frame_range[1],
+        pose_markers=[SimpleNamespace(frame=frame, name=marker_name) for (frame, marker_name) in markers]
+    )
+
+def test_animation_components():
+    clear_animation_components_cache()
+    idle = make_action("Idle", (0.0, 40.0))
+    walk = make_action("Walk", (0.0, 20.0), [(5, "step_left"), (15, "step_right"), (15, "sound")])
+    actions = [idle, walk]
+    tracks = {"Idle": "idle", "Walk": "walk"}
+
+    (animation_infos, animation_markers) = animation_components(actions, tracks)
+    assert animation_infos == '(animations: [(name: "idle", frame_start: 0.0, frame_end: 40.0, frames_length: 40.0, frame_start_override: 0.0, frame_end_override: 40.0), (name: "walk", frame_start: 0.0, frame_end: 20.0, frames_length: 20.0, frame_start_override: 0.0, frame_end_override: 20.0)])'
+    assert animation_markers == '( {"idle":{}, "walk":{5:["step_left"], 15:["step_right", "sound"], }, } )'
+
+    # objects using the same actions share the generated components
+    assert animation_components(actions, tracks) is animation_components(actions, tracks)
+    assert len(animation_components_cache) == 1
+    # but not if the actions are used under other names
+    animation_components(actions, {"Idle": "idle", "Walk": "run"})
+    assert len(animation_components_cache) == 2
+
+    clear_animation_components_cache()
+    assert len(animation_components_cache) == 0
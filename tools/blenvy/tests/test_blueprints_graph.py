@@ -0,0 +1,40 @@
+from ..blueprints.blueprint import Blueprint
+from ..blueprints.blueprints_graph import BlueprintsGraph
+
+# nesting: blueprint name => {nested blueprint name: [combine mode overrides of each instance, None for the default]}
+def make_graph(nesting, external=[]):
+    blueprints_per_name = {}
+    for (name, nested) in nesting.items():
+        blueprint = Blueprint(name)
+        blueprint.local = name not in external
+        blueprint.nested_instances = {nested_name: [{} if mode is None else {"_combine": mode} for mode in modes] for (nested_name, modes) in nested.items()}
+        blueprints_per_name[name] = blueprint
+    return BlueprintsGraph(blueprints_per_name)
+
+def test_blueprints_graph_transitive_invalidation():
+    # House embeds Room, that embeds Chair (at any depth), but Street only references House
+    graph = make_graph({
+        "Street": {"House": ["Split"]},
+        "House": {"Room": [None]},
+        "Room": {"Chair": ["Embed", "Split"]},
+        "Chair": {},
+        "Lamp": {},
+    })
+    assert graph.cycles == []
+    assert graph.invalidate(["Chair"], "Embed") == {"Chair", "Room", "House"}
+    assert graph.invalidate(["Chair"], "Split") == {"Chair", "Room"} # one of the instances of Chair is always embedded
+    assert graph.invalidate(["Lamp"], "Embed") == {"Lamp"}
+    assert graph.topological_order(["Street", "Room", "House", "Chair"]) == ["Chair", "Room", "House", "Street"]
+
+def test_blueprints_graph_embed_external():
+    graph = make_graph({"House": {"Tree": [None], "Room": [None]}, "Tree": {}, "Room": {}}, external=["Tree"])
+    assert graph.invalidate(["Tree"], "EmbedExternal") == {"Tree", "House"}
+    assert graph.invalidate(["Room"], "EmbedExternal") == {"Room"}
+
+def test_blueprints_graph_cycles():
+    graph = make_graph({"A": {"B": [None]}, "B": {"C": [None]}, "C": {"A": [None]}, "D": {"A": [None]}})
+    assert graph.cycles == [["A", "B", "C", "A"]]
+    # invalidation & ordering still terminate
+    assert graph.invalidate(["A"], "Embed") == {"A", "B", "C", "D"}
+    assert sorted(graph.topological_order(["A", "B", "C", "D"])) == ["A", "B", "C", "D"]
+    assert graph.topological_order(["A", "B", "C", "D"])[-1] == "D"
@@ -0,0 +1,57 @@
+import bpy
+from types import SimpleNamespace
+from ..blueprints.blueprints_registry import affects_blueprints, structure_signatures, marked_collections
+
+def make_update(datablock, transform=False, geometry=False):
+    return SimpleNamespace(id=datablock, is_updated_transform=transform, is_updated_geometry=geometry)
+
+def test_only_structural_changes_affect_blueprints():
+    collection = bpy.data.collections.new("__test_blueprint")
+    other_collection = bpy.data.collections.new("__test_other_blueprint")
+    object = bpy.data.objects.new("__test_object", None)
+    try:
+        collection.objects.link(object)
+        signatures = structure_signatures()
+
+        # moving things around, or updates that do not change anything
+        object.location = (1.0, 2.0, 3.0)
+        assert not affects_blueprints(make_update(object, transform=True), signatures)
+        assert not affects_blueprints(make_update(object), signatures)
+        assert not affects_blueprints(make_update(collection), signatures)
+        for scene in bpy.data.scenes:
+            assert not affects_blueprints(make_update(scene), signatures)
+
+        # instancing a collection
+        object.instance_type = 'COLLECTION'
+        object.instance_collection = other_collection
+        assert affects_blueprints(make_update(object), signatures)
+        assert not affects_blueprints(make_update(object), signatures)
+
+        # collection membership & marking as blueprint
+        other_collection.objects.link(bpy.data.objects.new("__test_other_object", None))
+        assert affects_blueprints(make_update(other_collection), signatures)
+        collection['AutoExport'] = True
+        assert affects_blueprints(make_update(collection), signatures)
+
+        # renames
+        object.name = "__test_renamed_object"
+        assert affects_blueprints(make_update(object), signatures)
+    finally:
+        for object in [object for object in bpy.data.objects if object.name.startswith("__test_")]:
+            bpy.data.objects.remove(object, do_unlink=True)
+        bpy.data.collections.remove(collection)
+        bpy.data.collections.remove(other_collection)
+
+def test_marking_collections_without_depsgraph_updates():
+    collection = bpy.data.collections.new("__test_blueprint")
+    try:
+        marked = marked_collections()
+        # as done by scripts, without any depsgraph update
+        collection['AutoExport'] = True
+        assert marked_collections() != marked
+        del collection['AutoExport']
+        assert marked_collections() == marked
+        collection.asset_mark()
+        assert marked_collections() != marked
+    finally:
+        bpy.data.collections.remove(collection)
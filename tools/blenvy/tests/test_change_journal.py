@@ -0,0 +1,37 @@
+from ..add_ons.auto_export.common.change_journal import ChangeJournal
+
+def test_change_journal_coalescing():
+    journal = ChangeJournal()
+    for frame in range(10):
+        journal.record(("Object", 1), "Object", "__test_object", "Level", now=frame * 0.01)
+    journal.record(("Object", 1), "Object", "__test_renamed_object", "Level", now=0.1)
+    journal.record(("Material", 2), "Material", "__test_material", "Level", now=0.1)
+    assert len(journal.pending) == 2
+    assert len(journal.entries) == 0
+
+    journal.flush(now=0.3)
+    assert len(journal.pending) == 0
+    assert len(journal.entries) == 2
+    assert abs(journal.last_flush_latency - 0.3) < 1e-9
+    entry = journal.entries[0]
+    assert entry.updates == 11
+    assert entry.name == "__test_renamed_object"
+
+def test_change_journal_clean_after_export():
+    journal = ChangeJournal()
+    context = (("Level",), ("Library",))
+    assert not journal.is_clean(context)
+    journal.record(("Object", 1), "Object", "__test_object", "Level")
+    journal.mark_exported(context)
+    assert journal.is_clean(context)
+    assert len(journal) == 0
+    # different level/library scenes
+    assert not journal.is_clean((("Level",), ()))
+
+    journal.record(("Object", 1), "Object", "__test_object", "Level")
+    assert not journal.is_clean(context)
+
+    # changes the depsgraph does not know about
+    journal.mark_exported(context)
+    journal.mark_dirty()
+    assert not journal.is_clean(context)
@@ -0,0 +1,23 @@
+import os
+from ..core.directory_listing import DirectoryListingCache
+
+def test_directory_listing_cache(tmp_path):
+    (tmp_path / "Blueprint1.glb").write_bytes(b"")
+    os.makedirs(tmp_path / "Blueprint2.glb") # folders are not exports
+    listing = DirectoryListingCache()
+    listing.active = True
+    assert listing.file_exists(str(tmp_path / "Blueprint1.glb"))
+    assert not listing.file_exists(str(tmp_path / "Blueprint2.glb"))
+    assert not listing.file_exists(str(tmp_path / "missing" / "Blueprint1.glb"))
+
+    # the folder is only listed once: files created behind its back are not seen, unless they are reported
+    (tmp_path / "Blueprint3.glb").write_bytes(b"")
+    assert not listing.file_exists(str(tmp_path / "Blueprint3.glb"))
+    listing.add_file(str(tmp_path / "Blueprint3.glb"))
+    assert listing.file_exists(str(tmp_path / "Blueprint3.glb"))
+
+    # no caching outside of export runs
+    listing.active = False
+    listing.clear()
+    (tmp_path / "Blueprint4.glb").write_bytes(b"")
+    assert listing.file_exists(str(tmp_path / "Blueprint4.glb"))
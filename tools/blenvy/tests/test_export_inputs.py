@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+from ..add_ons.auto_export.common.export_inputs import ExportInputs
+from ..add_ons.auto_export.common.serialize_project import merkle_node, project_snapshot
+
+class FakeDatablock(dict):
+    def __init__(self, name, all_objects=[], **properties):
+        super().__init__(**properties)
+        self.name = name
+        self.blenvy_id = f"id_{name}"
+        self.all_objects = all_objects
+
+def make_blueprint(name, objects, nested_instances={}, **properties):
+    return SimpleNamespace(name=name, local=True, collection=FakeDatablock(name, all_objects=objects, **properties), nested_instances=nested_instances)
+
+def make_snapshot(object_digests):
+    objects = {f"id_{name}": digest for (name, digest) in object_digests.items()}
+    collections = {f"id_{name}": "collection" for name in ["House", "Chair", "Lamp"]}
+    return project_snapshot(merkle_node({"id_Library": merkle_node(objects)}), merkle_node(collections), merkle_node({}))
+
+def test_export_inputs_per_blueprint():
+    chair_object = FakeDatablock("Chair_mesh")
+    lamp_object = FakeDatablock("Lamp_mesh")
+    chair = make_blueprint("Chair", [chair_object])
+    lamp = make_blueprint("Lamp", [lamp_object])
+    embedded_chair = FakeDatablock("Chair_instance", _combine="Embed")
+    split_lamp = FakeDatablock("Lamp_instance", _combine="Split")
+    house = make_blueprint("House", [embedded_chair, split_lamp], nested_instances={"Chair": [embedded_chair], "Lamp": [split_lamp]})
+    blueprints_data = SimpleNamespace(blueprints_per_name={"Chair": chair, "Lamp": lamp, "House": house})
+
+    def digests(object_digests):
+        inputs = ExportInputs()
+        inputs.begin_run(make_snapshot(object_digests), blueprints_data, "Split")
+        return {blueprint.name: inputs.blueprint(blueprint) for blueprint in [chair, lamp, house]}
+
+    object_digests = {"Chair_mesh": "chair", "Lamp_mesh": "lamp", "Chair_instance": "chair_instance", "Lamp_instance": "lamp_instance", "Unrelated": "unrelated"}
+    before = digests(object_digests)
+    assert all(digest is not None for digest in before.values())
+
+    # changes elsewhere in the project do not affect any of the blueprints
+    assert digests({**object_digests, "Unrelated": "changed"}) == before
+    # the embedded chair is part of the house, the referenced lamp is not
+    after = digests({**object_digests, "Chair_mesh": "changed"})
+    assert after["Chair"] != before["Chair"] and after["House"] != before["House"] and after["Lamp"] == before["Lamp"]
+    after = digests({**object_digests, "Lamp_mesh": "changed"})
+    assert after["Lamp"] != before["Lamp"] and after["House"] == before["House"]
+
+    # blueprints marked as "always_export" are never skipped
+    inputs = ExportInputs()
+    inputs.begin_run(make_snapshot(object_digests), blueprints_data, "Split")
+    chair.collection["always_export"] = True
+    assert inputs.blueprint(chair) is None
+    # nor is anything outside of export runs
+    inputs.end_run()
+    assert inputs.blueprint(lamp) is None
@@ -0,0 +1,61 @@
+import os
+from ..add_ons.auto_export.common.export_manifest import ExportManifest, MANIFEST_FILE_NAME, manifest_path, write_text_if_changed
+
+def test_export_manifest(tmp_path):
+    gltf_settings = {"export_format": "GLB"}
+    assets_path = tmp_path / "assets"
+    output_path = str(assets_path / "levels" / "World.glb")
+    os.makedirs(assets_path / "levels")
+
+    manifest = ExportManifest()
+    manifest.begin_run(str(assets_path), "settings_fingerprint_1")
+    assert not manifest.is_up_to_date(output_path, gltf_settings, "blueprint_inputs")
+    # temporary files are written outside of the assets folder
+    temporary_path = manifest.temporary_path(output_path[:-len(".glb")]) + ".glb"
+    assert not os.path.abspath(temporary_path).startswith(os.path.abspath(assets_path))
+
+    with open(temporary_path, "wb") as file:
+        file.write(b"glb content")
+    assert manifest.replace_if_changed(temporary_path, output_path, gltf_settings, "blueprint_inputs")
+    assert not os.path.exists(temporary_path)
+    assert manifest.is_up_to_date(output_path, gltf_settings, "blueprint_inputs")
+    manifest.end_run()
+    # the manifest is not part of the assets
+    assert os.path.isfile(manifest_path(str(assets_path)))
+    assert not os.path.exists(assets_path / MANIFEST_FILE_NAME)
+    assert sorted(os.listdir(tmp_path)) == sorted(["assets", os.path.basename(manifest_path(str(assets_path)))])
+
+    # identical content: the existing file is left untouched
+    mtime = os.stat(output_path).st_mtime_ns
+    manifest.begin_run(str(assets_path), "settings_fingerprint_2")
+    assert not manifest.is_up_to_date(output_path, gltf_settings, "blueprint_inputs")
+    temporary_path = manifest.temporary_path(output_path[:-len(".glb")]) + ".glb"
+    with open(temporary_path, "wb") as file:
+        file.write(b"glb content")
+    assert not manifest.replace_if_changed(temporary_path, output_path, gltf_settings, "blueprint_inputs")
+    assert not os.path.exists(temporary_path)
+    assert os.stat(output_path).st_mtime_ns == mtime
+    assert manifest.is_up_to_date(output_path, gltf_settings, "blueprint_inputs")
+    # changes to the part of the project the file is exported from
+    assert not manifest.is_up_to_date(output_path, gltf_settings, "changed_blueprint_inputs")
+    # files without inputs (ie "always_export" ones) are never up to date
+    assert not manifest.is_up_to_date(output_path, gltf_settings, None)
+    # different gltf settings are different inputs
+    assert not manifest.is_up_to_date(output_path, {"export_format": "GLB", "export_apply": True}, "blueprint_inputs")
+    manifest.end_run()
+
+    # files changed behind our back are not up to date anymore
+    with open(output_path, "wb") as file:
+        file.write(b"edited by hand")
+    manifest.begin_run(str(assets_path), "settings_fingerprint_2")
+    assert not manifest.is_up_to_date(output_path, gltf_settings, "blueprint_inputs")
+    manifest.end_run()
+
+    # outside of export runs, nothing is ever up to date
+    assert not manifest.is_up_to_date(output_path, gltf_settings, "blueprint_inputs")
+
+def test_write_text_if_changed(tmp_path):
+    path = str(tmp_path / "blueprints" / "Blueprint1.meta.ron")
+    assert write_text_if_changed(path, "(assets: [])")
+    assert not write_text_if_changed(path, "(assets: [])")
+    assert write_text_if_changed(path, "(assets: [(\"Blueprint2\", File (path: \"blueprints/Blueprint2.glb\"))])")
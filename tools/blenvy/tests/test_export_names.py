@@ -0,0 +1,25 @@
+from ..add_ons.auto_export.common.export_names import ExportNames
+
+class FakeObject:
+    def __init__(self, name):
+        self.name = name
+
+def test_export_names():
+    export_names = ExportNames()
+    original = FakeObject("Cube")
+    copy = FakeObject("Cube.001")
+    placeholder = FakeObject("Blueprint1.001")
+
+    export_names.register(copy, original.name, source=original)
+    export_names.register(placeholder, "Blueprint1")
+    assert export_names.export_name("Cube.001") == "Cube"
+    assert export_names.export_name("Blueprint1.001") == "Blueprint1"
+    # objects that are not copies keep their names
+    assert export_names.export_name("Material_Red") is None
+
+    assert export_names.is_copied(original)
+    assert not export_names.is_copied(copy)
+
+    export_names.clear()
+    assert export_names.export_name("Cube.001") is None
+    assert not export_names.is_copied(original)
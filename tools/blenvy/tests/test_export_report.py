@@ -0,0 +1,28 @@
+import json
+from ..add_ons.auto_export.common.export_report import ExportReport
+
+def test_export_report():
+    report = ExportReport()
+    with report.stage("export"):
+        report.file("assets/blueprints/Blueprint1.glb", 'WRITTEN')
+        report.file("assets/blueprints/Blueprint2.glb", 'UNCHANGED')
+    with report.stage("export"):
+        report.file("assets/levels/World.glb", 'UP_TO_DATE')
+    report.set_changes({"Library": {"Cube": None, "Blueprint1_mesh": None}}, {"Blueprint3": None}, {}, False)
+
+    result = report.to_dict()
+    assert result["success"]
+    assert list(result["stages"].keys()) == ["export"] # stages run several times add up
+    assert result["counts"] == {'WRITTEN': 1, 'UNCHANGED': 1, 'UP_TO_DATE': 1}
+    assert result["changes"]["scenes"] == {"Library": ["Blueprint1_mesh", "Cube"]}
+    assert result["changes"]["collections"] == ["Blueprint3"]
+    json.dumps(result) # the report needs to be serializable as is
+
+    # files exported by workers are sent back to the main process
+    assert len(report.take_files()) == 3
+    assert report.files == []
+
+    report.error("failed to export Blueprint4")
+    assert not report.to_dict()["success"]
+    report.clear()
+    assert report.to_dict()["success"] and report.stages == {}
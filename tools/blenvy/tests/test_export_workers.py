@@ -0,0 +1,25 @@
+from ..add_ons.auto_export.common.export_workers import shard_jobs
+
+def test_shard_jobs():
+    jobs = [{"kind": 'BLUEPRINT', "name": f"Blueprint{index}", "weight": 1} for index in range(6)]
+    jobs += [
+        {"kind": 'BLUEPRINT', "name": "Huge_blueprint", "weight": 10},
+        {"kind": 'LEVEL', "name": "World", "weight": 5},
+        {"kind": 'MATERIAL', "name": "Material.001", "weight": 1},
+    ]
+    shards = shard_jobs(jobs, 3)
+    assert len(shards) == 3
+    # every job is exported exactly once
+    assert sorted(job["name"] for shard in shards for job in shard) == sorted(job["name"] for job in jobs)
+    # the biggest job gets a worker of its own
+    assert [job["name"] for job in shards[0]] == ["Huge_blueprint"]
+    loads = sorted(sum(job["weight"] for job in shard) for shard in shards)
+    assert loads == [6, 6, 10]
+    # inside each worker, jobs run in the same order as without workers: materials, animations, levels then blueprints
+    for shard in shards:
+        kinds = [job["kind"] for job in shard]
+        assert kinds == sorted(kinds, key=['MATERIAL', 'ANIMATION', 'LEVEL', 'BLUEPRINT'].index)
+
+    # never more workers than jobs
+    assert len(shard_jobs(jobs[:2], 8)) == 2
+    assert shard_jobs([], 4) == []
@@ -0,0 +1,86 @@
+from ..add_ons.auto_export.common.hash_cache import HashCache
+
+def test_hash_cache_invalidation():
+    cache = HashCache()
+    cache.set((1, "mesh"), "mesh_hash", dependencies=[1])
+    cache.set((2, "material"), "material_hash", dependencies=[2, 3])
+    cache.set((4, "modifiers"), "modifiers_hash", dependencies=[4, (2, "material")])
+
+    assert cache.get((1, "mesh")) == "mesh_hash"
+    assert len(cache) == 3
+
+    # invalidating a dependency drops anything that depends on it, transitively
+    cache.invalidate(3)
+    assert cache.get((2, "material")) is None
+    assert cache.get((4, "modifiers")) is None
+    assert cache.get((1, "mesh")) == "mesh_hash"
+
+    cache.invalidate(1)
+    assert len(cache) == 0
+
+def test_hash_cache_clear():
+    cache = HashCache()
+    cache.set((1, "mesh"), "mesh_hash", dependencies=[1])
+    cache.clear()
+    assert cache.get((1, "mesh")) is None
+    assert len(cache.dependents) == 0
+    assert len(cache.dependencies) == 0
+
+def test_hash_cache_rehash_drops_previous_dependencies():
+    cache = HashCache()
+    cache.set((1, "modifiers"), "modifiers_hash", dependencies=[1, 2])
+    cache.set((1, "modifiers"), "modifiers_hash_2", dependencies=[1, 3])
+    assert 2 not in cache.dependents
+    # no longer depends on 2
+    cache.invalidate(2)
+    assert cache.get((1, "modifiers")) == "modifiers_hash_2"
+
+    cache.invalidate(3)
+    assert cache.get((1, "modifiers")) is None
+    assert len(cache.dependents) == 0
+    assert len(cache.dependencies) == 0
+
+def test_hash_cache_retain():
+    cache = HashCache()
+    cache.set((1, "node_tree"), "node_tree_hash", dependencies=[1])
+    cache.set((2, "material"), "material_hash", dependencies=[2, (1, "node_tree")])
+    cache.set((3, "mesh"), "mesh_hash", dependencies=[3])
+    # the node tree is kept as the material uses it, the mesh (ie of a deleted object) is dropped
+    cache.retain({(2, "material")})
+    assert cache.get((1, "node_tree")) == "node_tree_hash"
+    assert cache.get((2, "material")) == "material_hash"
+    assert cache.get((3, "mesh")) is None
+    assert 3 not in cache.dependents
+
+def test_node_group_changes_invalidate_materials():
+    import bpy
+    from types import SimpleNamespace
+    from ..add_ons.auto_export.common.hash_cache import hash_cache, invalidate_datablock
+    from ..add_ons.auto_export.common.serialize_project import material_hash, new_serialization_cache, SerializationState
+
+    settings = SimpleNamespace(auto_export=SimpleNamespace(materials_in_depth_scan=True))
+    node_group = bpy.data.node_groups.new("__test_node_group", "ShaderNodeTree")
+    value_node = node_group.nodes.new("ShaderNodeValue")
+    materials = [bpy.data.materials.new(name=f"__test_material_{index}") for index in range(2)]
+    try:
+        for material in materials:
+            material.use_nodes = True
+            group_node = material.node_tree.nodes.new("ShaderNodeGroup")
+            group_node.node_tree = node_group
+
+        SerializationState.cache = new_serialization_cache(use_hash_cache=True)
+        before = [material_hash(material, SerializationState.cache, settings) for material in materials]
+        # the node group is only hashed once for both materials
+        assert len([key for key in SerializationState.cache["hashed"] if key[1] == "node_tree" and key[0] == node_group.session_uid]) == 1
+
+        value_node.outputs[0].default_value = 42.0
+        invalidate_datablock(node_group)
+        SerializationState.cache = new_serialization_cache(use_hash_cache=True)
+        after = [material_hash(material, SerializationState.cache, settings) for material in materials]
+        assert before[0] != after[0] and before[1] != after[1]
+    finally:
+        SerializationState.cache = None
+        hash_cache.clear()
+        for material in materials:
+            bpy.data.materials.remove(material, do_unlink=True)
+        bpy.data.node_groups.remove(node_group, do_unlink=True)
@@ -0,0 +1,15 @@
+from ..core.project_changes import add_project_change_listener, remove_project_change_listener, notify_project_changed
+
+def test_project_change_listeners():
+    notifications = []
+    def listener():
+        notifications.append(True)
+    add_project_change_listener(listener)
+    add_project_change_listener(listener) # registering twice does not notify twice
+    try:
+        notify_project_changed()
+        assert len(notifications) == 1
+    finally:
+        remove_project_change_listener(listener)
+    notify_project_changed()
+    assert len(notifications) == 1
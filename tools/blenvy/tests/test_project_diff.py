@@ -0,0 +1,50 @@
+from ..add_ons.auto_export.common.serialize_project import project_snapshot, merkle_node
+from ..add_ons.auto_export.common.project_diff import project_diff, upgrade_snapshot
+
+# objects: stable id => (name, hash)
+def make_snapshot(objects, materials={}, level_name="Level"):
+    level = merkle_node({key: object_hash for (key, (_, object_hash)) in objects.items()}, {key: name for (key, (name, _)) in objects.items()})
+    library = merkle_node({"blueprint_object_id": "a"}, {"blueprint_object_id": "__test_blueprint_object"})
+    scenes = merkle_node({"level_id": level, "library_id": library}, {"level_id": level_name, "library_id": "Library"})
+    return project_snapshot(scenes, merkle_node({}), merkle_node({key: material_hash for (key, (_, material_hash)) in materials.items()}, {key: name for (key, (name, _)) in materials.items()}))
+
+def test_project_diff_unchanged():
+    previous = make_snapshot({"id_1": ("__test_object", "a"), "id_2": ("__test_other_object", "b")})
+    current = make_snapshot({"id_1": ("__test_object", "a"), "id_2": ("__test_other_object", "b")})
+    assert previous["hash"] == current["hash"]
+    assert project_diff(previous, current, None) == ({}, {}, {}, {"scenes": {}, "objects": {}, "collections": {}, "materials": {}})
+
+def test_project_diff_only_changed_subtrees():
+    previous = make_snapshot({"id_1": ("__test_object", "a"), "id_2": ("__test_other_object", "b")}, {"material_id": ("__test_material", "m")})
+    current = make_snapshot({"id_1": ("__test_object", "a"), "id_2": ("__test_other_object", "changed"), "id_3": ("__test_added_object", "d")}, {"material_id": ("__test_material", "m2")})
+    assert previous["children"]["scenes"]["children"]["library_id"]["hash"] == current["children"]["scenes"]["children"]["library_id"]["hash"]
+
+    (changes_per_scene, changes_per_collection, changes_per_material, _) = project_diff(previous, current, None)
+    assert list(changes_per_scene.keys()) == ["Level"]
+    assert sorted(changes_per_scene["Level"].keys()) == ["__test_added_object", "__test_other_object"]
+    assert changes_per_collection == {}
+    assert list(changes_per_material.keys()) == ["__test_material"]
+
+def test_project_diff_renames():
+    previous = make_snapshot({"id_1": ("__test_object", "a"), "id_2": ("__test_other_object", "b")}, {"material_id": ("__test_material", "m")})
+    current = make_snapshot({"id_1": ("__test_object", "a"), "id_2": ("__test_renamed_object", "b")}, {"material_id": ("__test_renamed_material", "m")}, level_name="Renamed level")
+
+    (changes_per_scene, changes_per_collection, changes_per_material, renames) = project_diff(previous, current, None)
+    # renames are not seen as removed + added objects
+    assert list(changes_per_scene["Renamed level"].keys()) == ["__test_renamed_object"]
+    assert changes_per_material == {}
+    assert renames["scenes"] == {"Level": "Renamed level"}
+    assert renames["objects"] == {"__test_other_object": "__test_renamed_object"}
+    assert renames["materials"] == {"__test_material": "__test_renamed_material"}
+
+def test_project_diff_old_snapshot_format():
+    current = make_snapshot({"id_1": ("__test_object", "a")})
+    # keyed by names, and without subtree hashes
+    previous = {"scenes": {"Level": {"__test_object": "old"}, "Library": {"__test_blueprint_object": "a"}}, "collections": {}, "materials": {}}
+    upgraded = upgrade_snapshot(previous)
+    assert upgraded["children"]["scenes"]["children"]["Library"]["hash"] != current["children"]["scenes"]["children"]["library_id"]["hash"]
+
+    # matched by name instead
+    (changes_per_scene, _, _, renames) = project_diff(previous, current, None)
+    assert list(changes_per_scene["Level"].keys()) == ["__test_object"]
+    assert renames["objects"] == {}
@@ -0,0 +1,23 @@
+import json
+from ..add_ons.auto_export.common.serialize_project import project_snapshot, merkle_node
+from ..add_ons.auto_export.common.streaming_hasher import StreamingHasher
+from ..add_ons.auto_export.common.snapshot_storage import encode_snapshot, decode_snapshot, SNAPSHOT_PREFIX
+
+def make_snapshot(objects_count):
+    objects = {f"object_id_{index}": StreamingHasher().update(index).hexdigest() for index in range(objects_count)}
+    names = {key: f"Object.{index:03}" for (index, key) in enumerate(objects.keys())}
+    level = merkle_node(objects, names)
+    scenes = merkle_node({"level_id": level}, {"level_id": "Level"})
+    materials = merkle_node({"material_id": None, "legacy_material": "not a digest"})
+    return project_snapshot(scenes, merkle_node({}), materials)
+
+def test_snapshot_round_trip():
+    snapshot = make_snapshot(100)
+    for compress in [True, False]:
+        encoded = encode_snapshot(snapshot, compress=compress)
+        assert encoded.startswith(SNAPSHOT_PREFIX)
+        assert decode_snapshot(encoded) == snapshot
+
+def test_snapshot_smaller_than_json():
+    snapshot = make_snapshot(1000)
+    assert len(encode_snapshot(snapshot)) < len(json.dumps(snapshot)) / 2
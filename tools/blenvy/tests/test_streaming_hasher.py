@@ -0,0 +1,47 @@
+import math
+import numpy as np
+from ..add_ons.auto_export.common.streaming_hasher import StreamingHasher
+from ..add_ons.auto_export.common.hashing_pool import new_hashing_pool, digest_in_pool, digest_later
+
+def digest(value):
+    return StreamingHasher().update(value).hexdigest()
+
+def test_streaming_hasher_canonical_values():
+    assert digest(0.0) == digest(-0.0)
+    assert digest(float("nan")) == digest(math.nan)
+    assert digest({"a": 1, "b": 2}) == digest({"b": 2, "a": 1})
+    assert digest({1, 2, 3}) == digest({3, 2, 1})
+    assert digest(np.float32(1.5)) == digest(1.5)
+
+def test_streaming_hasher_no_ambiguities():
+    # values that would give the same string representation (or the same concatenation) need different hashes
+    assert digest(1) != digest(1.0)
+    assert digest(1) != digest("1")
+    assert digest(True) != digest(1)
+    assert digest(["ab", "c"]) != digest(["a", "bc"])
+    assert digest([[1], 2]) != digest([1, [2]])
+    assert digest(None) != digest("None")
+    assert digest(np.zeros(4, dtype=np.float32)) != digest(np.zeros(4, dtype=np.int32))
+    assert digest(np.zeros((2, 2), dtype=np.float32)) != digest(np.zeros(4, dtype=np.float32))
+
+def test_streaming_hasher_fallback():
+    class Custom:
+        pass
+    fed = []
+    def fallback(hasher, value):
+        fed.append(value)
+        hasher.update_text("custom")
+    value = Custom()
+    hasher = StreamingHasher(fallback=fallback).update([1, value])
+    assert fed == [value]
+    assert hasher.hexdigest() == StreamingHasher().update([1, "custom"]).hexdigest()
+
+def test_hashing_pool_same_digests():
+    buffers = [np.arange(10000, dtype=np.float32), "mesh", [1, 2, 3]]
+    pool = new_hashing_pool(4)
+    deferred = digest_in_pool(pool, buffers)
+    # composed digests get resolved once their inputs are
+    composed = digest_later(pool, lambda: digest(deferred.resolve()))
+    pool.shutdown()
+    assert deferred.resolve() == digest_in_pool(None, buffers)
+    assert composed.resolve() == digest(digest_in_pool(None, buffers))